@@ -1,17 +1,16 @@
-import os
 import json
 import re
 import pika
-from llama_cpp import Llama
 
-from backend.config import MODEL_DIR
+from backend.services.model_router import get_router
 from backend.services.matches_db import save_match_result, load_recruiter_opinion
 from backend.services.AgentBase import AgentBase
 from backend.services.matches_db import upload_debates
 from backend.services.DebateManager import DebateManager
+from backend.services.generation_policy import get_policy
 
 class FiftHRComplianceAgent(AgentBase):
-    def __init__(self, model_path=os.path.join(MODEL_DIR, "mistral-7b-instruct-v0.1-q4_k_m.gguf"),
+    def __init__(self, model_path=None,
                  queue_in='resume_queue_HR_Compliance', queue_out='agent_response_queue'):
         super().__init__(expected_agent_name="HiringManagerAgent")
 
@@ -19,15 +18,9 @@ class FiftHRComplianceAgent(AgentBase):
         self.queue_out = queue_out
         self.max_debate_rounds = 3
 
-        self.llm = Llama(
-            model_path=model_path,
-            n_ctx=4096,
-            n_threads=8,
-            n_gpu_layers=35,
-            use_mlock=True,
-            use_mmap=True,
-            verbose=False
-        )
+        self.router = get_router()
+        self.llm = self.router.model("evaluate", model_path)
+        self.generation = get_policy("hr_compliance_evaluation")
 
         self._setup_rabbitmq()
 
@@ -89,10 +82,13 @@ Now, following the same style and level of detail, write your evaluation below:
         prompt = self._generate_prompt(job_posting, applicant_info)
         print("🧠 Prompt sent to Llama:\n", prompt)
 
-        response = self.llm.create_completion(prompt=prompt, max_tokens=400, temperature=0.4)
+        response = self.generation.complete(
+            lambda **budget: self.llm.create_completion(prompt=prompt, temperature=0.4, **budget), model=self.llm
+        )
         raw_output = response['choices'][0]['text'].strip()
 
         raw_output = raw_output.encode('utf-8', errors='ignore').decode('utf-8')
+        raw_output = self.generation.trim(raw_output)
         print("\n🧹 Cleaned Evaluation:\n", raw_output)
 
         match = re.search(r'Final recommendation:\s*\*\*(Yes|No)\*\*', raw_output, re.IGNORECASE)
@@ -173,7 +169,7 @@ Now, following the same style and level of detail, write your evaluation below:
     Only provide a rebuttal, no greetings or unnecessary commentary.
     """
 
-        response = self.llm.create_completion(prompt=prompt, max_tokens=80, temperature=0.4)
+        response = self.router.complete("rebut", prompt=prompt, max_tokens=80, temperature=0.4)
         rebuttal = response['choices'][0]['text'].strip()
 
         print(f"⚔️ Hiring Manager rebuttal:\n{rebuttal}")
@@ -251,15 +247,18 @@ Now, following the same style and level of detail, write your evaluation below:
     Answer exactly "RecruiterAgent" or "HiringManagerAgent" and nothing else.
     """
 
-        result = self.llm.create_completion(prompt=prompt, max_tokens=10, temperature=0.2)
-        winner = result['choices'][0]['text'].strip()
+        debaters = {"recruiteragent", "hiringmanageragent"}
+        winner = self.router.complete(
+            "judge", prompt=prompt, max_tokens=10, temperature=0.2,
+            check=lambda answer: answer.strip(' ."\'').lower() in debaters
+        )["choices"][0]["text"].strip()
 
         print(f"🏆 Debate Winner: {winner}")
 
         applicant_id = debate_state["applicant_id"]
         job_id = debate_state["job_id"]
 
-        if winner == "RecruiterAgent":
+        if winner.strip(' ."\'').lower() == "recruiteragent":
             final_flag = load_recruiter_opinion(applicant_id)["flag"]
             final_message = load_recruiter_opinion(applicant_id)["message"]
         else:
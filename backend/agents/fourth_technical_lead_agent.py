@@ -1,34 +1,25 @@
-import os
 import json
 import re
 import pika
-from llama_cpp import Llama
-from backend.config import MODEL_DIR, FOUNDATION_MODEL
+from backend.services.model_router import get_router
 from backend.services.matches_db import save_match_result
 from backend.services.AgentBase import AgentBase
 from backend.services.DebateManager import DebateManager
+from backend.services.generation_policy import get_policy
 
 class FourthTechnicalLeadAgent(AgentBase):
-    def __init__(self, model_path=os.path.join(MODEL_DIR, FOUNDATION_MODEL),
+    def __init__(self, model_path=None,
                  queue_in='agent_response_queue', queue_out='final_decision_queue'):
         super().__init__(expected_agent_name="TechnicalLeadAgent")
 
         self.queue_in = queue_in
         self.queue_out = queue_out
 
-        self.llm = Llama(
-            model_path=model_path,
-            n_ctx=4096,
-            n_threads=8,
-            n_gpu_layers=35,
-            use_mlock=True,
-            use_mmap=True,
-            verbose=False
-        )
+        self.llm = get_router().model("evaluate", model_path)
+        self.generation = get_policy("technical_lead_decision")
 
         self._setup_rabbitmq()
         self.debate_manager = DebateManager(
-            llama_model=self.llm,
             channel=self.channel,
             first_agent="TechnicalLeadAgent",
             second_agent=None,
@@ -77,9 +68,12 @@ Your task is to read through the three inputs and decide:
 Now write your summary evaluation below:
 """
 
-        response = self.llm.create_completion(prompt=prompt, max_tokens=512, temperature=0.4)
+        response = self.generation.complete(
+            lambda **budget: self.llm.create_completion(prompt=prompt, temperature=0.4, **budget), model=self.llm
+        )
         decision_text = response['choices'][0]['text'].strip()
         decision_text = decision_text.encode('utf-8', errors='ignore').decode('utf-8')
+        decision_text = self.generation.trim(decision_text)
         decision_text = re.sub(r'-{3,}', '', decision_text).lstrip()
 
         match = re.search(r'Final recommendation:\s*\*\*(Yes|No)\*\*', decision_text, re.IGNORECASE)
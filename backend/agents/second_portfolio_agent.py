@@ -1,33 +1,43 @@
 import os
 import json
 import re
+import time
 import pika
-from llama_cpp import Llama
 
-from backend.config import MODEL_DIR, REPO_ANALYSIS_DIR, FOUNDATION_MODEL
+from backend.config import (
+    REPO_ANALYSIS_DIR, PORTFOLIO_SUMMARY_DIR,
+    ANALYSIS_LOCK_DIR, ANALYSIS_LOCK_STALE_SECONDS, SUMMARY_MODEL_WORKERS, PORTFOLIO_REFRESH_INTERVAL
+)
 from backend.services.matches_db import save_match_result
 from backend.services.github_analyzer.main import PortfolioAnalyzer
 from backend.services.github_analyzer.analizes_a_repo import AnalyzeRepoForGivenUser
-
+from backend.services.github_analyzer.rate_limiter import GitHubRateLimitError
+from backend.services.github_analyzer.summary_store import PortfolioSummaryStore
+from backend.services.github_analyzer.single_flight import SingleFlightLock
+from backend.services.github_analyzer.checkpoint import is_analysis_complete
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+
+from backend.services.model_router import get_router
+from backend.services.generation_policy import get_policy
 from backend.services.AgentBase import AgentBase
 
 class SecondPortfolioAgent(AgentBase):
-    def __init__(self, model_path=os.path.join(MODEL_DIR, FOUNDATION_MODEL),
+    def __init__(self, model_path=None,
                  queue_in='resume_queue_portfolio', queue_out='agent_response_queue'):
         super().__init__(expected_agent_name="PortfolioAnalyzerAgent")
 
         self.queue_in = queue_in
         self.queue_out = queue_out
 
-        self.llm = Llama(
-            model_path=model_path,
-            n_ctx=4096,
-            n_threads=8,
-            n_gpu_layers=35,
-            use_mlock=True,
-            use_mmap=True,
-            verbose=False
-        )
+        router = get_router()
+        self.llm = router.model("evaluate", model_path)
+        self.generation = get_policy("portfolio_evaluation")
+        # While both routes use the same model, replica 0 is self.llm's instance; extra replicas let
+        # the portfolio summary map step run in parallel.
+        self.summary_models = router.model_pool("summarise", SUMMARY_MODEL_WORKERS)
+
+        # Skill scores and final summary depend only on the applicant's GitHub, not on the job.
+        self.summary_store = PortfolioSummaryStore(PORTFOLIO_SUMMARY_DIR)
 
         self._setup_rabbitmq()
 
@@ -87,13 +97,38 @@ Now, write your evaluation below (do not repeat an example):
         username = github_url.rstrip('/').split('/')[-1]
         user_dir_path = os.path.join(REPO_ANALYSIS_DIR, "analized_files", username)
 
-        if os.path.exists(user_dir_path):
-            print(f"(!) Found existing analysis for {username}, skipping PortfolioAnalyzer.")
+        # A directory that another worker is still filling is not a finished analysis;
+        # PortfolioAnalyzer.analyze waits for that worker instead of redoing its work.
+        in_progress = SingleFlightLock(username, ANALYSIS_LOCK_DIR, stale_after=ANALYSIS_LOCK_STALE_SECONDS).is_held()
+
+        if is_analysis_complete(user_dir_path) and not in_progress:
+            print(f"(!) Found existing analysis for {username}, reusing it.")
+            analyzer = PortfolioAnalyzer(github_url, applicant_info.get("skills", []))
+            last_checked = UserAnalysisStore(user_dir_path).last_checked()
+            if last_checked is None or time.time() - last_checked > PORTFOLIO_REFRESH_INTERVAL:
+                print(f"[↻] Analysis for {username} is due for a refresh, re-analysing changed files only...")
+                error = analyzer.refresh()
+            else:
+                # Only evaluates skills this applicant claims that the stored analysis never covered.
+                error = analyzer.analyze()
+            if error:
+                print(f"(!) Updating the analysis failed, using the existing one: {error}")
         else:
-            print(f"[NEW] No existing analysis for {username}, running PortfolioAnalyzer...")
+            print(f"[NEW] No complete analysis for {username}, running PortfolioAnalyzer...")
             analyzer = PortfolioAnalyzer(github_url, applicant_info.get("skills", []))
             error = analyzer.analyze()
 
+            if isinstance(error, GitHubRateLimitError):
+                print(f"(X) Portfolio analysis postponed by GitHub rate limits: {error}")
+                save_match_result(
+                    applicant_id=applicant_id,
+                    job_id=job_id,
+                    agent_name="portfolio_agent",
+                    agent_opinion="Portfolio analysis could not be completed due to GitHub API rate limits. Please try again later."
+                )
+                print(f"[SAVED] Rate-limit notice saved for applicant {applicant_id}")
+                return
+
             if error:
                 print(f"(X) Portfolio analysis failed due to bad GitHub URL: {error}")
                 save_match_result(
@@ -105,17 +140,15 @@ Now, write your evaluation below (do not repeat an example):
                 print(f"[SAVED] Failure reason saved for applicant {applicant_id}")
                 return
 
-        analyzer = AnalyzeRepoForGivenUser(github_url, llm_model=self.llm)
+        analyzer = AnalyzeRepoForGivenUser(github_url, llm_model=self.summary_models,
+                                           summary_store=self.summary_store)
         result = analyzer.get_summary_text()
 
         if not result.get("success"):
             error_msg = result.get("error", "")
             print(f"(X) Portfolio analysis failed: {error_msg}")
 
-            if "403" in error_msg and "rate limit" in error_msg.lower():
-                fallback_message = "Portfolio analysis could not be completed due to GitHub API rate limits. Please try again later."
-            else:
-                fallback_message = "Portfolio analysis failed due to a GitHub fetch error."
+            fallback_message = "Portfolio analysis failed due to a GitHub fetch error."
 
             save_match_result(
                 applicant_id=applicant_id,
@@ -140,9 +173,12 @@ Now, write your evaluation below (do not repeat an example):
         prompt = self._generate_prompt(job_posting, applicant_info, portfolio_summary)
 
         print("[LLM] Prompt sent to Llama:")
-        response = self.llm.create_completion(prompt=prompt, max_tokens=512, temperature=0.4)
+        response = self.generation.complete(
+            lambda **budget: self.llm.create_completion(prompt=prompt, temperature=0.4, **budget), model=self.llm
+        )
         raw_output = response['choices'][0]['text'].strip()
         raw_output = raw_output.encode('utf-8', errors='ignore').decode('utf-8')
+        raw_output = self.generation.trim(raw_output)
         raw_output = re.sub(r'-{3,}', '', raw_output).lstrip()
 
         print("\n(!) Cleaned Evaluation:\n", raw_output)
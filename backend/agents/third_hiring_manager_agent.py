@@ -1,37 +1,33 @@
-import os
 import json
+import hashlib
 import re
 import pika
-from llama_cpp import Llama
 
-from backend.config import MODEL_DIR, FOUNDATION_MODEL
+from backend.config import JOB_PREFIX_CACHE_SIZE
+from backend.services.model_router import get_router
 from backend.services.matches_db import save_match_result, load_recruiter_opinion
 from backend.services.AgentBase import AgentBase
 from backend.services.DebateManager import DebateManager
+from backend.services.prompt_cache import PrefixStateCache
+from backend.services.generation_policy import get_policy
 
 class ThirdHiringManagerAgent(AgentBase):
-    def __init__(self, model_path=os.path.join(MODEL_DIR, FOUNDATION_MODEL),
+    def __init__(self, model_path=None,
                  queue_in='resume_queue_hiring_manager', queue_out='agent_response_queue'):
         super().__init__(expected_agent_name="HiringManagerAgent")
 
         self.queue_in = queue_in
         self.queue_out = queue_out
 
-        self.llm = Llama(
-            model_path=model_path,
-            n_ctx=4096,
-            n_threads=8,
-            n_gpu_layers=35,
-            use_mlock=True,
-            use_mmap=True,
-            verbose=False
-        )
+        self.llm = get_router().model("evaluate", model_path)
+        # One cached KV state per recently seen job posting (LRU).
+        self.job_prompt_cache = PrefixStateCache(self.llm, capacity=JOB_PREFIX_CACHE_SIZE)
+        self.generation = get_policy("hiring_manager_evaluation")
 
         self._setup_rabbitmq()
 
         # 🆕 Initialize DebateManager
         self.debate_manager = DebateManager(
-            llama_model=self.llm,
             channel=self.channel,
             first_agent="RecruiterAgent",
             second_agent="HiringManagerAgent",
@@ -45,7 +41,11 @@ class ThirdHiringManagerAgent(AgentBase):
         self.channel.queue_declare(queue=self.queue_in)
         self.channel.queue_declare(queue=self.queue_out)
 
-    def _generate_prompt(self, job_posting, applicant_info):
+    def _generate_prompt_prefix(self, job_posting):
+        """
+        Job-dependent part of the prompt (instructions, examples, posting). It is
+        identical for every applicant matched to this job, so its KV state is cached.
+        """
         return f"""
 You are a Hiring Manager evaluating a candidate.
 
@@ -54,13 +54,8 @@ Title: {job_posting.get("title")}
 Description: {job_posting.get("description")}
 Requirements: {job_posting.get("requirements")}
 
---- Applicant Resume ---
-Skills: {applicant_info.get("skills")}
-Experience: {applicant_info.get("experience")}
-Projects: {applicant_info.get("projects")}
-Summary: {applicant_info.get("summary")}
-
 Your task:
+- The applicant's resume is given after the examples below.
 - Evaluate the candidate carefully based on the provided resume and job requirements.
 - Follow the format below strictly: 5 numbered points + a final explicit recommendation (Yes or No).
 - Item 5 must be a "Fit Score" from 0 to 10, where 0 is a very poor fit and 10 is an ideal fit.
@@ -90,16 +85,35 @@ Final recommendation: **No**
 
 ---
 
+"""
+
+    def _generate_prompt_suffix(self, applicant_info):
+        return f"""--- Applicant Resume ---
+Skills: {applicant_info.get("skills")}
+Experience: {applicant_info.get("experience")}
+Projects: {applicant_info.get("projects")}
+Summary: {applicant_info.get("summary")}
+
 Now, following the same style and level of detail, write your evaluation below:
 """
 
+    def _generate_prompt(self, job_posting, applicant_info):
+        return self._generate_prompt_prefix(job_posting) + self._generate_prompt_suffix(applicant_info)
+
     def _evaluate(self, job_posting, applicant_info):
         prompt = self._generate_prompt(job_posting, applicant_info)
         print("🧠 Prompt sent to Llama:\n", prompt)
 
-        response = self.llm.create_completion(prompt=prompt, max_tokens=400, temperature=0.4)
+        prefix = self._generate_prompt_prefix(job_posting)
+        prefix_key = hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+        suffix = self._generate_prompt_suffix(applicant_info)
+        response = self.generation.complete(
+            lambda **budget: self.job_prompt_cache.complete(prefix_key, prefix, suffix, temperature=0.4, **budget),
+            model=self.llm
+        )
         raw_output = response['choices'][0]['text'].strip()
         raw_output = raw_output.encode('utf-8', errors='ignore').decode('utf-8')
+        raw_output = self.generation.trim(raw_output)
         raw_output = re.sub(r'-{3,}', '', raw_output).lstrip()
 
         print("\n🧹 Cleaned Evaluation:\n", raw_output)
@@ -0,0 +1,57 @@
+"""
+bench_import_time.py
+────────────────────
+Import-time benchmark for the portfolio analysis stack.
+
+Each module is imported in a fresh interpreter (so nothing is cached by a
+previous import) and the wall time of the import statement is recorded.
+The run also checks that importing did not load any model.
+
+Usage
+─────
+python -m backend.benchmarks.bench_import_time [repeats]
+"""
+
+import json
+import subprocess
+import sys
+from statistics import median
+
+MODULES = [
+    "backend.services.github_analyzer.main",
+    "backend.agents.second_portfolio_agent",
+]
+TARGET_SECONDS = 1.0
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+from backend.services.model_registry import loaded_models
+print(json.dumps({{"seconds": elapsed, "models": loaded_models()}}))
+"""
+
+
+def time_import(module: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(repeats: int = 5):
+    failed = False
+    for module in MODULES:
+        runs = [time_import(module) for _ in range(repeats)]
+        seconds = median(r["seconds"] for r in runs)
+        models = sorted({m for r in runs for m in r["models"]})
+        status = "OK" if seconds < TARGET_SECONDS and not models else "SLOW"
+        failed |= status != "OK"
+        print(f"[{status}] {module}: median {seconds:.3f}s over {repeats} runs; models loaded at import: {models or 'none'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,111 @@
+"""
+bench_portfolio_fixture.py
+──────────────────────────
+End-to-end throughput of a portfolio scrape and analysis against recorded
+GitHub traffic (see github_fixtures.py) instead of live GitHub.
+
+The cassette is served by a local FixtureServer with the given per-request
+latency, and the analyzer is pointed at it through GITHUB_API_URL /
+GITHUB_RAW_URL. The scrape phase only walks the repositories; the analysis
+phase runs PortfolioAnalyzer.analyze in a scratch directory with empty
+metrics and skill caches, so every run does the same work (it loads the
+coding model unless --scrape-only is given).
+
+Both phases get their own GitHubRateLimiter with a quota far above what the
+cassette needs, and the server advertises the same budget, so no call is
+paced; time spent inside the limiter is still reported separately from the
+phase total so any pacing that does happen shows up instead of being counted
+as scraper or analyzer work.
+
+Usage
+─────
+python -m backend.benchmarks.bench_portfolio_fixture <cassette.json> <github_url> [latency_seconds] [--scrape-only]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from backend.services.github_analyzer.github_fixtures import Cassette, FixtureServer
+from backend.services.github_analyzer.rate_limiter import GitHubRateLimiter, PRIORITY_NEW
+
+SKILLS = ["python", "javascript", "data structures", "testing"]
+RATE_BUDGET = 1_000_000
+
+
+class TimedRateLimiter(GitHubRateLimiter):
+    """GitHubRateLimiter that accumulates the time callers spend in acquire()."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.wait_seconds = 0.0
+        self._wait_lock = threading.Lock()
+
+    def acquire(self, priority: int = PRIORITY_NEW):
+        start = time.perf_counter()
+        try:
+            super().acquire(priority)
+        finally:
+            with self._wait_lock:
+                self.wait_seconds += time.perf_counter() - start
+
+
+def bench_scrape(github_url: str) -> dict:
+    from backend.services.github_analyzer.github_structure_scraper import GitHubStructureScraper
+
+    limiter = TimedRateLimiter(limit=RATE_BUDGET)
+    start = time.perf_counter()
+    n_repos, file_links, _ = GitHubStructureScraper(github_url, rate_limiter=limiter).scrape()
+    return {"seconds": time.perf_counter() - start, "limiter_seconds": limiter.wait_seconds,
+            "repos": n_repos, "files": len(file_links)}
+
+
+def bench_analysis(github_url: str, scratch: str) -> dict:
+    from backend.services.github_analyzer.main import PortfolioAnalyzer
+    from backend.services.github_analyzer.code_metrics import MetricsCache
+    from backend.services.github_analyzer.skill_cache import SkillResultCache
+
+    limiter = TimedRateLimiter(limit=RATE_BUDGET)
+    analyzer = PortfolioAnalyzer(github_url, SKILLS, source=None, rate_limiter=limiter)
+    analyzer.metrics_cache = MetricsCache(os.path.join(scratch, "code_metrics.json"))
+    analyzer.skill_cache = SkillResultCache(os.path.join(scratch, "skill_results.db"),
+                                            analyzer.skill_cache.model_name, analyzer.skill_cache.prompt_version)
+    cwd = os.getcwd()
+    os.chdir(scratch)  # analyses are written relative to the working directory
+    try:
+        start = time.perf_counter()
+        error = analyzer.analyze()
+        seconds = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    if error:
+        raise error
+    return {"seconds": seconds, "limiter_seconds": limiter.wait_seconds, "files": len(analyzer.file_links)}
+
+
+def main(cassette_path: str, github_url: str, latency: float = 0.0, scrape_only: bool = False):
+    with FixtureServer(Cassette(cassette_path), latency=latency, rate_limit=RATE_BUDGET) as server:
+        # Read by backend.config, so it must be set before the analyzer modules are imported.
+        os.environ["GITHUB_API_URL"] = server.api_url
+        os.environ["GITHUB_RAW_URL"] = server.raw_url
+
+        scrape = bench_scrape(github_url)
+        print(f"[scrape] {scrape['repos']} repos, {scrape['files']} files in {scrape['seconds']:.2f}s "
+              f"({scrape['files'] / scrape['seconds']:.1f} files/s) at {latency * 1000:.0f}ms latency, "
+              f"{scrape['limiter_seconds']:.2f}s waiting on the rate limiter; "
+              f"server {server.stats()}")
+
+        if not scrape_only:
+            with tempfile.TemporaryDirectory() as scratch:
+                analysis = bench_analysis(github_url, scratch)
+            print(f"[analyze] {analysis['files']} files in {analysis['seconds']:.2f}s "
+                  f"({analysis['files'] / analysis['seconds']:.2f} files/s), "
+                  f"{analysis['limiter_seconds']:.2f}s waiting on the rate limiter; server {server.stats()}")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--scrape-only"]
+    if len(args) < 2:
+        sys.exit(__doc__)
+    main(args[0], args[1], float(args[2]) if len(args) > 2 else 0.0, "--scrape-only" in sys.argv)
@@ -0,0 +1,81 @@
+"""
+bench_prefix_cache.py
+─────────────────────
+Measures prompt-evaluation time per file for SingleScriptAnalyzer prompts
+with and without the few-shot prefix KV cache.
+
+Each prompt is completed with max_tokens=1, so the measured time is almost
+entirely prompt evaluation. The "cold" run resets the model before every
+file to force a full re-evaluation of the ~700-token preamble; the "cached"
+run restores the saved prefix state and only evaluates the file suffix.
+
+Usage
+─────
+python -m backend.benchmarks.bench_prefix_cache [n_files]
+"""
+
+import glob
+import os
+import sys
+import time
+from statistics import mean
+
+from llama_cpp import Llama
+
+from backend.config import BASE_DIR, MODEL_DIR, CODING_MODEL
+from backend.services.prompt_cache import PrefixStateCache
+from backend.services.github_analyzer.analizes_a_single_script import SingleScriptAnalyzer, FEW_SHOT_PREFIX
+
+SKILLS = ["python", "error handling", "data structures"]
+MAX_FILE_CHARS = 6000  # keep every sample inside the 4096-token context
+
+
+def load_corpus(n_files: int) -> list[tuple[str, str]]:
+    paths = sorted(glob.glob(os.path.join(BASE_DIR, "**", "*.py"), recursive=True))
+    corpus = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            code = f.read()[:MAX_FILE_CHARS]
+        if code.count("\n") >= 10:
+            corpus.append((os.path.relpath(path, BASE_DIR), code))
+        if len(corpus) == n_files:
+            break
+    return corpus
+
+
+def time_prompt_eval(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(n_files: int = 10):
+    model = Llama(model_path=os.path.join(MODEL_DIR, CODING_MODEL), n_ctx=4096, n_gpu_layers=-1, verbose=False)
+    corpus = load_corpus(n_files)
+    analyzer = SingleScriptAnalyzer("https://github.com/bench/bench/blob/main/bench.py", SKILLS, model)
+    prefix_tokens = len(model.tokenize(FEW_SHOT_PREFIX.encode("utf-8")))
+    print(f"[*] {len(corpus)} files, few-shot prefix = {prefix_tokens} tokens")
+
+    cold = []
+    for _, code in corpus:
+        model.reset()
+        cold.append(time_prompt_eval(lambda: model.create_completion(prompt=analyzer.generate_prompt(code), max_tokens=1)))
+
+    cache = PrefixStateCache(model)
+    cache.complete("few_shot", FEW_SHOT_PREFIX, "", max_tokens=1)  # build the snapshot once
+    cached = []
+    for _, code in corpus:
+        cached.append(time_prompt_eval(
+            lambda: cache.complete("few_shot", FEW_SHOT_PREFIX, analyzer.generate_prompt_suffix(code), max_tokens=1)
+        ))
+
+    print(f"\n{'file':50} {'cold (s)':>10} {'cached (s)':>11}")
+    for (name, _), c, w in zip(corpus, cold, cached):
+        print(f"{name[:50]:50} {c:10.3f} {w:11.3f}")
+    print(f"\n[RESULT] mean prompt-eval per file: cold {mean(cold):.3f}s, cached {mean(cached):.3f}s "
+          f"({mean(cold) / max(mean(cached), 1e-9):.1f}x)")
+    print(f"[RESULT] cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
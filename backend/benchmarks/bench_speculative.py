@@ -0,0 +1,98 @@
+"""
+bench_speculative.py
+────────────────────
+Decode throughput of the foundation model with and without prompt-lookup
+speculative decoding on the two copy-heavy workloads it is meant for:
+resume / job-posting extraction (Preprocessor prompts) and debate
+rebuttals (DebateManager prompts).
+
+The corpus is fixed: the PDFs under backend/uploads, cleaned exactly as the
+pre-processing pipeline does, plus canned opponent opinions for the
+rebuttals. Extraction uses the same JSON grammar as production. Completions
+are greedy so both modes should decode the same text, and the run reports
+how many outputs matched.
+
+Usage
+─────
+python -m backend.benchmarks.bench_speculative [draft_tokens]
+"""
+
+import gc
+import glob
+import os
+import sys
+import time
+
+from llama_cpp import Llama
+
+from backend.config import MODEL_DIR, FOUNDATION_MODEL, RAW_APPLICANT_DIR, RAW_JOB_POSTING_DIR, LLM_SETTINGS
+from backend.pre_processing.cleans_before_parsing import FilePreprocessor
+from backend.pre_processing.LLM_parser import MAX_TOKENS, Preprocessor
+from backend.services.DebateManager import rebuttal_prompt
+from backend.services.model_registry import draft_model_kwargs
+
+OPPONENT_OPINIONS = [
+    "The candidate lists Python and SQL but every project is a class assignment; there is no production "
+    "experience, no evidence of testing, and the Fit Score of 8/10 is not justified. Final recommendation: **No**",
+    "Strong backend background: three years building REST APIs in Django, led a migration to PostgreSQL and "
+    "mentored two interns. Skills match the posting closely. Final recommendation: **Yes**",
+    "The portfolio shows only small scripts and a to-do app in React; claims of distributed systems experience "
+    "are not backed by any repository. Final recommendation: **No**",
+]
+
+
+def load_corpus() -> list[tuple[str, str]]:
+    cleaner = FilePreprocessor()
+    corpus = []
+    for folder, mode in [(RAW_APPLICANT_DIR, "applicants"), (RAW_JOB_POSTING_DIR, "jobPostings")]:
+        for path in sorted(glob.glob(os.path.join(folder, "*.pdf"))):
+            text = cleaner.extract_text_from_pdf(path)
+            if text:
+                corpus.append((mode, cleaner.clean_text(text)))
+    return corpus
+
+
+def run_workloads(model, corpus) -> dict:
+    results = {"extraction": [], "rebuttal": []}
+    for mode, text in corpus:
+        parser = Preprocessor(mode, llm=model)
+        results["extraction"].append(timed(model, parser._generate_prompt(text), MAX_TOKENS, grammar=parser.grammar))
+    for opinion in OPPONENT_OPINIONS:
+        results["rebuttal"].append(timed(model, rebuttal_prompt("RecruiterAgent", opinion), 80))
+    return results
+
+
+def timed(model, prompt, max_tokens, **kwargs) -> tuple[str, int, float]:
+    model.reset()
+    start = time.perf_counter()
+    response = model.create_completion(prompt=prompt, max_tokens=max_tokens, temperature=0.0, **kwargs)
+    seconds = time.perf_counter() - start
+    return response["choices"][0]["text"], response["usage"]["completion_tokens"], seconds
+
+
+def throughput(runs) -> float:
+    return sum(tokens for _, tokens, _ in runs) / max(sum(seconds for _, _, seconds in runs), 1e-9)
+
+
+def main(draft_tokens: int = 10):
+    corpus = load_corpus()
+    model_path = os.path.join(MODEL_DIR, FOUNDATION_MODEL)
+    print(f"[*] {len(corpus)} documents, {len(OPPONENT_OPINIONS)} rebuttals, draft_tokens={draft_tokens}")
+
+    measured = {}
+    for label, extra in [("baseline", {}), ("prompt-lookup", draft_model_kwargs(draft_tokens))]:
+        model = Llama(model_path=model_path, **LLM_SETTINGS, **extra)
+        measured[label] = run_workloads(model, corpus)
+        del model
+        gc.collect()
+
+    for workload in ("extraction", "rebuttal"):
+        base, spec = measured["baseline"][workload], measured["prompt-lookup"][workload]
+        same = sum(b[0] == s[0] for b, s in zip(base, spec))
+        print(f"[RESULT] {workload:10}: baseline {throughput(base):6.1f} tok/s, prompt-lookup "
+              f"{throughput(spec):6.1f} tok/s ({throughput(spec) / max(throughput(base), 1e-9):.2f}x); "
+              f"identical outputs {same}/{len(base)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -16,6 +16,7 @@ MATCHES_DB_PATH = os.path.join(BASE_DIR, "databases", "matches.db")
 MODEL_DIR =  os.path.join(BASE_DIR, 'models')
 FOUNDATION_MODEL = "mistral-7b-instruct-v0.1.Q4_K_M.gguf"
 CODING_MODEL = "deepseek-coder-1.3b-instruct.Q4_K_M.gguf"
+LIGHT_MODEL = "qwen2.5-1.5b-instruct-q4_k_m.gguf"  # small quantised model for short, simple outputs
 
 # - Repo Analysis directories -
 REPO_ANALYSIS_DIR = os.path.join(BASE_DIR, 'services', 'github_analyzer')
@@ -23,6 +24,71 @@ ANALYZE_EACH_SCRIPT_BACKGROUND_DIR = os.path.join(REPO_ANALYSIS_DIR, 'main.py')
 REPO_STRUCTURE = os.path.join(REPO_ANALYSIS_DIR, 'github_structure_scraper.py')
 REPO_SUMMARY_ASSESSMENT = os.path.join(REPO_ANALYSIS_DIR, 'analizes_a_repo.py')
 
+ANALYSIS_CACHE_DIR = os.path.join(REPO_ANALYSIS_DIR, 'cache')
+CODE_METRICS_CACHE_PATH = os.path.join(ANALYSIS_CACHE_DIR, 'code_metrics.json')
+PORTFOLIO_SUMMARY_DIR = os.path.join(ANALYSIS_CACHE_DIR, 'summaries')
+SKILL_CACHE_PATH = os.path.join(ANALYSIS_CACHE_DIR, 'skill_results.db')
+ANALYSIS_LOCK_DIR = os.path.join(ANALYSIS_CACHE_DIR, 'locks')
+ANALYSIS_LOCK_STALE_SECONDS = 120  # a lock not refreshed for this long belongs to a dead worker
+
+# - GitHub endpoints (overridable to replay recorded traffic, see github_fixtures.py) -
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+GITHUB_RAW_URL = os.environ.get('GITHUB_RAW_URL', 'https://raw.githubusercontent.com')
+
+# - Local git mirror (None = analyse through the GitHub API) -
+# Directory or file:// URL laid out as <source>/<username>/<repo>; see local_git_scraper.py
+PORTFOLIO_GIT_SOURCE = os.environ.get('PORTFOLIO_GIT_SOURCE')
+LOCAL_GIT_CLONE_DIR = os.path.join(ANALYSIS_CACHE_DIR, 'git')
+
+# - Portfolio analysis budget (None = unlimited) -
+# A file or token limit needs the whole listing to pick a representative sample, so the analysis only
+# starts once every repository has been scraped. Unlimited, repositories are analysed page by page as
+# they stream in. Suggested limits for large portfolios: 60 files / 120_000 tokens.
+PORTFOLIO_MAX_FILES = None
+PORTFOLIO_MAX_TOKENS = None
+PORTFOLIO_MAX_SECONDS = 30 * 60
+PORTFOLIO_REFRESH_INTERVAL = 7 * 24 * 3600  # re-check a finished analysis against GitHub at most this often
+
+# - Portfolio summary map/reduce -
+SUMMARY_MODEL_WORKERS = 1  # foundation-model replicas summarising batches concurrently (~4.5GB RAM/VRAM each)
+
+# - Generation budgets (observed output lengths per task, see generation_policy.py) -
+GENERATION_STATS_DIR = os.path.join(BASE_DIR, 'databases', 'generation_stats')
+
+# - Speculative decoding -
+# Prompt-lookup draft tokens for extraction (Preprocessor) and debate rebuttals; 0 disables it.
+# A drafting model forces logits for every position (~0.5GB extra for Mistral-7B at n_ctx=4096).
+SPECULATIVE_DRAFT_TOKENS = 0
+
+# - Local model loading -
+# llama.cpp settings every in-process model is loaded with (router routes, Preprocessor, benchmarks).
+LLM_SETTINGS = dict(n_ctx=4096, n_threads=8, n_gpu_layers=35, use_mlock=True, use_mmap=True, verbose=False)
+
+# - Shared inference servers (see services/inference_server.py) -
+# When set, get_model hands out a client for the server holding that model instead of loading it in
+# the process, so all agents share one copy and their concurrent requests are batched together.
+INFERENCE_SERVERS = {
+    FOUNDATION_MODEL: os.environ.get('FOUNDATION_MODEL_SERVER'),  # e.g. http://127.0.0.1:8081
+    CODING_MODEL: os.environ.get('CODING_MODEL_SERVER'),
+    LIGHT_MODEL: os.environ.get('LIGHT_MODEL_SERVER'),
+}
+INFERENCE_SERVER_PARALLEL = 4  # concurrent sequences (slots) per server, each with its own n_ctx
+
+# - Model routing by task (see services/model_router.py) -
+# `model` serves the task; `fallback` takes over when that model is not installed and re-runs a completion
+# whose output failed the route's quality check. Routes on the same model share one loaded instance.
+MODEL_ROUTES = {
+    "parse": dict(model=FOUNDATION_MODEL),              # resume / job posting extraction
+    "evaluate": dict(model=FOUNDATION_MODEL),           # agent evaluations with a final verdict
+    "summarise": dict(model=FOUNDATION_MODEL),          # portfolio summary map/reduce
+    "rebut": dict(model=LIGHT_MODEL, fallback=FOUNDATION_MODEL),  # <50-word debate rebuttals
+    "judge": dict(model=LIGHT_MODEL, fallback=FOUNDATION_MODEL),  # debate winner, one agent name
+}
+ROUTE_METRICS_PATH = os.path.join(BASE_DIR, 'databases', 'route_metrics.db')
+
+# - Prompt KV caches -
+JOB_PREFIX_CACHE_SIZE = 4  # job postings whose evaluated prompt prefix is kept per agent (~100MB each for Mistral-7B)
+
 # - Agent directories -
 RECRUITER_AGENT_DIR = os.path.join(BASE_DIR, 'agents', "first_recruiter_agent.py")
 PORTFOLIO_AGENT_DIR = os.path.join(BASE_DIR, 'agents', "second_portfolio_agent.py")
@@ -9,21 +9,36 @@ Class
 • Preprocessor
     - Initializes a local LLM model.
     - Constructs prompts for either applicant resumes or job postings.
-    - Extracts structured JSON from raw text using the LLM and robust parsing logic.
+    - Extracts structured JSON from raw text using grammar-constrained decoding,
+      with the robust repair logic as a fallback.
 
 Methods
 ───────
-• __init__(mode: str, model_path: str)
+• __init__(mode: str, model_path: str, llm=None)
       Initializes the preprocessor in either "applicants" or "jobPostings" mode.
-      Loads the foundation model with mmap/gpu settings.
+      Uses the model of the "parse" route (see model_router) unless
+      `model_path` or `llm` is given.
 
 • _generate_prompt(text: str) -> str
       Returns a task-specific prompt to instruct the LLM to extract structured data 
       from raw input (resume or job posting).
 
 • process_text(text: str) -> dict | None
-      Sends the generated prompt to the LLM, extracts the first JSON object from 
-      its response, and safely parses it with `json` or `json5` fallback.
+      Sends the generated prompt to the LLM with a JSON-schema grammar for the
+      mode, so the completion is a valid JSON object that ends as soon as the
+      object closes. Output that still does not parse (no grammar support,
+      truncated at max_tokens) goes through `_repair_and_parse`. A shared
+      inference server gets the schema itself as `json_schema`.
+
+• _repair_and_parse(raw_output: str) -> dict
+      Extracts the first JSON object from free-form output, patches common
+      truncation damage and parses it with `json` or the `json5` fallback.
+
+Functions
+─────────
+• parse_stats() -> dict
+      How many parses succeeded first try ("clean"), needed the repair path
+      ("repaired") or failed, in this process.
 
 Usage
 ─────
@@ -39,35 +54,65 @@ parsed = parser.process_text("Jane Doe is a software engineer...")
 """
 
 import re
-import os
 import json
+import threading
 import json5
-from llama_cpp import Llama
 
-from backend.config import MODEL_DIR, FOUNDATION_MODEL
+from backend.services.model_router import get_router
 
 RED = "\033[91m"
 GREEN = "\033[92m"
+YELLOW = "\033[93m"
 RESET = "\033[0m"
 
+MAX_TOKENS = 400
+
+def _string_object(*fields):
+    return {
+        "type": "object",
+        "properties": {field: {"type": "string"} for field in fields},
+        "required": list(fields),
+        "additionalProperties": False,
+    }
+
+SCHEMAS = {
+    "applicants": _string_object("name", "github", "portfolio", "skills", "experience", "projects", "summary"),
+    "jobPostings": _string_object("title", "description", "requirements"),
+}
+
+_grammars = {}
+_grammar_lock = threading.Lock()
+_stats = {"clean": 0, "repaired": 0, "failed": 0}
+
+def parse_stats():
+    return dict(_stats)
+
+def _grammar_for(mode):
+    """
+    Compiled GBNF grammar for the mode's schema, built once per process.
+    None when llama_cpp cannot build it; output is then repaired instead.
+    """
+    with _grammar_lock:
+        if mode not in _grammars:
+            try:
+                from llama_cpp import LlamaGrammar
+                _grammars[mode] = LlamaGrammar.from_json_schema(json.dumps(SCHEMAS[mode]), verbose=False)
+            except Exception as e:
+                print(f"(preprocessor.py)[W] No JSON grammar for {mode}, relying on output repair: {e}")
+                _grammars[mode] = None
+        return _grammars[mode]
+
 class Preprocessor:
-    def __init__(self, mode="applicants", model_path=os.path.join(MODEL_DIR, FOUNDATION_MODEL)):
+    def __init__(self, mode="applicants", model_path=None, llm=None):
         """
         Initializes the Preprocessor for either applicants or job postings.
-        Loads the local LLM model.
+        Uses the process-wide LLM instead of loading one per document.
         """
         assert mode in ["applicants", "jobPostings"]
         self.mode = mode
-
-        self.llm = Llama(
-            model_path=model_path,
-            n_ctx=4096,
-            n_threads=8,
-            n_gpu_layers=35,
-            use_mlock=True,
-            use_mmap=True,
-            verbose=False
-        )
+        self.llm = llm or get_router().model("parse", model_path)
+        # A shared inference server compiles the schema itself; llama_cpp is not needed in this process.
+        self.grammar = None if getattr(self.llm, "accepts_json_schema", False) else _grammar_for(mode)
 
     def _generate_prompt(self, text):
         """
@@ -131,97 +176,36 @@ class Preprocessor:
 
     def process_text(self, text):
         """
-        Sends resume or job posting to LLM, extracts the first valid JSON object, and parses it robustly.
-        Falls back to json5 if standard parsing fails. Recovers from unterminated strings, broken summary fields,
-        stray braces inside strings, and missing closing characters.
+        Sends resume or job posting to the LLM and parses its JSON object. With a grammar the
+        completion is valid JSON by construction; anything else falls back to _repair_and_parse.
         """
-
-        import re
-
-        RED = "\033[91m"
-        GREEN = "\033[92m"
-        YELLOW = "\033[93m"
-        RESET = "\033[0m"
-
         prompt = self._generate_prompt(text)
-        response = self.llm.create_completion(prompt=prompt, max_tokens=400, temperature=0.5)
+        if getattr(self.llm, "accepts_json_schema", False):
+            kwargs = {"json_schema": SCHEMAS[self.mode]}
+        else:
+            kwargs = {"grammar": self.grammar} if self.grammar is not None else {}
+        response = self.llm.create_completion(prompt=prompt, max_tokens=MAX_TOKENS, temperature=0.5, **kwargs)
         raw_output = response['choices'][0]['text']
 
         try:
-            json_start = raw_output.find('{')
-            if json_start == -1:
-                raise ValueError("No opening '{' found in LLM output.")
-
-            brace_count = 0
-            json_end = None
-            for i, char in enumerate(raw_output[json_start:], start=json_start):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        json_end = i + 1
-                        break
-
-            # Extract the JSON chunk
-            if json_end is None:
-                cleaned_output = raw_output[json_start:].strip()
-                if not cleaned_output.endswith("}"):
-                    print(f"{YELLOW}(preprocessor.py)[W] Missing closing brace — appending one.{RESET}")
-                    cleaned_output += "}"
-            else:
-                cleaned_output = raw_output[json_start:json_end].strip()
-
-            # Special fix: if summary is cut off and there's no closing quote or brace
-            if '"summary":' in cleaned_output and not cleaned_output.strip().endswith('"}'):
-                print(f"{YELLOW}(preprocessor.py)[W] Fixing incomplete 'summary' field manually...{RESET}")
-                match = re.search(r'"summary"\s*:\s*"(.*?)$', cleaned_output, re.DOTALL)
-                if match:
-                    partial_summary = match.group(1)
-                    cutoff = max(partial_summary.rfind("."), partial_summary.rfind("!"), partial_summary.rfind("?"))
-                    if cutoff != -1:
-                        partial_summary = partial_summary[:cutoff+1]
-                    else:
-                        partial_summary = partial_summary[:1000]  # safe fallback
-                    cleaned_output = re.sub(
-                        r'"summary"\s*:\s*".*?$',
-                        f'"summary": "{partial_summary}"',
-                        cleaned_output,
-                        flags=re.DOTALL
-                    )
-                    if not cleaned_output.strip().endswith("}"):
-                        cleaned_output += "}"
-
-            # Fix: remove a stray '}' inside final quoted field (e.g., "...projects.}")
-            if cleaned_output.strip().endswith('}"}') or re.search(r'"summary"\s*:\s*".*}"}\s*$', cleaned_output):
-                print(f"{YELLOW}(preprocessor.py)[W] Stray closing brace inside quoted field — trimming it.{RESET}")
-                cleaned_output = re.sub(r'"}\s*$', '"', cleaned_output)
-
-            # Final patches for quote and brace
-            if cleaned_output.count('"') % 2 != 0:
-                print(f"{YELLOW}(preprocessor.py)[W] Detected unclosed string — appending final quote{RESET}")
-                cleaned_output += '"'
-            if not cleaned_output.strip().endswith("}"):
-                cleaned_output += "}"
-
-            print(f"\n(preprocessor.py)[CHECK] Final Cleaned JSON:\n{cleaned_output}\n")
-
-            # Parse with json first, then fallback to json5
-            try:
-                parsed = json.loads(cleaned_output)
-                print(f"{GREEN}(preprocessor.py)[✓] Parsed with standard json.{RESET}")
-            except json.JSONDecodeError as e1:
-                print(f"{YELLOW}(preprocessor.py)[W] Standard JSON failed: {e1}{RESET}")
-                print(f"{YELLOW}(preprocessor.py)[W] Trying json5 fallback...{RESET}")
-                try:
-                    parsed = json5.loads(cleaned_output)
-                    print(f"{GREEN}(preprocessor.py)[✓] Parsed with json5 fallback.{RESET}")
-                except Exception as e2:
-                    raise ValueError(f"Both parsers failed: {e2}")
-
+            parsed = json.loads(raw_output)
+            if isinstance(parsed, dict):
+                _stats["clean"] += 1
+                print(f"{GREEN}(preprocessor.py)[✓] Parsed model output directly.{RESET}")
+                return parsed
+        except json.JSONDecodeError:
+            pass
+
+        finish_reason = response['choices'][0].get('finish_reason')
+        print(f"{YELLOW}(preprocessor.py)[W] Output is not a clean JSON object (finish: {finish_reason}), "
+              f"repairing. Parse stats so far: {parse_stats()}{RESET}")
+        try:
+            parsed = self._repair_and_parse(raw_output)
+            _stats["repaired"] += 1
             return parsed
 
         except Exception as e:
+            _stats["failed"] += 1
             print("\n" + "="*50)
             print(f"{RED}ERROR{RESET}")
             print("="*50)
@@ -230,3 +214,82 @@ class Preprocessor:
             print(raw_output.strip())
             print("\n" + "="*50 + "\n")
             return None
+
+    def _repair_and_parse(self, raw_output):
+        """
+        Extracts the first valid JSON object from free-form output and parses it robustly.
+        Falls back to json5 if standard parsing fails. Recovers from unterminated strings, broken summary fields,
+        stray braces inside strings, and missing closing characters.
+        """
+        json_start = raw_output.find('{')
+        if json_start == -1:
+            raise ValueError("No opening '{' found in LLM output.")
+
+        brace_count = 0
+        json_end = None
+        for i, char in enumerate(raw_output[json_start:], start=json_start):
+            if char == '{':
+                brace_count += 1
+            elif char == '}':
+                brace_count -= 1
+                if brace_count == 0:
+                    json_end = i + 1
+                    break
+
+        # Extract the JSON chunk
+        if json_end is None:
+            cleaned_output = raw_output[json_start:].strip()
+            if not cleaned_output.endswith("}"):
+                print(f"{YELLOW}(preprocessor.py)[W] Missing closing brace — appending one.{RESET}")
+                cleaned_output += "}"
+        else:
+            cleaned_output = raw_output[json_start:json_end].strip()
+
+        # Special fix: if summary is cut off and there's no closing quote or brace
+        if '"summary":' in cleaned_output and not cleaned_output.strip().endswith('"}'):
+            print(f"{YELLOW}(preprocessor.py)[W] Fixing incomplete 'summary' field manually...{RESET}")
+            match = re.search(r'"summary"\s*:\s*"(.*?)$', cleaned_output, re.DOTALL)
+            if match:
+                partial_summary = match.group(1)
+                cutoff = max(partial_summary.rfind("."), partial_summary.rfind("!"), partial_summary.rfind("?"))
+                if cutoff != -1:
+                    partial_summary = partial_summary[:cutoff+1]
+                else:
+                    partial_summary = partial_summary[:1000]  # safe fallback
+                cleaned_output = re.sub(
+                    r'"summary"\s*:\s*".*?$',
+                    f'"summary": "{partial_summary}"',
+                    cleaned_output,
+                    flags=re.DOTALL
+                )
+                if not cleaned_output.strip().endswith("}"):
+                    cleaned_output += "}"
+
+        # Fix: remove a stray '}' inside final quoted field (e.g., "...projects.}")
+        if cleaned_output.strip().endswith('}"}') or re.search(r'"summary"\s*:\s*".*}"}\s*$', cleaned_output):
+            print(f"{YELLOW}(preprocessor.py)[W] Stray closing brace inside quoted field — trimming it.{RESET}")
+            cleaned_output = re.sub(r'"}\s*$', '"', cleaned_output)
+
+        # Final patches for quote and brace
+        if cleaned_output.count('"') % 2 != 0:
+            print(f"{YELLOW}(preprocessor.py)[W] Detected unclosed string — appending final quote{RESET}")
+            cleaned_output += '"'
+        if not cleaned_output.strip().endswith("}"):
+            cleaned_output += "}"
+
+        print(f"\n(preprocessor.py)[CHECK] Final Cleaned JSON:\n{cleaned_output}\n")
+
+        # Parse with json first, then fallback to json5
+        try:
+            parsed = json.loads(cleaned_output)
+            print(f"{GREEN}(preprocessor.py)[✓] Parsed with standard json.{RESET}")
+        except json.JSONDecodeError as e1:
+            print(f"{YELLOW}(preprocessor.py)[W] Standard JSON failed: {e1}{RESET}")
+            print(f"{YELLOW}(preprocessor.py)[W] Trying json5 fallback...{RESET}")
+            try:
+                parsed = json5.loads(cleaned_output)
+                print(f"{GREEN}(preprocessor.py)[✓] Parsed with json5 fallback.{RESET}")
+            except Exception as e2:
+                raise ValueError(f"Both parsers failed: {e2}")
+
+        return parsed
@@ -1,9 +1,21 @@
 import json
 from backend.services.matches_db import save_match_result, load_recruiter_opinion, upload_debates
+from backend.services.model_router import get_router
+
+def rebuttal_prompt(agent_name, opponent_opinion):
+    return f"""
+You are {agent_name} rebutting in a candidate hiring debate.
+
+Opponent said:
+"{opponent_opinion}"
+
+Reply with a **sharp rebuttal under 50 words**.
+"""
 
 class DebateManager:
-    def __init__(self, llama_model, channel, first_agent, second_agent, first_queue, second_queue):
-        self.llm = llama_model
+    def __init__(self, channel, first_agent, second_agent, first_queue, second_queue):
+        # Rebuttals and the winner pick are short outputs; MODEL_ROUTES decides which model writes them.
+        self.router = get_router()
         self.channel = channel
         self.first_agent = first_agent
         self.second_agent = second_agent
@@ -48,16 +60,9 @@ class DebateManager:
         next_agent_queue = self.second_queue if agent_name == self.first_agent else self.first_queue
         next_agent_name = self.second_agent if agent_name == self.first_agent else self.first_agent
 
-        prompt = f"""
-You are {agent_name} rebutting in a candidate hiring debate.
-
-Opponent said:
-"{opponent_opinion}"
-
-Reply with a **sharp rebuttal under 50 words**.
-"""
+        prompt = rebuttal_prompt(agent_name, opponent_opinion)
 
-        response = self.llm.create_completion(prompt=prompt, max_tokens=80, temperature=0.4)
+        response = self.router.complete("rebut", prompt=prompt, max_tokens=80, temperature=0.4)
         rebuttal = response['choices'][0]['text'].strip()
 
         print(f"⚔️ {agent_name} rebuttal:\n{rebuttal}")
@@ -107,8 +112,10 @@ Reply with a **sharp rebuttal under 50 words**.
         Which agent presented stronger arguments overall?
         Answer exactly "{self.first_agent}" or "{self.second_agent}" and nothing else.
         """
-        winner = self.llm.create_completion(
-            prompt=winner_prompt, max_tokens=10, temperature=0.2
+        debaters = {self.first_agent.lower(), self.second_agent.lower()}
+        winner = self.router.complete(
+            "judge", prompt=winner_prompt, max_tokens=10, temperature=0.2,
+            check=lambda answer: answer.strip(' ."\'').lower() in debaters
         )["choices"][0]["text"].strip()
 
         # ------------------------------------------------------
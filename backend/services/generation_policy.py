@@ -0,0 +1,195 @@
+"""
+generation_policy.py
+────────────────────
+Decode budgets for the agents' LLM outputs.
+
+Every agent evaluation ends with "Final recommendation: **Yes/No**", yet
+completions used to run to a fixed max_tokens (400-512) and were trimmed
+afterwards, so each evaluation paid for decoding text that was thrown
+away. A GenerationPolicy per task
+
+- passes stop sequences (the model starting another example or echoing a
+  prompt section) to llama.cpp,
+- stops decoding as soon as the verdict pattern has been emitted, through
+  a llama.cpp stopping criterion, and
+- sizes max_tokens from the output lengths actually observed for the task
+  (a high quantile plus headroom, never above the task's cap). A
+  completion cut off by the adaptive budget is retried once with the cap.
+
+Observed lengths are kept per task in GENERATION_STATS_DIR so restarted
+agents start from the learned budget.
+
+Class
+─────
+• GenerationPolicy(task, max_tokens, stop=(), stop_pattern=None, ...)
+    - max_tokens() -> int                 current adaptive budget
+    - complete(generate, model=None) -> dict
+          Runs `generate(**kwargs)` (create_completion or
+          PrefixStateCache.complete) with the policy's max_tokens, stop and
+          stopping criterion, then records the output length.
+    - trim(text) -> str                   drops anything after the verdict
+    - stats() -> dict
+
+Functions
+─────────
+• get_policy(task) -> GenerationPolicy
+      Process-wide policy for one of the tasks in TASK_POLICIES.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from collections import deque
+
+from backend.config import GENERATION_STATS_DIR
+
+VERDICT_PATTERN = re.compile(r"Final recommendation:\s*\*\*(Yes|No)\*\*", re.IGNORECASE)
+
+# The evaluation prompts show examples and then the applicant; a model that keeps going past its
+# own evaluation starts another example or echoes one of those sections.
+EVALUATION_STOPS = ["\nExample ", "--- Job Posting", "--- Applicant", "--- Portfolio Analysis"]
+
+TASK_POLICIES = {
+    "recruiter_evaluation": dict(max_tokens=400, stop=EVALUATION_STOPS, stop_pattern=VERDICT_PATTERN),
+    "hiring_manager_evaluation": dict(max_tokens=400, stop=EVALUATION_STOPS, stop_pattern=VERDICT_PATTERN),
+    "portfolio_evaluation": dict(max_tokens=512, stop=EVALUATION_STOPS, stop_pattern=VERDICT_PATTERN),
+    "technical_lead_decision": dict(
+        max_tokens=512, stop_pattern=VERDICT_PATTERN,
+        stop=["--- RecruiterAgent", "--- PortfolioAgent", "--- HiringManagerAgent"],
+    ),
+    "hr_compliance_evaluation": dict(max_tokens=400, stop=EVALUATION_STOPS, stop_pattern=VERDICT_PATTERN),
+}
+
+MIN_SAMPLES = 20         # observations before the budget adapts
+HISTORY_SIZE = 200       # most recent output lengths kept per task
+QUANTILE = 0.95
+HEADROOM = 1.2
+MIN_BUDGET = 96
+PATTERN_WINDOW_TOKENS = 32  # the verdict is a handful of tokens; only the tail is detokenized
+
+
+class _PatternStop:
+    """llama.cpp stopping criterion that fires once `pattern` appears in the generated text."""
+
+    def __init__(self, model, pattern: re.Pattern):
+        self.model = model
+        self.pattern = pattern
+        self.prompt_length = None
+
+    def __call__(self, input_ids, logits) -> bool:
+        if self.prompt_length is None:
+            # The first call comes before any token was generated.
+            self.prompt_length = len(input_ids)
+            return False
+        start = max(self.prompt_length, len(input_ids) - PATTERN_WINDOW_TOKENS)
+        tail = self.model.detokenize(list(input_ids[start:])).decode("utf-8", errors="ignore")
+        return self.matches_text(tail)
+
+    def matches_text(self, text: str) -> bool:
+        """Text-level check, used by InferenceClient while streaming from a shared server."""
+        return self.pattern.search(text) is not None
+
+
+class GenerationPolicy:
+    def __init__(self, task: str, max_tokens: int, stop=(), stop_pattern: re.Pattern | None = None,
+                 stats_dir: str | None = GENERATION_STATS_DIR):
+        self.task = task
+        self.cap = max_tokens
+        self.stop = list(stop)
+        self.stop_pattern = stop_pattern
+        self.stats_path = os.path.join(stats_dir, f"{task}.json") if stats_dir else None
+        self.lengths = deque(maxlen=HISTORY_SIZE)
+        self.counters = {"completions": 0, "verdict_stops": 0, "retries": 0}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.stats_path:
+            return
+        try:
+            with open(self.stats_path, encoding="utf-8") as f:
+                self.lengths.extend(json.load(f).get("lengths", []))
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def _save(self):
+        if not self.stats_path:
+            return
+        os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+        tmp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"lengths": list(self.lengths)}, f)
+        os.replace(tmp_path, self.stats_path)
+
+    def max_tokens(self) -> int:
+        with self._lock:
+            if len(self.lengths) < MIN_SAMPLES:
+                return self.cap
+            ordered = sorted(self.lengths)
+            quantile = ordered[min(len(ordered) - 1, math.ceil(QUANTILE * len(ordered)) - 1)]
+        return max(MIN_BUDGET, min(self.cap, math.ceil(quantile * HEADROOM)))
+
+    def _observe(self, response: dict, budget: int):
+        finish_reason = response["choices"][0].get("finish_reason")
+        tokens = response.get("usage", {}).get("completion_tokens")
+        with self._lock:
+            self.counters["completions"] += 1
+            if tokens is None:
+                return
+            # A completion that hit its budget would have been longer: record it as the budget it used up.
+            self.lengths.append(budget if finish_reason == "length" else tokens)
+            self._save()
+
+    def _kwargs(self, budget: int, model) -> dict:
+        kwargs = {"max_tokens": budget}
+        if self.stop:
+            kwargs["stop"] = self.stop
+        if self.stop_pattern is not None and model is not None and hasattr(model, "detokenize"):
+            kwargs["stopping_criteria"] = _PatternStop(model, self.stop_pattern)
+        return kwargs
+
+    def complete(self, generate, model=None) -> dict:
+        budget = self.max_tokens()
+        response = generate(**self._kwargs(budget, model))
+        self._observe(response, budget)
+
+        choice = response["choices"][0]
+        verdict = self.stop_pattern is not None and self.stop_pattern.search(choice["text"]) is not None
+        if choice.get("finish_reason") == "length" and budget < self.cap and not verdict:
+            with self._lock:
+                self.counters["retries"] += 1
+            print(f"(generation_policy)[W] {self.task}: output exceeded the adaptive budget of {budget} "
+                  f"tokens, retrying with {self.cap}.")
+            response = generate(**self._kwargs(self.cap, model))
+            self._observe(response, self.cap)
+            verdict = self.stop_pattern is not None and self.stop_pattern.search(response["choices"][0]["text"])
+
+        if verdict and response["choices"][0].get("finish_reason") != "length":
+            with self._lock:
+                self.counters["verdict_stops"] += 1
+        return response
+
+    def trim(self, text: str) -> str:
+        if self.stop_pattern is None:
+            return text
+        match = self.stop_pattern.search(text)
+        return text[:match.end()] if match else text
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            samples = len(self.lengths)
+        return {"task": self.task, "max_tokens": self.max_tokens(), "samples": samples, **counters}
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(task: str) -> GenerationPolicy:
+    with _policies_lock:
+        if task not in _policies:
+            _policies[task] = GenerationPolicy(task, **TASK_POLICIES[task])
+        return _policies[task]
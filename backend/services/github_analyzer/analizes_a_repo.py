@@ -1,18 +1,53 @@
 import os
-import json
-import re
-from collections import defaultdict
-from statistics import mean
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.services.github_analyzer.chunking import count_tokens, split_text, truncate_to_tokens
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+from backend.services.github_analyzer.skill_results import extract_json_object
+from backend.services.github_analyzer.summary_store import PortfolioSummaryStore, analysis_digest
+from backend.services.github_analyzer.single_flight import SingleFlightLock
 
 ANALYSIS_ROOT = os.path.join("backend", "services", "github_analyzer", "analized_files")
 
+DEFAULT_CONTEXT_SIZE = 4096
+SUMMARY_MAX_TOKENS = 512
+CONTEXT_SAFETY_MARGIN = 64
 
-def normalize_skill(skill: str) -> str:
-    return re.sub(r"[-_\s]+", " ", skill.lower().strip())
+CHUNK_SUMMARY_PROMPT = """
+You are a senior developer evaluating the portfolio of a candidate.
+Below is a batch of project assessments evaluating their code across various skills.
+Summarize this batch by describing the strengths and weaknesses demonstrated:
+
+Assessments:
+{body}
+
+Partial Summary:
+"""
+
+MERGE_SUMMARY_PROMPT = """
+You are a senior developer evaluating the portfolio of a candidate.
+Below are partial summaries of different parts of their portfolio.
+Merge them into one summary that keeps every strength and weakness they mention:
+
+Partial Summaries:
+{body}
+
+Merged Summary:
+"""
+
+FINAL_SUMMARY_PROMPT = """
+You are a senior developer evaluating a programming candidate based on several partial summaries.
+Based on the following batch evaluations, write a full final report on the candidate:
+
+{body}
+
+Final Evaluation:
+"""
 
 
 class AnalyzeRepoForGivenUser:
-    def __init__(self, github_url: str, llm_model):
+    def __init__(self, github_url: str, llm_model, summary_store: PortfolioSummaryStore | None = None):
         self.github_url = github_url
         self.username = github_url.rstrip("/").split("/")[-1].lower()
         self.user_dir = os.path.join(ANALYSIS_ROOT, self.username)
@@ -20,129 +55,106 @@ class AnalyzeRepoForGivenUser:
         if llm_model is None:
             raise ValueError("llm_model must be provided to AnalyzeRepoForGivenUser.")
         self.model = llm_model
+        self.summary_store = summary_store
 
     class ScoresAndCoverages:
         def __init__(self, user_dir):
             self.user_dir = user_dir
-            self.skill_data = defaultdict(lambda: {"depths": [], "coverage_count": 0, "total": 0})
-
-        @staticmethod
-        def extract_json_object(text: str):
-            brace_count = 0
-            json_start = -1
-            for i, c in enumerate(text):
-                if c == '{':
-                    if brace_count == 0:
-                        json_start = i
-                    brace_count += 1
-                elif c == '}':
-                    brace_count -= 1
-                    if brace_count == 0 and json_start != -1:
-                        json_str = text[json_start:i + 1]
-                        try:
-                            return json.loads(json_str)
-                        except json.JSONDecodeError:
-                            continue
-            return None
 
-        def compute(self):
-            for root, _, files in os.walk(self.user_dir):
-                for file in files:
-                    if file.endswith(".json"):
-                        path = os.path.join(root, file)
-                        try:
-                            with open(path, encoding="utf-8") as f:
-                                data = json.load(f)
-                                result_text = data.get("result", "")
-                                skill_dict = self.extract_json_object(result_text)
-                                if not skill_dict:
-                                    print(f"(!) No valid JSON object found in {file}")
-                                    continue
-
-                                for raw_skill, details in skill_dict.items():
-                                    if not isinstance(details, dict):
-                                        print(f"(!) Skipping malformed skill entry: {raw_skill} -> {details}")
-                                        continue
-
-                                    skill = normalize_skill(raw_skill)
-                                    depth = details.get("depth", 0)
-                                    coverage = details.get("coverage", False)
-
-                                    self.skill_data[skill]["total"] += 1
-                                    if coverage:
-                                        self.skill_data[skill]["depths"].append(depth)
-                                        self.skill_data[skill]["coverage_count"] += 1
-                        except Exception as e:
-                            print(f"(X) Error processing {file}: {e}")
-                            continue
-
-            result = {}
-            for skill, stats in self.skill_data.items():
-                avg_depth = mean(stats["depths"]) if stats["depths"] else 0
-                result[skill] = {
-                    "avg_depth": round(avg_depth, 2),
-                    "coverage": f"{stats['coverage_count']}/{stats['total']}"
-                }
+        extract_json_object = staticmethod(extract_json_object)
 
-            return result
+        def compute(self):
+            # Maintained incrementally by UserAnalysisStore as each file analysis is saved.
+            return UserAnalysisStore(self.user_dir).skill_scores()
 
     class FinalLLMAssessment:
+        """
+        Map/reduce summary of all file assessments. Batches are measured with
+        the model's tokenizer, summarised concurrently (one batch per model in
+        the pool) and reduced as a tree until they fit one final prompt.
+        """
+
         def __init__(self, user_dir, model):
             self.user_dir = user_dir
-            self.model = model
-
-        def gather_batches(self, max_tokens_per_chunk=3000):
-            chunks = []
-            current_chunk = ""
-            for root, _, files in os.walk(self.user_dir):
-                for file in files:
-                    if file.endswith(".json"):
-                        try:
-                            with open(os.path.join(root, file), encoding="utf-8") as f:
-                                result = json.load(f).get("result", "").strip()
-                                if len(current_chunk) + len(result) > max_tokens_per_chunk:
-                                    chunks.append(current_chunk)
-                                    current_chunk = result
-                                else:
-                                    current_chunk += "\n\n" + result
-                        except:
-                            continue
-            if current_chunk:
-                chunks.append(current_chunk)
-            return chunks
-
-        def summarize_chunk(self, chunk):
-            prompt = f"""
-You are a senior developer evaluating the portfolio of a candidate.
-Below is a batch of project assessments evaluating their code across various skills.
-Summarize this batch by describing the strengths and weaknesses demonstrated:
-
-Assessments:
-{chunk}
-
-Partial Summary:
-"""
-            result = self.model.create_completion(
-                prompt=prompt,
-                max_tokens=512,
+            self.models = list(model) if isinstance(model, (list, tuple)) else [model]
+            self.model = self.models[0]
+
+        def _input_budget(self, template: str) -> int:
+            """Tokens left for the variable part of `template` once the prompt and response fit."""
+            n_ctx = self.model.n_ctx() if hasattr(self.model, "n_ctx") else DEFAULT_CONTEXT_SIZE
+            fixed = count_tokens(template.format(body=""), self.model)
+            return max(1, n_ctx - fixed - SUMMARY_MAX_TOKENS - CONTEXT_SAFETY_MARGIN)
+
+        def _pack(self, texts, max_tokens: int) -> list[str]:
+            separator_tokens = count_tokens("\n\n", self.model)
+            batches, current, current_tokens = [], [], 0
+            for text in texts:
+                text = text.strip()
+                if not text:
+                    continue
+                text_tokens = count_tokens(text, self.model)
+                pieces = [text] if text_tokens <= max_tokens else split_text(text, max_tokens, self.model)
+                for piece in pieces:
+                    piece_tokens = text_tokens if len(pieces) == 1 else count_tokens(piece, self.model)
+                    if current and current_tokens + separator_tokens + piece_tokens > max_tokens:
+                        batches.append("\n\n".join(current))
+                        current, current_tokens = [], 0
+                    current.append(piece)
+                    current_tokens += piece_tokens + separator_tokens
+            if current:
+                batches.append("\n\n".join(current))
+            return batches
+
+        def gather_batches(self, max_tokens_per_chunk=None):
+            budget = max_tokens_per_chunk or self._input_budget(CHUNK_SUMMARY_PROMPT)
+            return self._pack((record["result"] for record in UserAnalysisStore(self.user_dir).records()), budget)
+
+        def _complete(self, model, template: str, body: str) -> str:
+            result = model.create_completion(
+                prompt=template.format(body=body),
+                max_tokens=SUMMARY_MAX_TOKENS,
                 temperature=0.4
             )
             return result["choices"][0]["text"].strip()
 
-        def generate_summary(self):
-            chunks = self.gather_batches()
-            summaries = [self.summarize_chunk(chunk) for chunk in chunks]
+        def _map(self, template: str, bodies: list[str]) -> list[str]:
+            """Completes every body, each model of the pool serving one request at a time."""
+            if len(self.models) == 1 or len(bodies) <= 1:
+                return [self._complete(self.model, template, body) for body in bodies]
 
-            final_prompt = f"""
-You are a senior developer evaluating a programming candidate based on several partial summaries.
-Based on the following batch evaluations, write a full final report on the candidate:
+            idle = queue.Queue()
+            for model in self.models:
+                idle.put(model)
 
-{chr(10).join(summaries)}
+            def run(body):
+                model = idle.get()
+                try:
+                    return self._complete(model, template, body)
+                finally:
+                    idle.put(model)
 
-Final Evaluation:
-"""
-            response = self.model.create_completion(prompt=final_prompt, max_tokens=512, temperature=0.4)
-            return response["choices"][0]["text"].strip()
+            with ThreadPoolExecutor(max_workers=min(len(self.models), len(bodies))) as pool:
+                return list(pool.map(run, bodies))
+
+        def summarize_chunk(self, chunk):
+            return self._complete(self.model, CHUNK_SUMMARY_PROMPT, chunk)
+
+        def reduce_summaries(self, summaries: list[str]) -> str:
+            """Merges partial summaries level by level until they fit the final prompt."""
+            final_budget = self._input_budget(FINAL_SUMMARY_PROMPT)
+            merge_budget = self._input_budget(MERGE_SUMMARY_PROMPT)
+            while len(summaries) > 1 and count_tokens("\n".join(summaries), self.model) > final_budget:
+                groups = self._pack(summaries, merge_budget)
+                if len(groups) >= len(summaries):
+                    break
+                print(f"   [↓] Merging {len(summaries)} partial summaries into {len(groups)}.")
+                summaries = self._map(MERGE_SUMMARY_PROMPT, groups)
+            return truncate_to_tokens("\n".join(summaries), final_budget, self.model)
+
+        def generate_summary(self):
+            chunks = self.gather_batches()
+            summaries = self._map(CHUNK_SUMMARY_PROMPT, chunks)
+            return self._complete(self.model, FINAL_SUMMARY_PROMPT, self.reduce_summaries(summaries))
 
     def analyze(self):
         if not os.path.exists(self.user_dir):
@@ -174,7 +186,35 @@ Final Evaluation:
             }
 
     def get_summary_text(self):
-        return self.analyze()
+        """
+        Same result as analyze(), but served from the summary store when the
+        user's analysis has not changed since the summary was computed.
+        """
+        if self.summary_store is None:
+            return self.analyze()
+
+        digest = analysis_digest(self.user_dir)
+        lock = SingleFlightLock(f"{self.username}.summary", self.summary_store.store_dir)
+        while True:
+            cached = self.summary_store.load(self.username, digest)
+            if cached is not None:
+                print(f"[=] Reusing stored portfolio summary for {self.username}.")
+                return cached
+            if lock.try_acquire():
+                break
+            print(f"[..] Another worker is summarising {self.username}, waiting for its result.")
+            lock.wait()
+
+        try:
+            cached = self.summary_store.load(self.username, digest)
+            if cached is not None:
+                return cached
+            result = self.analyze()
+            if result.get("success"):
+                self.summary_store.save(self.username, digest, result)
+            return result
+        finally:
+            lock.release()
 
 if __name__ == "__main__":
     analyzer = AnalyzeRepoForGivenUser("https://github.com/KhizarFareed")
@@ -1,46 +1,21 @@
 import os
-import requests
-from llama_cpp import Llama
 import json
 from urllib.parse import urlparse
+from backend.services.github_analyzer.chunking import count_tokens, chunk_code, merge_skill_results
+from backend.services.github_analyzer.skill_results import extract_json_object
 
-class SingleScriptAnalyzer:
-    def __init__(self, file_url, skills, model, verbose=False):
-        self.file_url = file_url
-        self.skills = skills
-        self.model = model
-        self.verbose = verbose
-        self.name = os.path.basename(urlparse(file_url).path) 
-
-    def get_default_branch(self, user, repo):
-        api_url = f"https://api.github.com/repos/{user}/{repo}"
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()
-        return response.json().get("default_branch", "main")
-
-    def fetch_code(self):
-        parsed = urlparse(self.file_url)
-        path_parts = parsed.path.strip("/").split("/")
-        if len(path_parts) < 5:
-            raise ValueError("Invalid GitHub blob URL format")
+# Bump whenever FEW_SHOT_PREFIX or the suffix changes: cached per-skill judgments are keyed by it.
+PROMPT_VERSION = 1
 
-        user, repo, blob_keyword, branch_guess, *file_path = path_parts
-        filepath_str = "/".join(file_path)
+MAX_RESPONSE_TOKENS = 256
+CONTEXT_SAFETY_MARGIN = 64  # tokenizer/template slack so a chunk never touches n_ctx
 
-        default_branch = self.get_default_branch(user, repo)
-        raw_url = f"https://raw.githubusercontent.com/{user}/{repo}/{default_branch}/{filepath_str}"
-
-        response = requests.get(raw_url, timeout=10)
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch code from: {raw_url}")
-        return response.text
-
-    def generate_prompt(self, code):
-      skill_str = ", ".join(self.skills)
-      return f"""
+# Static instructions + few-shot examples. Kept free of per-file and per-skill text so its
+# evaluated KV state can be cached once and restored for every file.
+FEW_SHOT_PREFIX = """
 You are a Tech Recruiter Lead evaluating code samples.
 
-Your task is to evaluate **only** the following skills: {skill_str}.
+Your task is to evaluate **only** the skills listed under TARGET EVALUATION.
 
 ---
 
@@ -48,10 +23,10 @@ Your task is to evaluate **only** the following skills: {skill_str}.
 
 For each skill, return:
 1. A single **JSON object** like:
-{{
-  "Python": {{"depth": 8, "coverage": true}},
-  "Unit Testing": {{"depth": 6, "coverage": true}}
-}}
+{
+  "Python": {"depth": 8, "coverage": true},
+  "Unit Testing": {"depth": 6, "coverage": true}
+}
 
 2. Then, one **technical sentence per skill**, in the same order as the JSON.
 
@@ -74,10 +49,10 @@ df["price"] = df["price"].fillna(0)
 print(df.describe())
 
 ### JSON EVAL:
-{{
-  "Python": {{"depth": 8, "coverage": true}},
-  "Pandas": {{"depth": 9, "coverage": true}}
-}}
+{
+  "Python": {"depth": 8, "coverage": true},
+  "Pandas": {"depth": 9, "coverage": true}
+}
 
 ### EXPLANATION:
 The script uses clean Python syntax and standard I/O functions.
@@ -93,10 +68,10 @@ query = "SELECT * FROM users WHERE email LIKE '%@example.com'"
 match = re.search(r"@example\\.com", "test@example.com")
 
 ### JSON EVAL:
-{{
-  "SQL": {{"depth": 5, "coverage": true}},
-  "Regex": {{"depth": 6, "coverage": true}}
-}}
+{
+  "SQL": {"depth": 5, "coverage": true},
+  "Regex": {"depth": 6, "coverage": true}
+}
 
 ### EXPLANATION:
 SQL is visible in string form, though not dynamically executed.
@@ -119,10 +94,10 @@ class Greeter:
 Greeter("Luis").greet()
 
 ### JSON EVAL:
-{{
-  "Object-Oriented Programming": {{"depth": 8, "coverage": true}},
-  "Error Handling": {{"depth": 5, "coverage": true}}
-}}
+{
+  "Object-Oriented Programming": {"depth": 8, "coverage": true},
+  "Error Handling": {"depth": 5, "coverage": true}
+}
 
 ### EXPLANATION:
 OOP is well-demonstrated via class and method encapsulation.
@@ -130,7 +105,33 @@ Error handling exists but lacks specificity in the exception clause.
 
 ---
 
-### TARGET EVALUATION
+"""
+
+def format_evaluation(skill_results: dict, explanations: list[str]) -> str:
+    """Renders depth/coverage results in the same delimited layout the model answers with."""
+    return f"### JSON EVAL:\n{json.dumps(skill_results, indent=2)}\n\n### EXPLANATION:\n" + "\n".join(explanations)
+
+
+def split_evaluation(output: str) -> tuple[dict, str]:
+    """(skill results, explanation text) of a model answer; ({}, output) when it has no JSON."""
+    skill_dict = extract_json_object(output) or {}
+    if "### EXPLANATION:" in output:
+        return skill_dict, output.split("### EXPLANATION:", 1)[1].strip()
+    return skill_dict, "" if skill_dict else output.strip()
+
+
+class SingleScriptAnalyzer:
+    def __init__(self, file_url, skills, model, verbose=False, prefix_cache=None):
+        self.file_url = file_url
+        self.skills = skills
+        self.model = model
+        self.verbose = verbose
+        self.name = os.path.basename(urlparse(file_url).path) 
+        self.prefix_cache = prefix_cache
+
+    def generate_prompt_suffix(self, code):
+      skill_str = ", ".join(self.skills)
+      return f"""### TARGET EVALUATION
 
 Now evaluate the following code **only for**: {skill_str}.
 
@@ -139,22 +140,74 @@ Now evaluate the following code **only for**: {skill_str}.
 
 RESPONSE:
 """
+
+    def generate_prompt(self, code):
+      return FEW_SHOT_PREFIX + self.generate_prompt_suffix(code)
     
-    def run(self):
+    def _context_size(self):
+        try:
+            return self.model.n_ctx()
+        except Exception:
+            return 4096
+
+    def _complete(self, code):
+        if self.prefix_cache is not None:
+            # Only the skills + code suffix is evaluated; the few-shot prefix state is restored.
+            response = self.prefix_cache.complete(
+                "few_shot", FEW_SHOT_PREFIX, self.generate_prompt_suffix(code), max_tokens=MAX_RESPONSE_TOKENS
+            )
+        else:
+            response = self.model(self.generate_prompt(code), max_tokens=MAX_RESPONSE_TOKENS)
+        if not response or "choices" not in response or not response["choices"]:
+            return None
+        return response["choices"][0]["text"].strip()
+
+    def _run_chunked(self, code, code_budget):
+        """
+        Evaluates a file that does not fit the context in bounded-size pieces
+        and merges the per-skill depth/coverage into one JSON EVAL block.
+        """
+        chunks = chunk_code(self.name, code, code_budget, self.model)
+        print(f"[~] {self.name} exceeds the context window, evaluating {len(chunks)} chunks.")
+
+        parsed, explanations = [], []
+        for i, chunk in enumerate(chunks, start=1):
+            output = self._complete(chunk)
+            if output is None:
+                print(f"(!) Empty response for chunk {i}/{len(chunks)} of {self.file_url}")
+                continue
+            skill_dict = extract_json_object(output)
+            if skill_dict:
+                parsed.append(skill_dict)
+            if "### EXPLANATION:" in output:
+                explanations.append(output.split("### EXPLANATION:", 1)[1].strip())
+
+        if not parsed:
+            return {"error": f"No chunk of {self.name} produced a valid evaluation"}
+
+        return {"result": format_evaluation(merge_skill_results(parsed), explanations)}
+
+    def run(self, code):
+        """
+        Evaluates `code` (the content of self.file_url, fetched by the
+        scraper) for self.skills.
+        """
         try:
-            code = self.fetch_code()
-            prompt = self.generate_prompt(code)
-            response = self.model(prompt, max_tokens=256)
+            # Measure the prompt with the model's tokenizer instead of letting llama.cpp truncate it.
+            overhead = count_tokens(self.generate_prompt(""), self.model)
+            code_budget = self._context_size() - overhead - MAX_RESPONSE_TOKENS - CONTEXT_SAFETY_MARGIN
+            if count_tokens(code, self.model) > code_budget:
+                return self._run_chunked(code, code_budget)
 
-            print(f"\n(LLM) Model Response for {self.name}:\n{response['choices'][0]['text'].strip()}\n")
+            output = self._complete(code)
 
-            if not response or "choices" not in response or not response["choices"]:
+            if output is None:
                 print(f"(!) Empty or malformed response for file: {self.file_url}")
                 return {"error": "Model returned no response"}
 
-            output = response["choices"][0]["text"].strip()
+            print(f"\n(LLM) Model Response for {self.name}:\n{output}\n")
             return {"result": output}
 
         except Exception as e:
             print(f"(X) Exception while analyzing {self.file_url}: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
@@ -0,0 +1,340 @@
+"""
+analysis_store.py
+─────────────────
+Packed per-user storage for portfolio analyses.
+
+Every analysed source file used to become its own `.json` file in a tree
+mirroring the user's repositories, and every reader (scores, summary,
+digest) walked and re-opened all of them. This module keeps the same
+records, one row per analysed file, in a single SQLite database per user
+(`analized_files/<user>/analysis.db`), so loading an analysis is one
+sequential read.
+
+Next to the records, `skill_aggregates` keeps a running per-skill sum of
+depths and coverage counts. Every save or removal adjusts it in the same
+transaction (subtracting a re-analysed file's previous contribution), so
+skill scores are an O(skills) query instead of re-parsing every result.
+
+`repos` remembers, per repository, the branch, the git tree SHA and the
+{path: blob_sha} listing the analysis was planned from, so a refresh can
+tell unchanged repositories and files from added, modified and deleted
+ones.
+
+Directories written in the old layout are packed by import_legacy(),
+which the analyser calls under its lock before writing; the imported
+`.json` files are removed once the rows are committed. Read-only calls
+never import or delete anything.
+
+Class
+─────
+• UserAnalysisStore(user_dir)
+    - save(repo, path, result, static_scores=None, blob_sha=None)
+    - remove(repo, path)
+    - blob_shas(repo) -> {path: blob_sha}      Analysed files of one repository.
+    - set_blob_sha(repo, path, blob_sha)
+    - set_repo(repo, branch, tree_sha, files)  Listing an analysis was planned from.
+    - repos() -> {repo: {"branch", "tree_sha", "files", "checked_at"}}
+    - touch_repo(repo)                         Mark a repository as checked just now.
+    - remove_repo(repo)                        Drop a repository and all its records.
+    - last_checked() -> float | None
+    - evaluated_skills() -> set[str]          Skills every stored file was evaluated for.
+    - add_evaluated_skills(skills)
+    - records() -> Iterator[dict]   {"repo", "file", "result", "static_scores", "blob_sha"}
+    - skill_scores() -> dict         {skill: {"avg_depth", "coverage": "covered/total"}}
+    - count() -> int
+    - has_legacy_records() -> bool   `.json` files of the old layout are waiting to be imported.
+    - import_legacy() -> int         Packs them into the database, returns how many.
+    - digest() -> str | None         SHA-1 over all records, None when empty.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Iterator
+
+from backend.services.github_analyzer.skill_results import skill_contributions
+
+ANALYSIS_DB_NAME = "analysis.db"
+# Files that belong to the store itself (or to its siblings) rather than to the legacy layout.
+STORE_FILES = {ANALYSIS_DB_NAME, f"{ANALYSIS_DB_NAME}-journal", f"{ANALYSIS_DB_NAME}-wal",
+               f"{ANALYSIS_DB_NAME}-shm", ".checkpoint", ".checkpoint.tmp", ".checkpoint.done"}
+
+
+class UserAnalysisStore:
+    def __init__(self, user_dir: str):
+        self.user_dir = user_dir
+        self.path = os.path.join(user_dir, ANALYSIS_DB_NAME)
+        self._initialized = False
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(self.user_dir, exist_ok=True)
+        # Autocommit mode: writes open their own BEGIN IMMEDIATE transactions.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._initialized:
+            self._initialize(conn)
+        return conn
+
+    def _initialize(self, conn: sqlite3.Connection):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                repo TEXT NOT NULL,
+                path TEXT NOT NULL,
+                result TEXT NOT NULL,
+                static_scores TEXT,
+                blob_sha TEXT,
+                skills TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (repo, path)
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS skill_aggregates (
+                skill TEXT PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0,
+                covered INTEGER NOT NULL DEFAULT 0,
+                depth_sum REAL NOT NULL DEFAULT 0
+            )
+        ''')
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS repos (
+                repo TEXT PRIMARY KEY,
+                branch TEXT,
+                tree_sha TEXT,
+                files TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            )
+        ''')
+
+        conn.execute("CREATE TABLE IF NOT EXISTS evaluated_skills (skill TEXT PRIMARY KEY)")
+
+        # Stores created before the aggregate index have no per-file skill column yet.
+        existing_columns = [row[1] for row in conn.execute("PRAGMA table_info(files)")]
+        if "skills" not in existing_columns:
+            conn.execute("ALTER TABLE files ADD COLUMN skills TEXT")
+        self._initialized = True
+        self._backfill_aggregates(conn)
+
+    @staticmethod
+    def _contributions(result: str, static_scores: dict | None) -> dict:
+        return skill_contributions(result, static_scores or {})
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, skills: dict, sign: int):
+        for skill, (depth, covered) in skills.items():
+            conn.execute('''
+                INSERT INTO skill_aggregates (skill, total, covered, depth_sum) VALUES (?, ?, ?, ?)
+                ON CONFLICT(skill) DO UPDATE SET
+                    total = total + excluded.total,
+                    covered = covered + excluded.covered,
+                    depth_sum = depth_sum + excluded.depth_sum
+            ''', (skill, sign, sign * int(covered), sign * depth if covered else 0))
+        if sign < 0:
+            conn.execute("DELETE FROM skill_aggregates WHERE total <= 0")
+
+    def _write(self, conn: sqlite3.Connection, repo: str, path: str, result: str,
+               static_scores: dict | None, blob_sha: str | None):
+        """Upserts one record and moves its skill contribution in the aggregates. Caller commits."""
+        self._delete(conn, repo, path)
+        skills = self._contributions(result, static_scores)
+        conn.execute('''
+            INSERT INTO files (repo, path, result, static_scores, blob_sha, skills)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (repo, path, result, json.dumps(static_scores) if static_scores else None, blob_sha,
+              json.dumps(skills)))
+        self._apply(conn, skills, +1)
+
+    def _delete(self, conn: sqlite3.Connection, repo: str, path: str):
+        row = conn.execute("SELECT skills FROM files WHERE repo = ? AND path = ?", (repo, path)).fetchone()
+        if row is None:
+            return
+        if row[0]:
+            self._apply(conn, json.loads(row[0]), -1)
+        conn.execute("DELETE FROM files WHERE repo = ? AND path = ?", (repo, path))
+
+    def _backfill_aggregates(self, conn: sqlite3.Connection):
+        # Selected inside the write transaction: another process backfilling the same rows
+        # commits first, and this one then finds nothing left to count.
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            "SELECT repo, path, result, static_scores FROM files WHERE skills IS NULL"
+        ).fetchall()
+        if not rows:
+            conn.commit()
+            return
+        for repo, path, result, static_scores in rows:
+            skills = self._contributions(result, json.loads(static_scores) if static_scores else None)
+            conn.execute("UPDATE files SET skills = ? WHERE repo = ? AND path = ?", (json.dumps(skills), repo, path))
+            self._apply(conn, skills, +1)
+        conn.commit()
+
+    def _legacy_files(self) -> list[tuple[str, str, str]]:
+        """(repo, path, json_file) for every record of the one-file-per-analysis layout."""
+        if not any(entry not in STORE_FILES for entry in os.listdir(self.user_dir)):
+            return []
+        found = []
+        for root, _, files in os.walk(self.user_dir):
+            for file in files:
+                if not file.endswith(".json"):
+                    continue
+                rel = os.path.relpath(os.path.join(root, file), self.user_dir).replace("\\", "/")
+                repo, _, path = rel[:-len(".json")].partition("/")
+                if path:
+                    found.append((repo, path, os.path.join(root, file)))
+        return found
+
+    def has_legacy_records(self) -> bool:
+        return os.path.isdir(self.user_dir) and bool(self._legacy_files())
+
+    def import_legacy(self) -> int:
+        if not os.path.isdir(self.user_dir):
+            return 0
+        legacy = self._legacy_files()
+        if not legacy:
+            return 0
+        imported = []
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for repo, path, json_file in legacy:
+                try:
+                    with open(json_file, encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    print(f"(!) Could not import {json_file}: {e}")
+                    continue
+                self._write(conn, repo, path, data.get("result", ""), data.get("static_scores"), None)
+                imported.append(json_file)
+            conn.commit()
+
+        for json_file in imported:
+            os.remove(json_file)
+        for root, dirs, _ in os.walk(self.user_dir, topdown=False):
+            for d in dirs:
+                try:
+                    os.rmdir(os.path.join(root, d))
+                except OSError:
+                    pass
+        print(f"[✓] Packed {len(imported)} legacy analysis files into {self.path}.")
+        return len(imported)
+
+    def save(self, repo: str, path: str, result: str, static_scores: dict | None = None,
+             blob_sha: str | None = None):
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._write(conn, repo, path, result, static_scores, blob_sha)
+            conn.commit()
+
+    def remove(self, repo: str, path: str):
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._delete(conn, repo, path)
+            conn.commit()
+
+    def blob_shas(self, repo: str) -> dict[str, str | None]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT path, blob_sha FROM files WHERE repo = ?", (repo,))
+            return dict(rows.fetchall())
+
+    def set_blob_sha(self, repo: str, path: str, blob_sha: str):
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE files SET blob_sha = ? WHERE repo = ? AND path = ?", (blob_sha, repo, path))
+
+    def set_repo(self, repo: str, branch: str, tree_sha: str | None, files: dict[str, str | None]):
+        with closing(self._connect()) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO repos (repo, branch, tree_sha, files, checked_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (repo, branch, tree_sha, json.dumps(files), time.time()))
+
+    def repos(self) -> dict[str, dict]:
+        if not os.path.isdir(self.user_dir):
+            return {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT repo, branch, tree_sha, files, checked_at FROM repos")
+            return {
+                repo: {"branch": branch, "tree_sha": tree_sha, "files": json.loads(files), "checked_at": checked_at}
+                for repo, branch, tree_sha, files, checked_at in rows
+            }
+
+    def touch_repo(self, repo: str):
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE repos SET checked_at = ? WHERE repo = ?", (time.time(), repo))
+
+    def remove_repo(self, repo: str):
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for (path,) in conn.execute("SELECT path FROM files WHERE repo = ?", (repo,)).fetchall():
+                self._delete(conn, repo, path)
+            conn.execute("DELETE FROM repos WHERE repo = ?", (repo,))
+            conn.commit()
+
+    def last_checked(self) -> float | None:
+        if not os.path.isdir(self.user_dir):
+            return None
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT MAX(checked_at) FROM repos").fetchone()[0]
+
+    def evaluated_skills(self) -> set[str]:
+        if not os.path.isdir(self.user_dir):
+            return set()
+        with closing(self._connect()) as conn:
+            return {skill for (skill,) in conn.execute("SELECT skill FROM evaluated_skills")}
+
+    def add_evaluated_skills(self, skills):
+        with closing(self._connect()) as conn:
+            conn.executemany("INSERT OR IGNORE INTO evaluated_skills (skill) VALUES (?)",
+                             [(skill,) for skill in skills])
+
+    def records(self) -> Iterator[dict]:
+        if not os.path.isdir(self.user_dir):
+            return
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT repo, path, result, static_scores, blob_sha FROM files ORDER BY repo, path"
+            )
+            for repo, path, result, static_scores, blob_sha in rows:
+                yield {
+                    "repo": repo,
+                    "file": path,
+                    "result": result,
+                    "static_scores": json.loads(static_scores) if static_scores else {},
+                    "blob_sha": blob_sha,
+                }
+
+    def skill_scores(self) -> dict:
+        if not os.path.isdir(self.user_dir):
+            return {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT skill, total, covered, depth_sum FROM skill_aggregates ORDER BY skill")
+            return {
+                skill: {
+                    "avg_depth": round(depth_sum / covered, 2) if covered else 0,
+                    "coverage": f"{covered}/{total}",
+                }
+                for skill, total, covered, depth_sum in rows
+            }
+
+    def count(self) -> int:
+        if not os.path.isdir(self.user_dir):
+            return 0
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def digest(self) -> str | None:
+        digest = hashlib.sha1()
+        found = False
+        for record in self.records():
+            found = True
+            digest.update(json.dumps(
+                [record["repo"], record["file"], record["result"], record["static_scores"]],
+                sort_keys=True,
+            ).encode("utf-8"))
+        return digest.hexdigest() if found else None
@@ -0,0 +1,173 @@
+"""
+checkpoint.py
+─────────────
+Resumable portfolio analyses.
+
+PortfolioAnalyzer writes one record per analysed file into the user's
+store in `analized_files/<user>/`, and callers used to take the mere
+existence of that directory as "analysis done". A run that crashed, was killed or hit
+its time budget therefore left a partial directory that was never
+completed. The checkpoint manifest kept next to those records says which
+files were planned, which are finished, and whether the plan itself is
+complete, so the next run picks up exactly where the last one stopped.
+
+The manifest is named `.checkpoint` (no `.json` suffix) so it is never
+mistaken for a record of the legacy one-file-per-analysis layout.
+Finished files are appended to `.checkpoint.done`, one line each, instead
+of rewriting the whole manifest per file; the next save folds them in.
+
+Functions
+─────────
+• is_analysis_complete(user_dir: str) -> bool
+      True once a run went through the whole plan. Directories written
+      before checkpoints existed count as complete.
+
+Class
+─────
+• AnalysisCheckpoint
+    - plan(repo, branch, files, tree_sha=None, listing=None)
+                                   Adds {path: blob_sha} to the plan (idempotent) and
+                                   remembers the repository listing it came from.
+    - listing(repo) -> (tree_sha, {path: blob_sha}) | None
+    - finish_planning()            The repository listing was fully read.
+    - mark_done(repo, path)        A file is finished and must not be redone.
+    - pending() -> list[(repo, branch, [paths])]
+    - complete(partial=False)      Closes the run. It is complete only when
+                                   the whole plan was listed and no file is
+                                   pending; files that failed keep it partial
+                                   so the next run retries them.
+"""
+
+import json
+import os
+import time
+
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+
+CHECKPOINT_NAME = ".checkpoint"
+DONE_LOG_NAME = ".checkpoint.done"
+CHECKPOINT_VERSION = 1
+
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_PARTIAL = "partial"
+STATUS_COMPLETE = "complete"
+
+
+def is_analysis_complete(user_dir: str) -> bool:
+    if not os.path.isdir(user_dir):
+        return False
+    checkpoint = AnalysisCheckpoint(user_dir)
+    if checkpoint.exists():
+        return checkpoint.status == STATUS_COMPLETE
+    store = UserAnalysisStore(user_dir)
+    return store.has_legacy_records() or store.count() > 0
+
+
+class AnalysisCheckpoint:
+    def __init__(self, user_dir: str):
+        self.user_dir = user_dir
+        self.path = os.path.join(user_dir, CHECKPOINT_NAME)
+        self.done_log_path = os.path.join(user_dir, DONE_LOG_NAME)
+        self.status = STATUS_IN_PROGRESS
+        self.planning_complete = False
+        self.branches = {}  # repo -> branch
+        self.planned = {}   # repo -> {path: blob_sha}, in analysis order
+        self.listings = {}  # repo -> {"tree_sha", "files"}: the full listing the plan was sampled from
+        self.done = set()   # "repo/path"
+        self._load()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") != CHECKPOINT_VERSION:
+            return
+        self.status = data.get("status", STATUS_IN_PROGRESS)
+        self.planning_complete = data.get("planning_complete", False)
+        self.branches = data.get("branches", {})
+        self.planned = data.get("planned", {})
+        self.listings = data.get("listings", {})
+        self.done = set(data.get("done", []))
+        try:
+            with open(self.done_log_path, encoding="utf-8") as f:
+                self.done.update(line.rstrip("\n") for line in f if line.endswith("\n"))
+        except OSError:
+            pass
+
+    def save(self):
+        os.makedirs(self.user_dir, exist_ok=True)
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "status": self.status,
+            "planning_complete": self.planning_complete,
+            "updated_at": time.time(),
+            "branches": self.branches,
+            "planned": self.planned,
+            "listings": self.listings,
+            "done": sorted(self.done),
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        # Everything in the log is in the manifest now.
+        try:
+            os.remove(self.done_log_path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _key(repo: str, path: str) -> str:
+        return f"{repo}/{path}"
+
+    def plan(self, repo: str, branch: str, files: dict[str, str | None], tree_sha: str | None = None,
+             listing: dict[str, str | None] | None = None):
+        self.branches[repo] = branch
+        if listing is not None:
+            self.listings[repo] = {"tree_sha": tree_sha, "files": listing}
+        planned = self.planned.setdefault(repo, {})
+        for path, sha in files.items():
+            planned.setdefault(path, sha)
+        self.status = STATUS_IN_PROGRESS
+        self.save()
+
+    def finish_planning(self):
+        self.planning_complete = True
+        self.save()
+
+    def listing(self, repo: str) -> tuple[str | None, dict[str, str | None]] | None:
+        recorded = self.listings.get(repo)
+        return (recorded["tree_sha"], recorded["files"]) if recorded else None
+
+    def sha_of(self, repo: str, path: str) -> str | None:
+        return self.planned.get(repo, {}).get(path)
+
+    def is_done(self, repo: str, path: str) -> bool:
+        return self._key(repo, path) in self.done
+
+    def mark_done(self, repo: str, path: str):
+        key = self._key(repo, path)
+        self.done.add(key)
+        os.makedirs(self.user_dir, exist_ok=True)
+        with open(self.done_log_path, "a", encoding="utf-8") as f:
+            f.write(key + "\n")
+
+    def pending(self) -> list[tuple[str, str, list[str]]]:
+        return [
+            (repo, self.branches[repo], [p for p in paths if not self.is_done(repo, p)])
+            for repo, paths in self.planned.items()
+        ]
+
+    def progress(self) -> tuple[int, int]:
+        total = sum(len(paths) for paths in self.planned.values())
+        return len(self.done), total
+
+    def complete(self, partial: bool = False):
+        finished = not partial and self.planning_complete and not any(paths for _, _, paths in self.pending())
+        self.status = STATUS_COMPLETE if finished else STATUS_PARTIAL
+        self.save()
@@ -0,0 +1,156 @@
+"""
+chunking.py
+───────────
+Context-aware splitting of large source files for SingleScriptAnalyzer.
+
+The coding model runs with a 4096-token context and the few-shot preamble
+already takes a large slice of it, so big files used to overflow. This
+module measures text with the model's own tokenizer, cuts files on
+function/class boundaries (AST for Python, declaration regexes for other
+languages), packs those units into chunks that fit the remaining budget,
+and merges the per-chunk skill judgments back into one result.
+
+Functions
+─────────
+• count_tokens(text: str, model=None) -> int
+      Exact count via `model.tokenize` when available, ~4 chars/token otherwise.
+
+• chunk_code(path: str, code: str, max_tokens: int, model=None) -> list[str]
+      Chunks no larger than `max_tokens`, cut on definition boundaries.
+
+• split_text(text: str, max_tokens: int, model=None) -> list[str]
+      Line-boundary pieces no larger than `max_tokens` (for prose and
+      analysis results rather than code).
+
+• truncate_to_tokens(text: str, max_tokens: int, model=None) -> str
+
+• merge_skill_results(results: list[dict]) -> dict
+      Combines per-chunk {"Skill": {"depth", "coverage"}} objects:
+      coverage if any chunk covers the skill, depth = best covered depth.
+"""
+
+import ast
+import re
+
+CHARS_PER_TOKEN = 4
+
+DEFINITION_START = re.compile(
+    r"^(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function|class|interface|struct|enum|trait|impl|def|fn|func|module|namespace)\b"
+    r"|^(?:pub(?:\(crate\))?\s+)?(?:fn|struct|enum|trait|impl|mod)\b"
+    r"|^(?:public|private|protected|internal|static|abstract|final|sealed|override)\s"
+    r"|^(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?(?:function|\([^)]*\)\s*=>)"
+)
+
+
+def count_tokens(text: str, model=None) -> int:
+    if model is not None and hasattr(model, "tokenize"):
+        try:
+            return len(model.tokenize(text.encode("utf-8", errors="ignore"), add_bos=False))
+        except Exception:
+            pass
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _python_units(code: str) -> list[str] | None:
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+    lines = code.splitlines(keepends=True)
+    units, cursor = [], 0
+    for node in tree.body:
+        start = node.lineno - 1
+        if getattr(node, "decorator_list", None):
+            start = min(d.lineno - 1 for d in node.decorator_list)
+        end = node.end_lineno
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if start > cursor:
+                units.append("".join(lines[cursor:start]))
+            units.append("".join(lines[start:end]))
+            cursor = end
+    if cursor < len(lines):
+        units.append("".join(lines[cursor:]))
+    return [u for u in units if u.strip()]
+
+
+def _generic_units(code: str) -> list[str]:
+    units, current = [], []
+    for line in code.splitlines(keepends=True):
+        if DEFINITION_START.match(line) and current:
+            units.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        units.append("".join(current))
+    return [u for u in units if u.strip()]
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model=None) -> str:
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    if model is not None and hasattr(model, "tokenize") and hasattr(model, "detokenize"):
+        tokens = model.tokenize(text.encode("utf-8", errors="ignore"), add_bos=False)
+        return model.detokenize(tokens[:max_tokens]).decode("utf-8", errors="ignore")
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+def split_text(text: str, max_tokens: int, model=None) -> list[str]:
+    pieces, current, current_tokens = [], [], 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = count_tokens(line, model)
+        if line_tokens > max_tokens:
+            line = truncate_to_tokens(line, max_tokens, model)
+            line_tokens = max_tokens
+        if current and current_tokens + line_tokens > max_tokens:
+            pieces.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+
+def chunk_code(path: str, code: str, max_tokens: int, model=None) -> list[str]:
+    units = _python_units(code) if path.lower().endswith(".py") else None
+    if units is None:
+        units = _generic_units(code)
+
+    chunks, current, current_tokens = [], [], 0
+    for unit in units:
+        unit_tokens = count_tokens(unit, model)
+        if unit_tokens > max_tokens:
+            if current:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(split_text(unit, max_tokens, model))
+            continue
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def merge_skill_results(results: list[dict]) -> dict:
+    merged = {}
+    for result in results:
+        for skill, details in result.items():
+            if not isinstance(details, dict):
+                continue
+            entry = merged.setdefault(skill, {"depth": 0, "coverage": False})
+            covered = bool(details.get("coverage", False))
+            try:
+                depth = int(details.get("depth", 0))
+            except (TypeError, ValueError):
+                depth = 0
+            if covered:
+                entry["depth"] = max(entry["depth"], depth) if entry["coverage"] else depth
+                entry["coverage"] = True
+            elif not entry["coverage"]:
+                entry["depth"] = max(entry["depth"], depth)
+    return merged
@@ -0,0 +1,342 @@
+"""
+code_metrics.py
+───────────────
+Deterministic static-analysis engine that complements the LLM skill scores.
+
+The coding model is slow and its depth/coverage judgments vary between
+runs, yet several claimed skills (testing, error handling, documentation,
+type hints, OOP, code quality) leave measurable traces in the code itself.
+This module measures them once per blob, caches the numbers, and turns
+them into the same {"depth": int, "coverage": bool} entries the LLM emits,
+so those skills never need an LLM call.
+
+Functions
+─────────
+• compute_metrics(path: str, code: str) -> dict
+      Cyclomatic complexity, test presence, type-hint and docstring density,
+      error-handling patterns and module structure. Full AST analysis for
+      Python, keyword/regex approximations for the other languages.
+
+• score_static_skills(skills: list[str], metrics: dict) -> dict
+      Depth/coverage for every claimed skill that has a static scorer.
+
+• has_static_scorer(skill: str) -> bool
+
+Class
+─────
+• MetricsCache
+    - In-memory + on-disk (JSON) cache keyed by blob SHA or content hash.
+      flush() merges into the file under a SingleFlightLock, so workers
+      sharing the cache never drop each other's entries.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+from backend.services.github_analyzer.single_flight import SingleFlightLock
+from backend.services.github_analyzer.skill_results import normalize_skill
+
+METRICS_VERSION = 1
+FLUSH_LOCK_STALE_SECONDS = 30
+
+BRANCH_KEYWORDS = re.compile(r"\b(if|elif|else\s+if|for|foreach|while|case|catch|except)\b|&&|\|\||\?(?!\?)")
+FUNCTION_PATTERNS = re.compile(
+    r"^\s*(?:export\s+)?(?:async\s+)?function\s+\w+"                           # JS/TS
+    r"|^\s*(?:public|private|protected|static|final|override|internal|\s)+[\w<>\[\],\s]+\s+\w+\s*\([^;]*\)\s*\{"  # Java/C#/C++
+    r"|^\s*func\s+"                                                              # Go/Swift
+    r"|^\s*(?:pub\s+)?fn\s+\w+"                                                  # Rust
+    r"|^\s*def\s+\w+"                                                            # Ruby
+    r"|^\s*(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?\([^)]*\)\s*=>",           # JS arrow functions
+    re.MULTILINE,
+)
+CLASS_PATTERN = re.compile(r"^\s*(?:export\s+|public\s+|abstract\s+|final\s+)*(?:class|struct|interface|trait)\s+\w+", re.MULTILINE)
+TRY_PATTERN = re.compile(r"\btry\s*\{|\bcatch\s*\(|\bResult<|\bif\s+err\s*!=\s*nil\b")
+COMMENT_PATTERN = re.compile(r"^\s*(//|#(?!include)|/\*|\*|<!--)", re.MULTILINE)
+TEST_CALL_PATTERN = re.compile(r"\b(describe|it|test)\s*\(|@Test\b|\bfunc\s+Test\w+|#\[test\]|\bassert\w*[\s(!]")
+TEST_PATH_PATTERN = re.compile(r"(^|/)(tests?|spec|__tests__)(/|$)|(^|/)test_[^/]+$|_test\.\w+$|\.(test|spec)\.\w+$")
+TYPED_LANGUAGE_EXTS = (".ts", ".tsx", ".java", ".cs", ".go", ".rs", ".kt", ".kts", ".swift", ".cpp", ".cc", ".cxx", ".hpp", ".h")
+
+
+# ──────────────────────────────
+# Metric extraction
+# ──────────────────────────────
+
+class _ComplexityVisitor(ast.NodeVisitor):
+    """McCabe complexity per function: 1 + number of decision points."""
+
+    DECISIONS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler, ast.comprehension)
+
+    def __init__(self):
+        self.scores = []
+
+    def _function(self, node):
+        score = 1
+        for child in ast.walk(node):
+            if isinstance(child, self.DECISIONS):
+                score += 1
+            elif isinstance(child, ast.BoolOp):
+                score += len(child.values) - 1
+            elif isinstance(child, ast.Match):
+                score += len(child.cases)
+        self.scores.append(score)
+        self.generic_visit(node)
+
+    visit_FunctionDef = _function
+    visit_AsyncFunctionDef = _function
+
+
+def _python_metrics(code: str) -> dict | None:
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+    functions = [n for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    classes = [n for n in ast.walk(tree) if isinstance(n, ast.ClassDef)]
+    handlers = [n for n in ast.walk(tree) if isinstance(n, ast.ExceptHandler)]
+    tries = [n for n in ast.walk(tree) if isinstance(n, ast.Try)]
+
+    annotated, annotatable = 0, 0
+    for fn in functions:
+        args = fn.args.posonlyargs + fn.args.args + fn.args.kwonlyargs
+        args = [a for a in args if a.arg not in ("self", "cls")]
+        annotatable += len(args) + 1
+        annotated += sum(1 for a in args if a.annotation is not None) + (fn.returns is not None)
+
+    documented = sum(1 for n in functions + classes if ast.get_docstring(n))
+    visitor = _ComplexityVisitor()
+    visitor.visit(tree)
+
+    test_functions = sum(1 for fn in functions if fn.name.startswith("test"))
+    asserts = sum(1 for n in ast.walk(tree) if isinstance(n, ast.Assert))
+    imports = sum(1 for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom)))
+    has_main_guard = any(
+        isinstance(n, ast.If) and isinstance(n.test, ast.Compare)
+        and isinstance(n.test.left, ast.Name) and n.test.left.id == "__name__"
+        for n in tree.body
+    )
+    top_level_statements = sum(
+        1 for n in tree.body
+        if not isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Import, ast.ImportFrom, ast.If))
+        and not (isinstance(n, ast.Expr) and isinstance(getattr(n, "value", None), ast.Constant))
+        and not isinstance(n, ast.Assign)
+    )
+
+    return {
+        "functions": len(functions),
+        "classes": len(classes),
+        "inheriting_classes": sum(1 for c in classes if c.bases),
+        "methods": sum(1 for c in classes for n in c.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))),
+        "complexity_avg": round(sum(visitor.scores) / len(visitor.scores), 2) if visitor.scores else 1.0,
+        "complexity_max": max(visitor.scores, default=1),
+        "try_blocks": len(tries),
+        "bare_excepts": sum(1 for h in handlers if h.type is None or (isinstance(h.type, ast.Name) and h.type.id in ("Exception", "BaseException"))),
+        "specific_handlers": sum(1 for h in handlers if h.type is not None and not (isinstance(h.type, ast.Name) and h.type.id in ("Exception", "BaseException"))),
+        "raises": sum(1 for n in ast.walk(tree) if isinstance(n, ast.Raise)),
+        "type_hint_density": round(annotated / annotatable, 2) if annotatable else 0.0,
+        "docstring_density": round(documented / (len(functions) + len(classes)), 2) if functions or classes else 0.0,
+        "test_functions": test_functions,
+        "assertions": asserts,
+        "imports": imports,
+        "has_main_guard": has_main_guard,
+        "top_level_statements": top_level_statements,
+    }
+
+
+def _generic_metrics(path: str, code: str) -> dict:
+    functions = len(FUNCTION_PATTERNS.findall(code))
+    classes = CLASS_PATTERN.findall(code)
+    branches = len(BRANCH_KEYWORDS.findall(code))
+    generic_catches = len(re.findall(r"catch\s*\(\s*(\.\.\.|Exception\s+\w+|e)\s*\)|catch\s*\{", code))
+    comment_lines = len(COMMENT_PATTERN.findall(code))
+    tries = len(TRY_PATTERN.findall(code))
+    test_calls = len(TEST_CALL_PATTERN.findall(code))
+    typed = path.lower().endswith(TYPED_LANGUAGE_EXTS)
+
+    return {
+        "functions": functions,
+        "classes": len(classes),
+        "inheriting_classes": len(re.findall(r"\b(extends|implements)\b|\bclass\s+\w+\s*:\s*(public|private)?\s*\w+", code)),
+        "methods": 0,
+        "complexity_avg": round(1 + branches / functions, 2) if functions else round(1.0 + branches, 2),
+        "complexity_max": None,
+        "try_blocks": tries,
+        "bare_excepts": generic_catches,
+        "specific_handlers": max(tries - generic_catches, 0),
+        "raises": len(re.findall(r"\bthrow\b|\bpanic!?\(|\breturn\s+\w*[Ee]rr", code)),
+        "type_hint_density": 1.0 if typed else 0.0,
+        "docstring_density": round(min(comment_lines / max(functions + len(classes), 1), 1.0), 2),
+        "test_functions": test_calls,
+        "assertions": len(re.findall(r"\bassert\w*|\bexpect\(", code)),
+        "imports": len(re.findall(r"^\s*(import|#include|using|use|require|from)\b", code, re.MULTILINE)),
+        "has_main_guard": bool(re.search(r"\b(func|fn|static\s+void|int)\s+main\s*\(", code)),
+        "top_level_statements": 0,
+    }
+
+
+def compute_metrics(path: str, code: str) -> dict:
+    lines = code.splitlines()
+    metrics = None
+    if path.lower().endswith(".py"):
+        metrics = _python_metrics(code)
+    if metrics is None:
+        metrics = _generic_metrics(path, code)
+
+    metrics.update({
+        "version": METRICS_VERSION,
+        "lines": len(lines),
+        "code_lines": sum(1 for l in lines if l.strip()),
+        "is_test_file": bool(TEST_PATH_PATTERN.search(path.lower())),
+    })
+    return metrics
+
+
+# ──────────────────────────────
+# Skill scoring
+# ──────────────────────────────
+
+def _clamp(value: float) -> int:
+    return int(max(0, min(10, round(value))))
+
+
+def _score_testing(m):
+    tests = m["test_functions"] + (1 if m["is_test_file"] else 0)
+    if tests == 0:
+        return {"depth": 0, "coverage": False}
+    return {"depth": _clamp(4 + min(tests, 8) / 2 + min(m["assertions"], 10) / 5), "coverage": True}
+
+
+def _score_error_handling(m):
+    if m["try_blocks"] == 0 and m["raises"] == 0:
+        return {"depth": 0, "coverage": False}
+    handled = m["specific_handlers"] + m["bare_excepts"]
+    specificity = m["specific_handlers"] / handled if handled else 0.5
+    return {"depth": _clamp(4 + 3 * specificity + min(m["try_blocks"] + m["raises"], 6) / 3), "coverage": True}
+
+
+def _score_documentation(m):
+    if m["docstring_density"] == 0:
+        return {"depth": 0, "coverage": False}
+    return {"depth": _clamp(2 + 8 * m["docstring_density"]), "coverage": True}
+
+
+def _score_type_hints(m):
+    if m["type_hint_density"] == 0:
+        return {"depth": 0, "coverage": False}
+    return {"depth": _clamp(10 * m["type_hint_density"]), "coverage": True}
+
+
+def _score_oop(m):
+    if m["classes"] == 0:
+        return {"depth": 0, "coverage": False}
+    return {"depth": _clamp(4 + min(m["classes"], 4) / 2 + min(m["inheriting_classes"], 3) + min(m["methods"], 10) / 5),
+            "coverage": True}
+
+
+def _score_code_quality(m):
+    if m["functions"] == 0 and m["classes"] == 0:
+        return {"depth": 0, "coverage": False}
+    penalty = max(m["complexity_avg"] - 4, 0) + max((m["complexity_max"] or 0) - 12, 0) / 4
+    bonus = m["docstring_density"] + m["type_hint_density"] + (0.5 if m["has_main_guard"] else 0)
+    return {"depth": _clamp(6 + bonus - penalty), "coverage": True}
+
+
+STATIC_SKILL_SCORERS = {
+    "unit testing": _score_testing,
+    "testing": _score_testing,
+    "test driven development": _score_testing,
+    "error handling": _score_error_handling,
+    "exception handling": _score_error_handling,
+    "documentation": _score_documentation,
+    "code documentation": _score_documentation,
+    "type hints": _score_type_hints,
+    "type hinting": _score_type_hints,
+    "static typing": _score_type_hints,
+    "object oriented programming": _score_oop,
+    "oop": _score_oop,
+    "code quality": _score_code_quality,
+    "clean code": _score_code_quality,
+}
+
+
+def has_static_scorer(skill: str) -> bool:
+    return normalize_skill(skill) in STATIC_SKILL_SCORERS
+
+
+def score_static_skills(skills: list[str], metrics: dict) -> dict:
+    return {
+        skill: STATIC_SKILL_SCORERS[normalize_skill(skill)](metrics)
+        for skill in skills if has_static_scorer(skill)
+    }
+
+
+# ──────────────────────────────
+# Cache
+# ──────────────────────────────
+
+class MetricsCache:
+    def __init__(self, cache_path: str | None = None):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._entries = self._read() if cache_path else {}
+        self._dirty = False
+
+    def _read(self) -> dict:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def key_for(code: str, blob_sha: str | None = None) -> str:
+        return blob_sha or hashlib.sha1(code.encode("utf-8", errors="ignore")).hexdigest()
+
+    def get(self, path: str, code: str, blob_sha: str | None = None) -> dict:
+        key = self.key_for(code, blob_sha)
+        is_test_file = bool(TEST_PATH_PATTERN.search(path.lower()))
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached and cached.get("version") == METRICS_VERSION:
+            # Content metrics are shared by identical blobs; the test-path flag is per location.
+            return dict(cached, is_test_file=is_test_file)
+
+        metrics = compute_metrics(path, code)
+        with self._lock:
+            self._entries[key] = metrics
+            self._dirty = True
+        return metrics
+
+    def flush(self):
+        """
+        Writes the cache to disk. Other workers may have flushed since this one
+        loaded it, so the file is re-read and merged while holding its lock.
+        """
+        if not self.cache_path or not self._dirty:
+            return
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(cache_dir, exist_ok=True)
+        lock = SingleFlightLock(os.path.basename(self.cache_path), cache_dir,
+                                stale_after=FLUSH_LOCK_STALE_SECONDS, poll_interval=0.05)
+        while not lock.try_acquire():
+            lock.wait()
+        try:
+            with self._lock:
+                entries = {**self._read(), **self._entries}
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(entries, f)
+                    os.replace(tmp_path, self.cache_path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+                self._entries = entries
+                self._dirty = False
+        finally:
+            lock.release()
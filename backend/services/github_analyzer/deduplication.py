@@ -0,0 +1,71 @@
+"""
+deduplication.py
+────────────────
+Dedup stage that runs between GitHub scraping and the per-file LLM analysis.
+
+Vendored libraries, generated bundles and files copied between repositories
+say nothing new about a candidate, yet each one used to cost a full
+SingleScriptAnalyzer call. This module decides which paths are worth
+analysing at all and lets identical blobs (same git blob SHA) share one
+analysis.
+
+Functions
+─────────
+• is_vendored_path(path: str) -> bool
+      True for dependency folders, build output and minified/generated files.
+      Folder names that are also common first-party package names (build,
+      out, target, env, external) only count at the top of the repository.
+
+Class
+─────
+• BlobDeduplicator
+    - Remembers the analysis record produced for every blob SHA.
+    - Returns the stored result when the same blob shows up again and
+      counts how many LLM calls were avoided.
+"""
+
+VENDORED_DIRS = {
+    "node_modules", "bower_components", "jspm_packages", "vendor", "vendors",
+    "third_party", "thirdparty", "dist", "site-packages", "venv", ".venv",
+    "__pycache__", ".git", ".next", ".nuxt", "coverage", "Pods", "Carthage", "DerivedData",
+}
+# Build output or vendored code at the repository root, but real source deeper down
+# (a Gradle `build` package, an `env/` config module).
+TOP_LEVEL_VENDORED_DIRS = {"build", "out", "target", "env", "external"}
+
+GENERATED_SUFFIXES = (
+    ".min.js", ".min.css", "-min.js", ".bundle.js", ".chunk.js",
+    "_pb2.py", ".pb.go", ".g.dart", ".designer.cs", ".generated.cs",
+)
+
+
+def is_vendored_path(path: str) -> bool:
+    parts = path.replace("\\", "/").split("/")
+    if any(part in VENDORED_DIRS for part in parts[:-1]):
+        return True
+    if len(parts) > 1 and parts[0] in TOP_LEVEL_VENDORED_DIRS:
+        return True
+    return parts[-1].lower().endswith(GENERATED_SUFFIXES)
+
+
+class BlobDeduplicator:
+    def __init__(self):
+        self.results = {}
+        self.first_seen = {}
+        self.saved_calls = 0
+
+    def lookup(self, blob_sha: str | None) -> dict | None:
+        """Returns the analysis already produced for this blob, if any."""
+        if not blob_sha or blob_sha not in self.results:
+            return None
+        self.saved_calls += 1
+        return self.results[blob_sha]
+
+    def record(self, blob_sha: str | None, result: dict, location: str = ""):
+        if not blob_sha:
+            return
+        self.results.setdefault(blob_sha, result)
+        self.first_seen.setdefault(blob_sha, location)
+
+    def source_of(self, blob_sha: str) -> str:
+        return self.first_seen.get(blob_sha, "")
@@ -0,0 +1,147 @@
+"""
+git_plumbing.py
+───────────────
+Read-only access to local git repositories through git plumbing commands,
+used by LocalGitStructureScraper to analyse portfolios without GitHub.
+
+Trees are listed with one `git ls-tree -r -l` per repository and blobs are
+streamed through a single long-lived `git cat-file --batch` process, so
+reading thousands of files costs one process per repository instead of one
+HTTP request per file.
+
+Functions
+─────────
+• clone_repository(remote_url, dest, blobless=True) -> LocalGitRepository
+      Shallow (depth 1) bare clone of a remote such as a `file://` URL; an
+      existing clone is fetched instead. Blobless clones fetch file
+      contents lazily from the remote, so keep blobs when the remote will
+      not be reachable later.
+
+Class
+─────
+• LocalGitRepository(path)
+    - default_branch() -> str
+    - tree_sha(ref) -> str | None
+    - last_commit_date(ref) -> str | None     ISO 8601, like GitHub's pushed_at
+    - ls_tree(ref) -> list[{"path", "sha", "size", "type"}]
+    - read_blob(sha) / read_file(ref, path) -> bytes | None
+    - close()                                 Stops the cat-file process.
+"""
+
+import os
+import subprocess
+import threading
+
+GIT_TIMEOUT_SECONDS = 120
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _git(*args: str, cwd: str | None = None) -> str:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, timeout=GIT_TIMEOUT_SECONDS)
+    if result.returncode != 0:
+        raise GitError(f"git {' '.join(args)} failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout.decode(errors="replace")
+
+
+def is_git_repository(path: str) -> bool:
+    """True for the root of a working copy or a bare repository, not for any directory inside one."""
+    if not os.path.isdir(path):
+        return False
+    try:
+        git_dir = _git("rev-parse", "--absolute-git-dir", cwd=path).strip()
+    except (GitError, OSError):
+        return False
+    root = os.path.realpath(path)
+    return os.path.realpath(git_dir) in (root, os.path.join(root, ".git"))
+
+
+def clone_repository(remote_url: str, dest: str, blobless: bool = True) -> "LocalGitRepository":
+    # Remotes that do not allow filters just send the blobs, the depth still applies.
+    blob_filter = ["--filter=blob:none"] if blobless else []
+    if is_git_repository(dest):
+        # A bare clone maps refs/heads/* directly, so a shallow fetch moves every branch.
+        _git("fetch", "--depth", "1", *blob_filter, "--prune", "origin",
+             "+refs/heads/*:refs/heads/*", cwd=dest)
+    else:
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        _git("clone", "--bare", "--depth", "1", "--no-single-branch", *blob_filter,
+             "--quiet", remote_url, dest)
+    return LocalGitRepository(dest)
+
+
+class LocalGitRepository:
+    def __init__(self, path: str):
+        self.path = path
+        self._cat_file = None
+        self._lock = threading.Lock()
+
+    def _git(self, *args: str) -> str:
+        return _git(*args, cwd=self.path)
+
+    def default_branch(self) -> str:
+        try:
+            return self._git("symbolic-ref", "--short", "HEAD").strip()
+        except GitError:
+            return "HEAD"  # detached HEAD
+
+    def tree_sha(self, ref: str) -> str | None:
+        try:
+            return self._git("rev-parse", "--verify", "--quiet", f"{ref}^{{tree}}").strip() or None
+        except GitError:
+            return None
+
+    def last_commit_date(self, ref: str) -> str | None:
+        try:
+            return self._git("log", "-1", "--format=%cI", ref).strip() or None
+        except GitError:
+            return None
+
+    def ls_tree(self, ref: str) -> list[dict]:
+        """Every entry below the ref's root tree, like the GitHub recursive trees API."""
+        try:
+            output = self._git("ls-tree", "-r", "-l", "-z", ref)
+        except GitError:
+            return []
+        items = []
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            meta, path = entry.split("\t", 1)
+            _, obj_type, sha, size = meta.split()
+            items.append({"path": path, "type": obj_type, "sha": sha,
+                          "size": int(size) if size.isdigit() else 0})
+        return items
+
+    def _start_cat_file(self):
+        self._cat_file = subprocess.Popen(
+            ["git", "cat-file", "--batch"], cwd=self.path,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+
+    def read_blob(self, sha: str) -> bytes | None:
+        with self._lock:
+            if self._cat_file is None or self._cat_file.poll() is not None:
+                self._start_cat_file()
+            proc = self._cat_file
+            proc.stdin.write(f"{sha}\n".encode())
+            proc.stdin.flush()
+            header = proc.stdout.readline().decode(errors="replace").split()
+            if len(header) != 3:
+                return None  # "<sha> missing"
+            _, obj_type, size = header
+            data = proc.stdout.read(int(size))
+            proc.stdout.read(1)  # trailing newline
+            return data if obj_type == "blob" else None
+
+    def read_file(self, ref: str, path: str) -> bytes | None:
+        return self.read_blob(f"{ref}:{path}")
+
+    def close(self):
+        with self._lock:
+            if self._cat_file is not None:
+                self._cat_file.stdin.close()
+                self._cat_file.wait()
+                self._cat_file = None
@@ -0,0 +1,236 @@
+"""
+github_fixtures.py
+──────────────────
+Record/replay of the GitHub traffic of a portfolio analysis, so the
+analyzer can be tested and benchmarked without live GitHub.
+
+Recording attaches a response hook to the scraper's requests session and
+writes every `api.github.com` / `raw.githubusercontent.com` response into
+a JSON cassette. Replaying serves the cassette from a local HTTP server
+that stands in for both hosts, with configurable latency and synthetic
+`X-RateLimit-*` headers (including 403s once the quota is spent), so the
+rate limiter is exercised as well. Point the analyzer at it through the
+GITHUB_API_URL / GITHUB_RAW_URL environment variables.
+
+Classes
+───────
+• Cassette(path)
+    - recorder() -> response hook for `session.hooks["response"]`
+    - lookup(host, path) -> entry | None     host is "api" or "raw"
+    - save()
+• FixtureServer(cassette, latency=0.0, rate_limit=5000, reset_after=3600)
+    Context manager; `api_url` / `raw_url` are the replacement base URLs
+    and `stats()` counts served, missing and rate-limited requests.
+
+Usage
+─────
+python -m backend.services.github_analyzer.github_fixtures record <github_url> <cassette.json>
+python -m backend.services.github_analyzer.github_fixtures serve <cassette.json> [latency_seconds]
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Cassettes always hold real GitHub traffic. backend.config is deliberately not imported here:
+# it reads GITHUB_API_URL / GITHUB_RAW_URL once, and replaying sets them after starting a server.
+HOSTS = {"api": "https://api.github.com", "raw": "https://raw.githubusercontent.com"}
+KEPT_HEADERS = ("Content-Type", "Link")
+API_PLACEHOLDER = "{api}"
+
+
+def _split(url: str) -> tuple[str | None, str]:
+    """("api" | "raw" | None, path with query) of a GitHub URL."""
+    for host, base in HOSTS.items():
+        if url.startswith(base.rstrip("/") + "/"):
+            parts = urlsplit(url[len(base.rstrip("/")):])
+            return host, parts.path + (f"?{parts.query}" if parts.query else "")
+    return None, url
+
+
+class Cassette:
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def _key(host: str, path: str) -> str:
+        return f"{host} {path}"
+
+    def lookup(self, host: str, path: str) -> dict | None:
+        return self.entries.get(self._key(host, path))
+
+    def add(self, url: str, status: int, headers, content: bytes):
+        host, path = _split(url)
+        if host is None:
+            return
+        kept = {name: headers[name] for name in KEPT_HEADERS if name in headers}
+        if "Link" in kept:
+            # Pagination links must point at whatever server replays the cassette.
+            kept["Link"] = kept["Link"].replace(HOSTS["api"].rstrip("/"), API_PLACEHOLDER)
+        entry = {"status": status, "headers": kept}
+        try:
+            entry["body"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(content).decode("ascii")
+        with self._lock:
+            self.entries[self._key(host, path)] = entry
+
+    def recorder(self):
+        def hook(response, *args, **kwargs):
+            self.add(response.url, response.status_code, response.headers, response.content)
+            return response
+        return hook
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class FixtureServer:
+    def __init__(self, cassette: Cassette, latency: float = 0.0, rate_limit: int = 5000,
+                 reset_after: float = 3600.0, host: str = "127.0.0.1", port: int = 0):
+        self.cassette = cassette
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._remaining = rate_limit
+        self._reset_at = time.time() + reset_after
+        self._stats = {"served": 0, "missing": 0, "rate_limited": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+        base = f"http://{host}:{self._httpd.server_address[1]}"
+        self.api_url = f"{base}/api"
+        self.raw_url = f"{base}/raw"
+
+    def _take_quota(self) -> tuple[bool, dict]:
+        """Spends one API call; (allowed, rate-limit headers)."""
+        with self._lock:
+            now = time.time()
+            if now >= self._reset_at:
+                self._remaining = self.rate_limit
+                self._reset_at = now + self.reset_after
+            allowed = self._remaining > 0
+            if allowed:
+                self._remaining -= 1
+            else:
+                self._stats["rate_limited"] += 1
+            return allowed, {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self._remaining),
+                "X-RateLimit-Reset": str(int(self._reset_at)),
+            }
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status: int, headers: dict, body: bytes):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                host, _, path = self.path.lstrip("/").partition("/")
+                headers = {}
+                if host == "api":
+                    allowed, headers = server._take_quota()
+                    if not allowed:
+                        body = b'{"message": "API rate limit exceeded"}'
+                        return self._send(403, {"Content-Type": "application/json", **headers}, body)
+
+                entry = server.cassette.lookup(host, f"/{path}")
+                if entry is None:
+                    server._count("missing")
+                    return self._send(404, {"Content-Type": "application/json", **headers},
+                                      b'{"message": "Not Found"}')
+
+                server._count("served")
+                for name, value in entry["headers"].items():
+                    headers[name] = value.replace(API_PLACEHOLDER, server.api_url)
+                if "body_b64" in entry:
+                    body = base64.b64decode(entry["body_b64"])
+                else:
+                    body = entry["body"].encode("utf-8")
+                self._send(entry["status"], headers, body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, remaining=self._remaining)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def record_portfolio(github_url: str, cassette_path: str) -> Cassette:
+    """Records everything an analysis and a refresh of `github_url` fetch from GitHub."""
+    from backend.services.github_analyzer.github_structure_scraper import GitHubStructureScraper
+
+    cassette = Cassette(cassette_path)
+    scraper = GitHubStructureScraper(github_url, include_forks=True)
+    scraper.session.hooks["response"].append(cassette.recorder())
+    for repo_name, branch, structure in scraper.iter_repo_structures():
+        scraper.get_tree_sha(repo_name, branch)
+        for path in structure:
+            file_url = f"https://github.com/{scraper.username}/{repo_name}/blob/{branch}/{path}"
+            scraper.fetch_code(file_url)
+    cassette.save()
+    return cassette
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) >= 4 and sys.argv[1] == "record":
+        recorded = record_portfolio(sys.argv[2], sys.argv[3])
+        print(f"[✓] Recorded {len(recorded.entries)} responses into {sys.argv[3]}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "serve":
+        fixture = FixtureServer(Cassette(sys.argv[2]), latency=float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)
+        with fixture:
+            print(f"export GITHUB_API_URL={fixture.api_url} GITHUB_RAW_URL={fixture.raw_url}")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+    else:
+        sys.exit("usage: github_fixtures.py record <github_url> <cassette.json> | serve <cassette.json> [latency]")
@@ -9,45 +9,74 @@ language usage.
 
 Public
   portfolio_scraping(github_url: str, *, debug: bool = False) -> str
+  GitHubStructureScraper.iter_repo_structures() streams repos page by page
+  GitHubStructureScraper.fetch_code(file_url) reads a kept file's content
 """
 import requests
-from typing import List, Dict, Tuple
-from urllib.parse import urljoin
+from typing import List, Dict, Tuple, Iterator
+from urllib.parse import urljoin, urlparse
+from backend.config import GITHUB_API_URL, GITHUB_RAW_URL
 from backend.sensible_info import GitHubToken
+from backend.services.github_analyzer.rate_limiter import (
+    GitHubRateLimiter, get_shared_rate_limiter, PRIORITY_NEW
+)
+from backend.services.github_analyzer.deduplication import is_vendored_path
+from backend.services.github_analyzer.languages import LANGUAGE_EXTS
 
-LANGUAGE_EXTS = {
-    "python": (".py",), "javascript": (".js", ".jsx"), "typescript": (".ts", ".tsx"),
-    "java": (".java",), "c++": (".cpp", ".cc", ".cxx", ".hpp", ".h"),
-    "csharp": (".cs",), "go": (".go",), "rust": (".rs",), "ruby": (".rb",),
-    "php": (".php",), "swift": (".swift",), "kotlin": (".kt", ".kts"),
-    "shell": (".sh", ".bash"), "html": (".html", ".htm"), "css": (".css",)
-}
+REPOS_PER_PAGE = 100  # GitHub's maximum page size for repository listings
 
 class GitHubStructureScraper:
-    def __init__(self, github_url: str):
+    def __init__(self, github_url: str, rate_limiter: GitHubRateLimiter | None = None,
+                 include_forks: bool = False):
         self.username = github_url.strip("/").split("/")[-1].lower()
-        self.api_url = f"https://api.github.com/users/{self.username}/repos"
+        self.api_url = f"{GITHUB_API_URL}/users/{self.username}/repos"
         self.session = requests.Session()
         self.session.headers.update({
             'Accept': 'application/vnd.github.v3+json',
             'Authorization': f'token {GitHubToken}'
         })
-    
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.include_forks = include_forks
+        # {repo: {path: {"sha": blob_sha, "size": bytes}}} for every kept file
+        self.file_meta: Dict[str, Dict[str, Dict]] = {}
+        # {repo: {"pushed_at": iso8601, "language": primary language, "tree_sha": root tree SHA}}
+        self.repo_meta: Dict[str, Dict] = {}
+        self.skipped = {"forks": 0, "vendored": 0}
+        self._line_check_by_sha: Dict[str, bool] = {}
+
+    def api_get(self, url: str, priority: int = PRIORITY_NEW) -> requests.Response:
+        """GET against the GitHub API, paced by the shared rate limiter."""
+        return self.rate_limiter.request(self.session, "GET", url, priority=priority)
+
+    def iter_repo_pages(self) -> Iterator[List[Dict]]:
+        """
+        Yields the user's repositories one API page (up to REPOS_PER_PAGE) at a
+        time, following the `Link: rel="next"` header until the last page.
+        """
+        url = f"{self.api_url}?per_page={REPOS_PER_PAGE}"
+        while url:
+            response = self.api_get(url)
+            response.raise_for_status()
+            yield response.json()
+            url = response.links.get("next", {}).get("url")
+
+    def iter_repos(self) -> Iterator[Dict]:
+        for page in self.iter_repo_pages():
+            yield from page
+
     def get_repos(self) -> List[Dict]:
-        response = self.session.get(self.api_url)
-        response.raise_for_status()
-        return response.json()
+        return list(self.iter_repos())
 
-    def get_repo_structure(self, repo_name: str) -> Dict:
-        default_branch = self.get_default_branch(repo_name)
-        repo_api = f"https://api.github.com/repos/{self.username}/{repo_name}/git/trees/{default_branch}?recursive=1"
-        response = self.session.get(repo_api)
+    def get_repo_structure(self, repo_name: str, branch: str | None = None) -> Dict:
+        default_branch = branch or self.get_default_branch(repo_name)
+        repo_api = f"{GITHUB_API_URL}/repos/{self.username}/{repo_name}/git/trees/{default_branch}?recursive=1"
+        response = self.api_get(repo_api)
         if response.status_code != 200:
             return {}
         return response.json()
 
     def get_default_branch(self, repo_name: str) -> str:
-        response = self.session.get(f"https://api.github.com/repos/{self.username}/{repo_name}")
+        response = self.api_get(f"{GITHUB_API_URL}/repos/{self.username}/{repo_name}")
         response.raise_for_status()
         return response.json().get("default_branch", "main")
 
@@ -58,12 +87,32 @@ class GitHubStructureScraper:
             any(ext in exts for exts in LANGUAGE_EXTS.values())
         )
 
-    def has_minimum_lines(self, repo_name: str, file_path: str, branch: str) -> bool:
-        raw_url = f"https://raw.githubusercontent.com/{self.username}/{repo_name}/{branch}/{file_path}"
+    def has_minimum_lines(self, repo_name: str, file_path: str, branch: str, sha: str | None = None) -> bool:
+        if sha in self._line_check_by_sha:
+            return self._line_check_by_sha[sha]  # identical blob already fetched elsewhere
+        raw_url = f"{GITHUB_RAW_URL}/{self.username}/{repo_name}/{branch}/{file_path}"
         response = self.session.get(raw_url)
         if response.status_code != 200:
             return False
-        return len(response.text.strip().splitlines()) >= 10
+        long_enough = len(response.text.strip().splitlines()) >= 10
+        if sha:
+            self._line_check_by_sha[sha] = long_enough
+        return long_enough
+
+    def fetch_code(self, file_url: str) -> str:
+        """Content of a `https://github.com/<user>/<repo>/blob/<branch>/<path>` file."""
+        path_parts = urlparse(file_url).path.strip("/").split("/")
+        if len(path_parts) < 5:
+            raise ValueError("Invalid GitHub blob URL format")
+        user, repo_name, _, branch, *file_path = path_parts
+        raw_url = f"{GITHUB_RAW_URL}/{user}/{repo_name}/{branch}/{'/'.join(file_path)}"
+        response = self.session.get(raw_url, timeout=10)
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch code from: {raw_url}")
+        return response.text
+
+    def close(self):
+        self.session.close()
 
     def scrape_with_error(self) -> Tuple[Tuple[int, List[str], Dict[str, List[str]]], Exception | None]:
         """
@@ -76,30 +125,74 @@ class GitHubStructureScraper:
         except Exception as e:
             return (0, [], {}), e
         
-    def scrape(self) -> Tuple[int, List[str], Dict[str, List[str]]]:
-        repos = self.get_repos()
-        file_links = []
-        structures = {}
+    def get_tree_sha(self, repo_name: str, branch: str) -> str | None:
+        """Root tree SHA of the branch head: one small request instead of the recursive tree."""
+        response = self.api_get(f"{GITHUB_API_URL}/repos/{self.username}/{repo_name}/branches/{branch}")
+        if response.status_code != 200:
+            return None
+        return response.json().get("commit", {}).get("commit", {}).get("tree", {}).get("sha")
 
-        for repo in repos:
-            repo_name = repo['name']
-            if repo_name.lower() == self.username:
-                continue  # Ignore repos named after the user
+    def mark_blobs_known(self, shas):
+        """Blobs that already passed the line check (e.g. analysed before) skip the raw download."""
+        for sha in shas:
+            if sha:
+                self._line_check_by_sha[sha] = True
 
-            branch = repo.get("default_branch", "main")
-            structure = []
-            tree_data = self.get_repo_structure(repo_name)
-            tree_items = tree_data.get("tree", [])
+    def is_candidate_repo(self, repo: Dict) -> bool:
+        if repo['name'].lower() == self.username:
+            return False  # Ignore repos named after the user
+        if repo.get("fork") and not self.include_forks:
+            self.skipped["forks"] += 1
+            return False
+        return True
+
+    def scan_repo(self, repo: Dict) -> Tuple[str, List[str]]:
+        """
+        Fetches one repository's tree and returns (branch, kept_file_paths),
+        filling file_meta and repo_meta (including the root tree SHA).
+        """
+        repo_name = repo['name']
+        branch = repo.get("default_branch", "main")
+        structure = []
+        meta = {}
+        tree_data = self.get_repo_structure(repo_name, branch)
+        tree_items = tree_data.get("tree", [])
+
+        for item in tree_items:
+            if item['type'] == 'blob' and self.is_valid_file(item['path']):
+                if is_vendored_path(item['path']):
+                    self.skipped["vendored"] += 1
+                    continue
+                if self.has_minimum_lines(repo_name, item['path'], branch, item.get('sha')):
+                    structure.append(item['path'])
+                    meta[item['path']] = {"sha": item.get('sha'), "size": item.get('size', 0)}
+
+        self.file_meta[repo_name] = meta
+        self.repo_meta[repo_name] = {"pushed_at": repo.get("pushed_at"), "language": repo.get("language"),
+                                     "tree_sha": tree_data.get("sha")}
+        return branch, structure
+
+    def iter_repo_structures(self) -> Iterator[Tuple[str, str, List[str]]]:
+        """
+        Streams (repo_name, branch, kept_file_paths) for every repository as soon
+        as its page of the listing arrives, so callers can start analysing the
+        first repos before the listing of a large account has finished.
+        """
+        for repo in self.iter_repos():
+            if not self.is_candidate_repo(repo):
+                continue
+            branch, structure = self.scan_repo(repo)
+            yield repo['name'], branch, structure
 
-            for item in tree_items:
-                if item['type'] == 'blob' and self.is_valid_file(item['path']):
-                    if self.has_minimum_lines(repo_name, item['path'], branch):
-                        github_url = f"https://github.com/{self.username}/{repo_name}/blob/{branch}/{item['path']}"
-                        file_links.append(github_url)
-                        structure.append(item['path'])
+    def scrape(self) -> Tuple[int, List[str], Dict[str, List[str]]]:
+        file_links = []
+        structures = {}
 
+        for repo_name, branch, structure in self.iter_repo_structures():
+            for path in structure:
+                file_links.append(f"https://github.com/{self.username}/{repo_name}/blob/{branch}/{path}")
             structures[repo_name] = structure
-        
+
         return len(structures), file_links, structures
 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+"""
+languages.py
+────────────
+Source languages the portfolio analyzer looks at, by file extension.
+
+Kept apart from the scraper so the pure planning modules (sampling,
+skill_prefilter) do not pull in the HTTP client and credentials.
+"""
+
+LANGUAGE_EXTS = {
+    "python": (".py",), "javascript": (".js", ".jsx"), "typescript": (".ts", ".tsx"),
+    "java": (".java",), "c++": (".cpp", ".cc", ".cxx", ".hpp", ".h"),
+    "csharp": (".cs",), "go": (".go",), "rust": (".rs",), "ruby": (".rb",),
+    "php": (".php",), "swift": (".swift",), "kotlin": (".kt", ".kts"),
+    "shell": (".sh", ".bash"), "html": (".html", ".htm"), "css": (".css",)
+}
@@ -0,0 +1,166 @@
+"""
+local_git_scraper.py
+────────────────────
+GitHubStructureScraper backed by local git repositories instead of the
+GitHub API, so portfolios can be mirrored in bulk ahead of time, analysed
+offline at disk speed and benchmarked repeatably.
+
+A source is the root of a mirror laid out as `<source>/<username>/<repo>`
+(bare `<repo>.git` directories or working copies). It is either
+
+- a local directory, read in place, or
+- a `file://` URL, whose repositories are first cloned shallow and
+  blobless into `clone_dir` (and only fetched on later runs).
+
+Class
+─────
+• LocalGitStructureScraper(github_url, source, clone_dir=...)
+    Same interface as GitHubStructureScraper (iter_repo_structures,
+    scan_repo, get_tree_sha, fetch_code, file_meta, repo_meta, ...);
+    fetch_code reads from the mirror and close() stops the repositories'
+    cat-file processes.
+
+Functions
+─────────
+• mirror_portfolio(github_url, mirror_root, include_forks=False) -> list[str]
+      Clones or fetches a user's GitHub repositories into a mirror root
+      usable as a source.
+"""
+
+import os
+from typing import Dict, Iterator, List
+from urllib.parse import urlparse, unquote
+
+from backend.config import LOCAL_GIT_CLONE_DIR
+from backend.services.github_analyzer.github_structure_scraper import GitHubStructureScraper
+from backend.services.github_analyzer.git_plumbing import (
+    LocalGitRepository, clone_repository, is_git_repository
+)
+
+MIN_FILE_LINES = 10
+
+
+class LocalGitStructureScraper(GitHubStructureScraper):
+    def __init__(self, github_url: str, source: str, include_forks: bool = False,
+                 clone_dir: str = LOCAL_GIT_CLONE_DIR):
+        super().__init__(github_url, include_forks=include_forks)
+        self.source = source
+        self.clone_dir = os.path.join(clone_dir, self.username)
+        parsed = urlparse(source)
+        self.remote = parsed.scheme == "file"
+        root = unquote(parsed.path) if self.remote else source
+        self.user_root = self._find_user_dir(root)
+        self._repos: Dict[str, LocalGitRepository] = {}
+
+    def _find_user_dir(self, root: str) -> str:
+        # GitHub usernames are case-insensitive, mirror directories may not be lowercase.
+        if os.path.isdir(root):
+            for name in os.listdir(root):
+                if name.lower() == self.username:
+                    return os.path.join(root, name)
+        return os.path.join(root, self.username)
+
+    def repository(self, repo_name: str) -> LocalGitRepository:
+        if repo_name not in self._repos:
+            path = self._repo_paths().get(repo_name)
+            if path is None:
+                raise FileNotFoundError(f"No local mirror of {self.username}/{repo_name} in {self.source}")
+            if self.remote:
+                self._repos[repo_name] = clone_repository(
+                    f"file://{path}", os.path.join(self.clone_dir, f"{repo_name}.git"))
+            else:
+                self._repos[repo_name] = LocalGitRepository(path)
+        return self._repos[repo_name]
+
+    def _repo_paths(self) -> Dict[str, str]:
+        if not os.path.isdir(self.user_root):
+            return {}
+        paths = {}
+        for entry in sorted(os.listdir(self.user_root)):
+            path = os.path.join(self.user_root, entry)
+            if is_git_repository(path):
+                name = entry[:-4] if entry.endswith(".git") else entry
+                paths[name] = path
+        return paths
+
+    def iter_repos(self) -> Iterator[Dict]:
+        """Repositories in the mirror, shaped like GitHub's repository listing."""
+        for name in self._repo_paths():
+            repository = self.repository(name)
+            branch = repository.default_branch()
+            yield {
+                "name": name,
+                "default_branch": branch,
+                "pushed_at": repository.last_commit_date(branch),
+                "language": None,
+                "fork": False,  # a mirror does not know; pre-mirroring already honours include_forks
+            }
+
+    def get_repo_structure(self, repo_name: str, branch: str | None = None) -> Dict:
+        repository = self.repository(repo_name)
+        ref = branch or repository.default_branch()
+        tree_sha = repository.tree_sha(ref)
+        if tree_sha is None:
+            return {}
+        return {"sha": tree_sha, "tree": repository.ls_tree(ref)}
+
+    def get_default_branch(self, repo_name: str) -> str:
+        return self.repository(repo_name).default_branch()
+
+    def get_tree_sha(self, repo_name: str, branch: str) -> str | None:
+        try:
+            return self.repository(repo_name).tree_sha(branch)
+        except FileNotFoundError:
+            return None
+
+    def has_minimum_lines(self, repo_name: str, file_path: str, branch: str, sha: str | None = None) -> bool:
+        if sha in self._line_check_by_sha:
+            return self._line_check_by_sha[sha]
+        repository = self.repository(repo_name)
+        data = repository.read_blob(sha) if sha else repository.read_file(branch, file_path)
+        if data is None:
+            return False
+        long_enough = len(data.decode(errors="replace").strip().splitlines()) >= MIN_FILE_LINES
+        if sha:
+            self._line_check_by_sha[sha] = long_enough
+        return long_enough
+
+    def fetch_code(self, file_url: str) -> str:
+        """Content of a `https://github.com/<user>/<repo>/blob/<branch>/<path>` file from the mirror."""
+        path_parts = urlparse(file_url).path.strip("/").split("/")
+        if len(path_parts) < 5:
+            raise ValueError("Invalid GitHub blob URL format")
+        _, repo_name, _, branch, *file_path = path_parts
+        data = self.repository(repo_name).read_file(branch, "/".join(file_path))
+        if data is None:
+            raise FileNotFoundError(f"{'/'.join(file_path)} not found in the mirror of {repo_name}@{branch}")
+        return data.decode(errors="replace")
+
+    def close(self):
+        for repository in self._repos.values():
+            repository.close()
+        self._repos.clear()
+        super().close()
+
+
+def mirror_portfolio(github_url: str, mirror_root: str, include_forks: bool = False) -> List[str]:
+    """Clones (or fetches) the user's candidate repositories into `<mirror_root>/<username>/<repo>.git`."""
+    scraper = GitHubStructureScraper(github_url, include_forks=include_forks)
+    mirrored = []
+    for repo in scraper.iter_repos():
+        if not scraper.is_candidate_repo(repo):
+            continue
+        dest = os.path.join(mirror_root, scraper.username, f"{repo['name']}.git")
+        # Full blobs: the mirror has to be readable without GitHub.
+        clone_repository(repo["clone_url"], dest, blobless=False)
+        mirrored.append(repo["name"])
+    return mirrored
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m backend.services.github_analyzer.local_git_scraper <github_url> <mirror_root>")
+    repos = mirror_portfolio(sys.argv[1], sys.argv[2])
+    print(f"[✓] Mirrored {len(repos)} repositories into {sys.argv[2]}")
@@ -1,94 +1,497 @@
 import os
-import sys
-import json
-import shutil
-import contextlib
-from llama_cpp import Llama
-from backend.config import MODEL_DIR, CODING_MODEL
+import threading
+from contextlib import closing
+from backend.config import (
+    CODING_MODEL, PORTFOLIO_MAX_FILES, PORTFOLIO_MAX_TOKENS, PORTFOLIO_MAX_SECONDS,
+    CODE_METRICS_CACHE_PATH, ANALYSIS_LOCK_DIR, ANALYSIS_LOCK_STALE_SECONDS, SKILL_CACHE_PATH,
+    PORTFOLIO_GIT_SOURCE
+)
 from backend.services.github_analyzer.github_structure_scraper import GitHubStructureScraper
-from backend.services.github_analyzer.analizes_a_single_script import SingleScriptAnalyzer
+from backend.services.github_analyzer.local_git_scraper import LocalGitStructureScraper
+from backend.services.github_analyzer.rate_limiter import GitHubRateLimiter
+from backend.services.github_analyzer.analizes_a_single_script import (
+    SingleScriptAnalyzer, PROMPT_VERSION, format_evaluation, split_evaluation
+)
+from backend.services.github_analyzer.skill_results import normalize_skill
+from backend.services.github_analyzer.deduplication import BlobDeduplicator
+from backend.services.github_analyzer.sampling import AnalysisBudget, RepresentativeSampler
+from backend.services.github_analyzer.skill_prefilter import SkillPrefilter
+from backend.services.github_analyzer.code_metrics import MetricsCache, has_static_scorer, score_static_skills
+from backend.services.github_analyzer.single_flight import SingleFlightLock
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+from backend.services.github_analyzer.checkpoint import AnalysisCheckpoint, is_analysis_complete
+from backend.services.github_analyzer.skill_cache import SkillResultCache
+from backend.services.prompt_cache import PrefixStateCache
+from backend.services.model_registry import get_model
 
 # ======================================
-# Suppresses llama_cpp noisy output
+# Coding model, loaded on first use
 # ======================================
 
-@contextlib.contextmanager
-def suppress_output():
-    with open(os.devnull, 'w') as devnull:
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        sys.stdout = devnull
-        sys.stderr = devnull
-        try:
-            yield
-        finally:
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
+CODING_MODEL_SETTINGS = {"n_ctx": 4096, "n_gpu_layers": -1}
+_few_shot_cache = None
+_few_shot_lock = threading.Lock()
+
+
+def get_coding_model():
+    """Shared DeepSeek coder instance; importing this module never loads it."""
+    return get_model(CODING_MODEL, quiet=True, **CODING_MODEL_SETTINGS)
+
 
-MODEL_PATH = os.path.join(MODEL_DIR, CODING_MODEL)
-with suppress_output():
-    model = Llama(model_path=MODEL_PATH, n_ctx=4096, n_gpu_layers=-1)
+def get_few_shot_cache() -> PrefixStateCache:
+    global _few_shot_cache
+    with _few_shot_lock:
+        if _few_shot_cache is None:
+            _few_shot_cache = PrefixStateCache(get_coding_model())
+        return _few_shot_cache
 
 class PortfolioAnalyzer:
-    def __init__(self, github_url: str, skills: list[str]):
+    def __init__(self, github_url: str, skills: list[str], include_forks: bool = False,
+                 budget: AnalysisBudget | None = None, source: str | None = PORTFOLIO_GIT_SOURCE,
+                 rate_limiter: GitHubRateLimiter | None = None):
         self.github_url = github_url
-        self.skills = [s.lower() for s in skills]
+        self._set_skills(skills)
+        self.include_forks = include_forks
+        # A local git mirror (directory or file:// URL, see local_git_scraper) replaces the GitHub API.
+        self.source = source
+        # None shares the process-wide GitHub limiter with every other portfolio worker.
+        self.rate_limiter = rate_limiter
+        self.budget = budget or AnalysisBudget(PORTFOLIO_MAX_FILES, PORTFOLIO_MAX_TOKENS, PORTFOLIO_MAX_SECONDS)
         self.repo_count = 0
         self.file_links = []
         self.analysis_results = {}
+        self.deduplicator = BlobDeduplicator()
+        self.prefilter_stats = {"files_skipped": 0, "skills_pruned": 0}
+        self.metrics_cache = MetricsCache(CODE_METRICS_CACHE_PATH)
+        self.skill_cache = SkillResultCache(SKILL_CACHE_PATH, CODING_MODEL, PROMPT_VERSION)
+
+    def _set_skills(self, skills: list[str]):
+        self.skills = [s.lower() for s in skills]
+        # Skills the static metrics engine can score on its own never go to the LLM.
+        self.static_skills = [s for s in self.skills if has_static_scorer(s)]
+        self.llm_skills = [s for s in self.skills if not has_static_scorer(s)]
+        self.prefilter = SkillPrefilter(self.llm_skills)
+
+    @staticmethod
+    def _evaluated_skills(store: UserAnalysisStore) -> set[str]:
+        # Analyses stored before skills were tracked: whatever the aggregates have seen.
+        return store.evaluated_skills() or set(store.skill_scores())
+
+    def _missing_skills(self, store: UserAnalysisStore) -> list[str]:
+        evaluated = self._evaluated_skills(store)
+        return [s for s in self.skills if normalize_skill(s) not in evaluated]
+
+    def _scraper(self) -> GitHubStructureScraper:
+        if self.source:
+            return LocalGitStructureScraper(self.github_url, self.source, include_forks=self.include_forks)
+        return GitHubStructureScraper(self.github_url, rate_limiter=self.rate_limiter,
+                                      include_forks=self.include_forks)
+
+    def save_analysis_to_local(self, store: UserAnalysisStore, repo: str, file_path: str, result: str,
+                               static_scores: dict | None = None, blob_sha: str | None = None):
+        store.save(repo, file_path, result, static_scores, blob_sha)
+
+    def _analyze_file(self, scraper: GitHubStructureScraper, file_url: str, file_path: str,
+                      blob_sha: str | None, skills: list[str] | None = None) -> dict | None:
+        """
+        Runs the static metrics and, for the skills that still need judgment,
+        the coding model on one file (all claimed skills unless `skills` is
+        given). Judgments already in the skill cache for this exact blob are
+        reused, so the model only sees the skills never evaluated for it.
+        Returns {"result", "static_scores"}, or None when the file has
+        nothing to evaluate. Raises when the LLM call failed, so the file
+        stays pending in the checkpoint.
+        """
+        skills = self.skills if skills is None else skills
+        static_skills = [s for s in skills if s in self.static_skills]
+        llm_skills = [s for s in skills if s in self.llm_skills]
+
+        analyzer = SingleScriptAnalyzer(file_url, llm_skills, None)
+        code = scraper.fetch_code(file_url)
+
+        metrics = self.metrics_cache.get(file_path, code, blob_sha)
+        # Uncovered scores are kept too: every evaluated file counts in the skill's coverage denominator.
+        static_scores = score_static_skills(static_skills, metrics)
+
+        relevant_skills = [s for s in self.prefilter.relevant_skills(file_path, code) if s in llm_skills]
+        self.prefilter_stats["skills_pruned"] += len(llm_skills) - len(relevant_skills)
+        if not relevant_skills:
+            if not static_scores:
+                print(f"   [-] No claimed skill is plausible in {file_path}, skipping LLM call.")
+                self.prefilter_stats["files_skipped"] += 1
+                return None
+            print(f"   [#] {file_path} scored statically, no LLM call needed.")
+            return {"result": "", "static_scores": static_scores}
+
+        blob_key = MetricsCache.key_for(code, blob_sha)
+        evaluated = self.skill_cache.lookup(blob_key, relevant_skills)
+        explanations = self.skill_cache.explanations(blob_key, list(evaluated))
+        missing = [s for s in relevant_skills if normalize_skill(s) not in evaluated]
+        if not missing:
+            print(f"   [=] All {len(relevant_skills)} skills of {file_path} served from the skill cache.")
+        else:
+            analyzer.skills = missing
+            analyzer.model = get_coding_model()
+            analyzer.prefix_cache = get_few_shot_cache()
+            result_dict = analyzer.run(code=code)
+            if "result" not in result_dict:
+                raise RuntimeError(result_dict.get("error", "no result from the coding model"))
 
-    def save_analysis_to_local(self, repo: str, file_path: str, result: str):
+            lines = result_dict["result"].strip().splitlines()
+            lines = [l for l in lines if not l.lower().startswith("note") and not l.strip().startswith("```json")]
+            new_results, explanation = split_evaluation("\n".join(lines).strip())
+            if new_results:
+                new_results = {normalize_skill(k): v for k, v in new_results.items() if isinstance(v, dict)}
+                # A requested skill the model left out was judged absent; cache that too.
+                for skill in missing:
+                    new_results.setdefault(normalize_skill(skill), {"depth": 0, "coverage": False})
+                self.skill_cache.store(blob_key, new_results, explanation)
+                evaluated.update(new_results)
+            if explanation:
+                explanations.append(explanation)
+
+        if not evaluated:
+            return {"result": "\n".join(explanations), "static_scores": static_scores}
+        return {"result": format_evaluation(evaluated, explanations), "static_scores": static_scores}
+
+    def _flush_metrics(self):
+        # The analysis itself is already saved; a lost metrics cache only costs recomputing it.
+        try:
+            self.metrics_cache.flush()
+        except OSError as e:
+            print(f"[!] Could not write the code metrics cache: {e}")
+
+    def _plan_repos(self, scraper: GitHubStructureScraper):
+        """
+        Yields (repo, branch, files) to analyse. Without a file/token budget the
+        scraper stream is passed straight through; with one, the full listing is
+        gathered first (no LLM cost) and reduced to a representative sample.
+        """
+        if self.budget.is_unbounded():
+            yield from scraper.iter_repo_structures()
+            return
+
+        branches = {}
+        for repo, branch, _ in scraper.iter_repo_structures():
+            branches[repo] = branch
+
+        plan = RepresentativeSampler(self.skills).select(scraper.file_meta, scraper.repo_meta, self.budget)
+        total = sum(len(files) for files in scraper.file_meta.values())
+        print(f"[✓] Sampled {len(plan)}/{total} files within {self.budget}.")
+
+        for repo, branch in branches.items():
+            yield repo, branch, [path for r, path in plan if r == repo]
+
+    def analyze(self, max_seconds: float | None = None) -> Exception | None:
+        """
+        Analyses the portfolio unless it was already analysed, resuming an
+        interrupted or time-boxed run from its checkpoint. A finished analysis
+        that lacks some of the claimed skills is extended with just those. `max_seconds`
+        overrides the budget's wall-time limit for this call; the files left
+        are picked up by the next call. Concurrent calls for the same user
+        (from any worker process) are coalesced: one becomes the leader and
+        runs the analysis, the others wait for it and then reuse its files.
+        """
+        if max_seconds is not None:
+            self.budget.max_seconds = max_seconds
         from urllib.parse import urlparse
-        user = urlparse(self.github_url).path.strip("/")
-        base_dir = os.path.join("backend", "services", "github_analyzer", "analized_files", user)
-        structure_path = os.path.join(base_dir, repo, file_path)
-        os.makedirs(os.path.dirname(structure_path), exist_ok=True)
-        with open(structure_path + ".json", "w", encoding="utf-8") as f:
-            json.dump({"file": file_path, "result": result}, f, indent=2)
-
-    def analyze(self) -> Exception | None:
+        username = urlparse(self.github_url).path.strip("/")
+        base_dir = os.path.join("backend", "services", "github_analyzer", "analized_files", username)
+        lock = SingleFlightLock(username, ANALYSIS_LOCK_DIR, stale_after=ANALYSIS_LOCK_STALE_SECONDS)
+
+        store = UserAnalysisStore(base_dir)
+
+        while True:
+            if not lock.is_held() and not store.has_legacy_records() and is_analysis_complete(base_dir) \
+                    and not self._missing_skills(store):
+                print(f"[>>] Analysis already exists for {username}, skipping reprocessing.")
+                return None
+            if lock.try_acquire():
+                break
+            print(f"[..] Another worker is analysing {username}, waiting for its result.")
+            lock.wait()
+
+        try:
+            store.import_legacy()
+            # Local mirrors keep a `git cat-file --batch` process open per repository until closed.
+            with closing(self._scraper()) as scraper:
+                # The previous leader may have finished between our check and the acquire.
+                if is_analysis_complete(base_dir):
+                    missing = self._missing_skills(store)
+                    if missing:
+                        return self._extend_skills(scraper, username, store, missing)
+                    print(f"[>>] Analysis already exists for {username}, skipping reprocessing.")
+                    return None
+                return self._run_analysis(scraper, username, AnalysisCheckpoint(base_dir), store)
+        finally:
+            lock.release()
+
+    def _process_file(self, scraper: GitHubStructureScraper, store: UserAnalysisStore, repo: str, branch: str,
+                      file_path: str, blob_sha: str | None) -> dict | None:
+        """
+        Analyses one file (or reuses the analysis of an identical blob) and
+        saves the record. Returns the record, None when no claimed skill was
+        plausible in the file, and raises when the analysis failed.
+        """
+        file_url = f"https://github.com/{scraper.username}/{repo}/blob/{branch}/{file_path}"
+        self.file_links.append(file_url)
+
+        record = self.deduplicator.lookup(blob_sha)
+        if record is not None:
+            print(f"   [=] Identical to {self.deduplicator.source_of(blob_sha)}, reusing its analysis.")
+        else:
+            try:
+                record = self._analyze_file(scraper, file_url, file_path, blob_sha)
+            except Exception as e:
+                print(f"(X) Failed to analyze {file_url}: {type(e).__name__} - {e}")
+                raise
+            if record is None:
+                # Kept as an empty record so skills added later, and refreshes, still see the file.
+                self.save_analysis_to_local(store, repo, file_path, "", None, blob_sha)
+                return None
+            self.deduplicator.record(blob_sha, record, f"{repo}/{file_path}")
+
+        self.save_analysis_to_local(store, repo, file_path, record["result"], record["static_scores"], blob_sha)
+        return {"file": file_url, **record}
+
+    def _run_analysis(self, scraper: GitHubStructureScraper, username: str, checkpoint: AnalysisCheckpoint,
+                      store: UserAnalysisStore) -> Exception | None:
+        if checkpoint.planning_complete:
+            done, total = checkpoint.progress()
+            print(f"[↻] Resuming analysis of {username}: {done}/{total} planned files already done.")
+            repo_stream = iter(checkpoint.pending())
+        else:
+            # The listing was never fully read: scrape again (no LLM cost), skipping finished files.
+            repo_stream = self._plan_repos(scraper)
+        self.budget.start()
+        failed = 0
+
+        # Unbudgeted, repos arrive page by page and analysis starts before the listing is complete.
+        while True:
+            try:
+                repo, branch, files = next(repo_stream)
+            except StopIteration:
+                checkpoint.finish_planning()
+                break
+            except Exception as error:
+                print(f"[!] GitHub scraping failed for {username}: {error}")
+                return error
+
+            repo_files = scraper.file_meta.get(repo, {})
+            planned = {path: repo_files.get(path, {}).get("sha") for path in files}
+            if repo in scraper.repo_meta:
+                checkpoint.plan(repo, branch, planned, scraper.repo_meta[repo].get("tree_sha"),
+                                {path: meta.get("sha") for path, meta in repo_files.items()})
+            else:
+                checkpoint.plan(repo, branch, planned)
+            files = [path for path in files if not checkpoint.is_done(repo, path)]
+
+            # The listing this analysis was planned from is what a later refresh diffs against. Resumed runs
+            # never list the repository again, so it comes from the checkpoint (or, for checkpoints written
+            # before listings were kept, from the current tree and the plan itself).
+            listing = checkpoint.listing(repo)
+            if listing is None:
+                try:
+                    tree_sha = scraper.get_tree_sha(repo, branch)
+                except Exception as error:
+                    # Without a tree SHA the next refresh just rescans this repository.
+                    print(f"[!] Could not read the tree of {repo}: {error}")
+                    tree_sha = None
+                listing = tree_sha, dict(checkpoint.planned[repo])
+            store.set_repo(repo, branch, *listing)
+
+            self.repo_count += 1
+            print(f"\n[→] Working on Repository {self.repo_count}: {repo} ({len(files)} relevant files)")
+            repo_results = []
+            for i, file_path in enumerate(files, start=1):
+                if self.budget.time_exhausted():
+                    break
+                print(f"   {i}/{len(files)}")
+                try:
+                    record = self._process_file(scraper, store, repo, branch, file_path,
+                                                checkpoint.sha_of(repo, file_path))
+                except Exception:
+                    failed += 1
+                    continue
+                if record is not None:
+                    repo_results.append(record)
+                checkpoint.mark_done(repo, file_path)
+            self.analysis_results[repo] = repo_results
+
+            if self.budget.time_exhausted():
+                print(f"[!] Wall-time budget of {self.budget.max_seconds}s reached, returning partial analysis.")
+                break
+
+        self._flush_metrics()
+        checkpoint.complete(partial=self.budget.time_exhausted())
+        if checkpoint.status == "complete":
+            store.add_evaluated_skills(normalize_skill(s) for s in self.skills)
+        done, total = checkpoint.progress()
+        print(f"[✓] Checkpoint: {done}/{total} planned files done ({failed} failed this run), status {checkpoint.status}.")
+        print(f"[✓] Found {self.repo_count} repositories with {len(self.file_links)} relevant files.")
+        print(f"[✓] Dedup: skipped {scraper.skipped['forks']} forks and {scraper.skipped['vendored']} "
+              f"vendored/generated files; saved {self.deduplicator.saved_calls} LLM calls on duplicate blobs.")
+        print(f"[✓] Static prefilter: skipped {self.prefilter_stats['files_skipped']} files and pruned "
+              f"{self.prefilter_stats['skills_pruned']} skill evaluations from prompts.")
+        return None
+
+    def _extend_skills(self, scraper: GitHubStructureScraper, username: str, store: UserAnalysisStore,
+                       missing: list[str]) -> Exception | None:
+        """
+        Evaluates skills a finished analysis never covered over every file it
+        looked at (including the ones no claimed skill was plausible in) and
+        merges the judgments into their records.
+        """
+        records = list(store.records())
+        branches = {repo: row["branch"] for repo, row in store.repos().items()}
+        print(f"[+] Evaluating {len(missing)} new skills ({', '.join(missing)}) over "
+              f"{len(records)} analysed files of {username}.")
+        self.budget.start()
+        failed = 0
+        for i, record in enumerate(records, start=1):
+            if self.budget.time_exhausted():
+                print(f"[!] Wall-time budget of {self.budget.max_seconds}s reached, the rest follows next time.")
+                break
+            print(f"   {i}/{len(records)}")
+            # HEAD (the default branch) for analyses stored before their repository listing was.
+            branch = branches.get(record["repo"], "HEAD")
+            file_url = f"https://github.com/{scraper.username}/{record['repo']}/blob/{branch}/{record['file']}"
+            try:
+                addition = self._analyze_file(scraper, file_url, record["file"], record["blob_sha"], skills=missing)
+            except Exception as e:
+                print(f"(X) Failed to extend {file_url}: {type(e).__name__} - {e}")
+                failed += 1
+                continue
+            if addition is None:
+                continue
+
+            old_results, old_explanation = split_evaluation(record["result"])
+            new_results, new_explanation = split_evaluation(addition["result"])
+            result = format_evaluation({**old_results, **new_results},
+                                       [e for e in (old_explanation, new_explanation) if e])
+            store.save(record["repo"], record["file"], result,
+                       {**record["static_scores"], **addition["static_scores"]}, record["blob_sha"])
+
+        self._flush_metrics()
+        # Files that failed or were not reached keep the skills missing, so the next call retries them.
+        if not failed and not self.budget.time_exhausted():
+            store.add_evaluated_skills(normalize_skill(s) for s in missing)
+        print(f"[✓] Extended {username} with {len(missing)} skills ({failed} files failed); "
+              f"skill cache {self.skill_cache.stats()}.")
+        return None
+
+    def refresh(self) -> Exception | None:
+        """
+        Brings a finished analysis up to date with the user's repositories.
+        Repositories whose tree SHA is unchanged cost one small API call;
+        for the others only added or modified blobs reach the coding model
+        and records of deleted files are removed. Users without a finished
+        analysis get a regular analyze().
+        """
         from urllib.parse import urlparse
         username = urlparse(self.github_url).path.strip("/")
         base_dir = os.path.join("backend", "services", "github_analyzer", "analized_files", username)
+        if not is_analysis_complete(base_dir):
+            return self.analyze()
 
-        if os.path.exists(base_dir) and any(os.scandir(base_dir)):
-            print(f"[>>] Analysis already exists for {username}, skipping reprocessing.")
+        lock = SingleFlightLock(username, ANALYSIS_LOCK_DIR, stale_after=ANALYSIS_LOCK_STALE_SECONDS)
+        if not lock.try_acquire():
+            print(f"[..] Another worker is already updating {username}, skipping refresh.")
             return None
+        store = UserAnalysisStore(base_dir)
+        try:
+            store.import_legacy()
+            # Changed files are re-evaluated for every skill the analysis already covers, not just this job's.
+            claimed = {normalize_skill(s) for s in self.skills}
+            self._set_skills(self.skills + sorted(self._evaluated_skills(store) - claimed))
+            with closing(self._scraper()) as scraper:
+                error = self._run_refresh(scraper, username, store)
+                missing = self._missing_skills(store)
+                if error is None and missing:
+                    error = self._extend_skills(scraper, username, store, missing)
+            return error
+        finally:
+            lock.release()
 
-        scraper = GitHubStructureScraper(self.github_url)
-        (scrape_result, error) = scraper.scrape_with_error()
+    def _run_refresh(self, scraper: GitHubStructureScraper, username: str,
+                     store: UserAnalysisStore) -> Exception | None:
+        known = store.repos()
+        stats = {"unchanged": 0, "added": 0, "modified": 0, "deleted": 0}
+        changed = {}  # repo -> (branch, files to analyse, new {path: sha} listing)
 
-        if error:
+        try:
+            for repo in scraper.iter_repos():
+                if not scraper.is_candidate_repo(repo):
+                    continue
+                name, branch = repo["name"], repo.get("default_branch", "main")
+                row = known.pop(name, None)
+                if row and row["branch"] == branch and row["tree_sha"] \
+                        and scraper.get_tree_sha(name, branch) == row["tree_sha"]:
+                    store.touch_repo(name)
+                    stats["unchanged"] += 1
+                    continue
+
+                analysed = store.blob_shas(name)
+                old_files = row["files"] if row else dict(analysed)
+                scraper.mark_blobs_known(old_files.values())
+                branch, structure = scraper.scan_repo(repo)
+                new_files = {path: scraper.file_meta[name][path]["sha"] for path in structure}
+
+                for path in analysed.keys() - new_files.keys():
+                    store.remove(name, path)
+                    stats["deleted"] += 1
+
+                to_analyse = []
+                for path, sha in new_files.items():
+                    if path in analysed:
+                        if analysed[path] is None:
+                            # Analysed before blob SHAs were recorded: adopt the current SHA as the baseline.
+                            store.set_blob_sha(name, path, sha)
+                        elif analysed[path] != sha:
+                            to_analyse.append(path)
+                            stats["modified"] += 1
+                    elif path not in old_files and (row or not analysed):
+                        to_analyse.append(path)
+                        stats["added"] += 1
+                changed[name] = (branch, to_analyse, new_files)
+        except Exception as error:
             print(f"[!] GitHub scraping failed for {username}: {error}")
             return error
 
-        self.repo_count, self.file_links, repo_structure = scrape_result
-        print(f"[✓] Found {self.repo_count} repositories with {len(self.file_links)} relevant files.")
+        for name in known:
+            print(f"[-] Repository {name} no longer exists, removing its analysis.")
+            stats["deleted"] += len(store.blob_shas(name))
+            store.remove_repo(name)
 
-        for repo_index, (repo, files) in enumerate(repo_structure.items(), start=1):
-            print(f"\n[→] Working on Repository {repo_index}/{self.repo_count}: {repo}")
-            repo_results = []
+        if not self.budget.is_unbounded():
+            candidates = {name: {path: scraper.file_meta[name][path] for path in files}
+                          for name, (_, files, _) in changed.items()}
+            selected = set(RepresentativeSampler(self.skills).select(candidates, scraper.repo_meta, self.budget))
+            changed = {name: (branch, [p for p in files if (name, p) in selected], new_files)
+                       for name, (branch, files, new_files) in changed.items()}
+
+        self.budget.start()
+        failed = 0
+        for name, (branch, files, new_files) in changed.items():
+            self.repo_count += 1
+            print(f"\n[↻] Updating Repository {self.repo_count}: {name} ({len(files)} changed files)")
+            repo_failed = 0
             for i, file_path in enumerate(files, start=1):
+                if self.budget.time_exhausted():
+                    break
                 print(f"   {i}/{len(files)}")
-                file_url = f"https://github.com/{scraper.username}/{repo}/blob/main/{file_path}"
                 try:
-                    analyzer = SingleScriptAnalyzer(file_url, self.skills, model)
-                    result_dict = analyzer.run()
-
-                    if "result" in result_dict:
-                        raw_result = result_dict["result"]
-                        lines = raw_result.strip().splitlines()
-                        lines = [l for l in lines if not l.lower().startswith("note") and not l.strip().startswith("```json")]
-                        cleaned_output = "\n".join(lines).strip()
-
-                        repo_results.append({"file": file_url, "result": cleaned_output})
-                        self.save_analysis_to_local(repo, file_path, cleaned_output)
-                    else:
-                        print(f"(!) Skipped saving for {file_url} due to error: {result_dict.get('error')}")
+                    self._process_file(scraper, store, name, branch, file_path, new_files[file_path])
                 except Exception:
-                    pass
-            self.analysis_results[repo] = repo_results
+                    repo_failed += 1
+            failed += repo_failed
+            # Without the new tree SHA the next refresh diffs this repository again and retries what is missing.
+            if not repo_failed and not self.budget.time_exhausted():
+                store.set_repo(name, branch, scraper.repo_meta[name].get("tree_sha"), new_files)
 
+        self._flush_metrics()
+        print(f"[✓] Refreshed {username}: {stats['unchanged']} repositories unchanged, {stats['added']} added, "
+              f"{stats['modified']} modified and {stats['deleted']} deleted files ({failed} failed).")
         return None
 
 if __name__ == "__main__":
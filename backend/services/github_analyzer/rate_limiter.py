@@ -0,0 +1,215 @@
+"""
+rate_limiter.py
+───────────────
+Client-side scheduler for GitHub REST API calls made by the portfolio
+analyzer. Instead of discovering exhausted quotas after the fact (a 403
+with "rate limit" in the message), every call to `api.github.com` goes
+through a shared token bucket that is kept in sync with the
+`X-RateLimit-*` headers GitHub returns.
+
+Class
+─────
+• GitHubRateLimiter
+    - While more than `low_water` calls are left, requests go out
+      unthrottled (the bucket holds the whole remaining quota).
+    - Below it, a token bucket refilled at `remaining / seconds_until_reset`
+      spreads what is left evenly over the reset window instead of burning
+      it in one burst and then failing.
+    - Waiting callers are served in priority order; requests belonging to
+      analyses that are already running (PRIORITY_IN_FLIGHT) go before
+      requests that would start a new portfolio (PRIORITY_NEW).
+    - Retries 403/429 rate-limit responses once the quota resets and only
+      raises GitHubRateLimitError when the wait would exceed `max_wait`.
+
+Functions
+─────────
+• get_shared_rate_limiter() -> GitHubRateLimiter
+      Returns the process-wide limiter shared by every portfolio worker.
+
+Example
+───────
+limiter = get_shared_rate_limiter()
+response = limiter.request(session, "GET", "https://api.github.com/users/octocat/repos")
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+PRIORITY_IN_FLIGHT = 0
+PRIORITY_NEW = 10
+
+RATE_LIMITED_STATUSES = (403, 429)
+
+
+class GitHubRateLimitError(Exception):
+    """
+    Raised when the GitHub quota is exhausted and waiting for the reset
+    would take longer than the limiter's `max_wait`.
+    """
+    def __init__(self, reset_at: float, message: str | None = None):
+        self.reset_at = reset_at
+        wait = max(0, int(reset_at - time.time()))
+        super().__init__(message or f"GitHub API rate limit exhausted; quota resets in {wait}s.")
+
+
+class GitHubRateLimiter:
+    def __init__(self, limit: int = 5000, window: float = 3600.0, burst: int = 20,
+                 max_wait: float = 900.0, max_retries: int = 3, low_water: int = 500):
+        """
+        limit / window are the assumed quota until GitHub reports the real one.
+        low_water is the remaining quota below which calls are paced; burst is
+        the bucket capacity while pacing (how many calls may go out back-to-back).
+        """
+        self.limit = limit
+        self.burst = burst
+        self.low_water = low_water
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+
+        now = time.time()
+        self._remaining = limit
+        self._reset_at = now + window
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+
+    # ──────────────────────────────
+    # Bucket bookkeeping (callers hold self._cond)
+    # ──────────────────────────────
+
+    def _rate(self) -> float:
+        """Tokens per second that keep us within the quota until reset."""
+        seconds_left = max(self._reset_at - time.time(), 1.0)
+        return max(self._remaining, 0) / seconds_left
+
+    def _refill(self):
+        now = time.monotonic()
+        if time.time() >= self._reset_at and self._remaining <= 0:
+            # Window rolled over without a response telling us the new quota.
+            self._remaining = self.limit
+            self._reset_at = time.time() + 3600.0
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self._remaining > self.low_water:
+            # Plenty of quota left: every remaining call may go out right away.
+            self._tokens = float(self._remaining)
+            return
+        cap = min(float(self.burst), float(max(self._remaining, 0)))
+        self._tokens = min(cap, self._tokens + elapsed * self._rate())
+
+    def _seconds_until_token(self) -> float:
+        if self._remaining <= 0:
+            return max(self._reset_at - time.time(), 0.05)
+        rate = self._rate()
+        if rate <= 0:
+            return max(self._reset_at - time.time(), 0.05)
+        return max((1.0 - self._tokens) / rate, 0.0)
+
+    # ──────────────────────────────
+    # Public API
+    # ──────────────────────────────
+
+    def acquire(self, priority: int = PRIORITY_NEW):
+        """
+        Blocks until a request slot is available for the caller.
+        Lower priority values are served first; ties are served FIFO.
+        """
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == ticket and self._tokens >= 1.0 and self._remaining > 0:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= 1.0
+                        self._remaining -= 1
+                        return
+
+                    wait = self._seconds_until_token()
+                    if time.monotonic() + wait > deadline:
+                        raise GitHubRateLimitError(self._reset_at)
+                    self._cond.wait(timeout=max(wait, 0.01))
+            finally:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def update_from_headers(self, headers, status_code: int = 200):
+        """
+        Syncs the bucket with the X-RateLimit-* (and Retry-After) headers of a
+        GitHub response. Only 2xx and rate-limited responses are trusted: error
+        pages from proxies or caches may carry stale or foreign headers.
+        """
+        if not (200 <= status_code < 300 or status_code in RATE_LIMITED_STATUSES):
+            return
+        with self._cond:
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset = headers.get("X-RateLimit-Reset")
+            limit = headers.get("X-RateLimit-Limit")
+            retry_after = headers.get("Retry-After")
+
+            if limit is not None:
+                self.limit = int(limit)
+            if reset is not None:
+                self._reset_at = float(reset)
+            if remaining is not None:
+                self._remaining = int(remaining)
+                self._tokens = min(self._tokens, float(self._remaining))
+
+            if status_code in RATE_LIMITED_STATUSES and retry_after is not None:
+                # Secondary (abuse) limits: back off without touching the primary quota.
+                self._tokens = 0.0
+                self._reset_at = max(self._reset_at, time.time() + float(retry_after))
+                self._remaining = 0 if remaining is None else self._remaining
+
+            self._cond.notify_all()
+
+    @staticmethod
+    def is_rate_limited(response) -> bool:
+        if response.status_code not in RATE_LIMITED_STATUSES:
+            return False
+        headers = response.headers
+        return headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in headers
+
+    def request(self, session, method: str, url: str, priority: int = PRIORITY_NEW, **kwargs):
+        """
+        Performs `session.request(method, url, **kwargs)` once a slot is
+        available, retrying rate-limited responses after the quota resets.
+        """
+        for _ in range(self.max_retries + 1):
+            self.acquire(priority)
+            response = session.request(method, url, **kwargs)
+            self.update_from_headers(response.headers, response.status_code)
+            if not self.is_rate_limited(response):
+                return response
+            print(f"[!] GitHub rate limit hit for {url}; waiting for quota reset.")
+        raise GitHubRateLimitError(self._reset_at)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "remaining": self._remaining,
+                "reset_at": self._reset_at,
+                "tokens": round(self._tokens, 2),
+                "waiting": len(self._waiters),
+            }
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> GitHubRateLimiter:
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = GitHubRateLimiter()
+        return _shared_limiter
@@ -0,0 +1,209 @@
+"""
+sampling.py
+───────────
+Bounds the cost of a portfolio analysis by choosing a representative subset
+of the scraped files before any of them reaches the coding model.
+
+Classes
+───────
+• AnalysisBudget
+    - Per-portfolio limits on number of files, estimated prompt tokens and
+      wall-clock seconds. Any limit set to None is unbounded. A file or
+      token limit makes the analyzer read the full listing before it
+      starts, since the sample is chosen across all repositories.
+
+• RepresentativeSampler
+    - Scores every file by path role, size, language and repository recency.
+    - Guarantees each claimed skill its best matching file first, then fills
+      the remaining budget round-robin across repositories (most recently
+      pushed first) so no single large repo eats the whole budget.
+
+Example
+───────
+budget = AnalysisBudget(max_files=40, max_tokens=80_000, max_seconds=1200)
+plan = RepresentativeSampler(skills).select(file_meta, repo_meta, budget)
+for repo, path in plan: ...
+"""
+
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+from backend.services.github_analyzer.languages import LANGUAGE_EXTS
+
+BYTES_PER_TOKEN = 4                     # rough average for source code
+ESTIMATED_PROMPT_OVERHEAD_TOKENS = 900  # instructions + few-shot examples
+
+CORE_DIRS = {"src", "lib", "app", "core", "pkg", "internal", "server", "api", "backend", "frontend"}
+CORE_NAMES = {"main", "index", "app", "server", "core", "engine", "model", "models", "service", "services"}
+TEST_DIRS = {"test", "tests", "spec", "specs", "__tests__"}
+AUX_DIRS = {"example", "examples", "demo", "demos", "docs", "doc", "scripts", "tools", "samples", "sample"}
+BOILERPLATE_NAMES = {"__init__", "setup", "conftest", "settings", "config", "manage", "wsgi", "asgi"}
+
+EXT_TO_LANGUAGE = {ext: lang for lang, exts in LANGUAGE_EXTS.items() for ext in exts}
+
+
+class AnalysisBudget:
+    def __init__(self, max_files: int | None = None, max_tokens: int | None = None,
+                 max_seconds: float | None = None):
+        self.max_files = max_files
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.started_at = None
+
+    def is_unbounded(self) -> bool:
+        return self.max_files is None and self.max_tokens is None
+
+    def start(self):
+        self.started_at = time.monotonic()
+
+    def time_exhausted(self) -> bool:
+        if self.max_seconds is None or self.started_at is None:
+            return False
+        return time.monotonic() - self.started_at >= self.max_seconds
+
+    def __repr__(self):
+        return (f"AnalysisBudget(max_files={self.max_files}, max_tokens={self.max_tokens}, "
+                f"max_seconds={self.max_seconds})")
+
+
+def estimate_tokens(size_bytes: int) -> int:
+    return ESTIMATED_PROMPT_OVERHEAD_TOKENS + max(size_bytes, 0) // BYTES_PER_TOKEN
+
+
+def file_language(path: str) -> str | None:
+    return EXT_TO_LANGUAGE.get(os.path.splitext(path)[1].lower())
+
+
+def _path_tokens(path: str) -> set[str]:
+    return {t for t in re.split(r"[^a-z0-9+#]+", path.lower()) if t}
+
+
+class RepresentativeSampler:
+    def __init__(self, skills: list[str]):
+        self.skills = [s.lower() for s in skills]
+
+    # ──────────────────────────────
+    # Scoring
+    # ──────────────────────────────
+
+    @staticmethod
+    def role_score(path: str) -> float:
+        parts = path.lower().split("/")
+        dirs, name = set(parts[:-1]), os.path.splitext(parts[-1])[0]
+        if name.startswith("readme"):
+            return 0.3
+        if name in BOILERPLATE_NAMES:
+            return 0.2
+        if dirs & TEST_DIRS or name.startswith("test_") or name.endswith(("_test", ".test", ".spec")):
+            return 0.6
+        if dirs & AUX_DIRS:
+            return 0.4
+        if dirs & CORE_DIRS or name in CORE_NAMES:
+            return 1.0
+        return 0.8
+
+    @staticmethod
+    def size_score(size_bytes: int) -> float:
+        """Mid-sized files carry the most signal per token; tiny or huge ones less."""
+        if size_bytes < 400:
+            return 0.3
+        if size_bytes <= 20_000:
+            return 1.0
+        if size_bytes <= 60_000:
+            return 0.6
+        return 0.3
+
+    @staticmethod
+    def recency_score(pushed_at: str | None) -> float:
+        if not pushed_at:
+            return 0.5
+        try:
+            pushed = datetime.fromisoformat(pushed_at.replace("Z", "+00:00"))
+        except ValueError:
+            return 0.5
+        age_days = (datetime.now(timezone.utc) - pushed).days
+        return 1.0 / (1.0 + max(age_days, 0) / 365.0)
+
+    def skills_for(self, path: str) -> list[str]:
+        """Claimed skills this file is an obvious candidate for (language or path keyword)."""
+        language = file_language(path)
+        tokens = _path_tokens(path)
+        matched = []
+        for skill in self.skills:
+            skill_tokens = _path_tokens(skill)
+            if skill == language or (skill_tokens and skill_tokens <= tokens):
+                matched.append(skill)
+        return matched
+
+    def score(self, path: str, size_bytes: int, pushed_at: str | None) -> float:
+        language_bonus = 1.2 if self.skills_for(path) else 1.0
+        return (self.role_score(path) * self.size_score(size_bytes)
+                * (0.5 + 0.5 * self.recency_score(pushed_at)) * language_bonus)
+
+    # ──────────────────────────────
+    # Selection
+    # ──────────────────────────────
+
+    def select(self, file_meta: dict, repo_meta: dict, budget: AnalysisBudget) -> list[tuple[str, str]]:
+        """
+        file_meta: {repo: {path: {"size": bytes, ...}}}
+        repo_meta: {repo: {"pushed_at": iso8601, ...}}
+        Returns the chosen (repo, path) pairs, grouped by repo in scraping order.
+        """
+        scores = {}
+        for repo, files in file_meta.items():
+            pushed_at = repo_meta.get(repo, {}).get("pushed_at")
+            for path, meta in files.items():
+                scores[(repo, path)] = self.score(path, meta.get("size", 0), pushed_at)
+        ranked = {
+            repo: sorted(files, key=lambda p, r=repo: scores[(r, p)], reverse=True)
+            for repo, files in file_meta.items()
+        }
+
+        chosen = set()
+        state = {"files": 0, "tokens": 0}
+
+        def take(repo, path) -> bool:
+            tokens = estimate_tokens(file_meta[repo][path].get("size", 0))
+            if budget.max_files is not None and state["files"] + 1 > budget.max_files:
+                return False
+            if budget.max_tokens is not None and state["tokens"] + tokens > budget.max_tokens:
+                return False
+            chosen.add((repo, path))
+            state["files"] += 1
+            state["tokens"] += tokens
+            return True
+
+        # 1) Every claimed skill gets its single best candidate first.
+        for skill in self.skills:
+            candidates = [
+                key for key in scores
+                if skill in self.skills_for(key[1]) and key not in chosen
+            ]
+            if candidates:
+                take(*max(candidates, key=scores.get))
+
+        # 2) Fill the rest round-robin across repos, most recently pushed first.
+        repo_order = sorted(
+            ranked, key=lambda r: self.recency_score(repo_meta.get(r, {}).get("pushed_at")), reverse=True
+        )
+        cursors = {repo: 0 for repo in repo_order}
+        pending = True
+        while pending:
+            if budget.max_files is not None and state["files"] >= budget.max_files:
+                break
+            pending = False
+            for repo in repo_order:
+                paths = ranked[repo]
+                while cursors[repo] < len(paths) and (repo, paths[cursors[repo]]) in chosen:
+                    cursors[repo] += 1
+                if cursors[repo] >= len(paths):
+                    continue
+                # A file too large for the remaining tokens is dropped; smaller ones may still fit.
+                take(repo, paths[cursors[repo]])
+                cursors[repo] += 1
+                pending = True
+
+        return [(repo, path) for repo in file_meta for path in ranked[repo] if (repo, path) in chosen]
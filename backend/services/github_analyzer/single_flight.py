@@ -0,0 +1,150 @@
+"""
+single_flight.py
+────────────────
+Cross-process "only one worker does it" coordination for portfolio work.
+
+One applicant is usually matched against several jobs, so several queue
+messages for the same GitHub user can reach different workers at once.
+Without coordination each of them scraped GitHub and ran the coding model
+over the same files. A SingleFlightLock, keyed by GitHub username, lets the
+first worker do the work while the others wait for it to finish and then
+reuse what it wrote.
+
+The lock is a file created with O_CREAT | O_EXCL, which is atomic on every
+platform and filesystem the agents run on. The holder refreshes the file's
+mtime from a heartbeat thread; a lock that has not been refreshed for
+`stale_after` seconds belongs to a crashed worker and may be taken over;
+takeovers are serialized through a short-lived `<lock>.break` file.
+
+Class
+─────
+• SingleFlightLock(key, lock_dir, stale_after, poll_interval)
+    - try_acquire() -> bool        Become the leader, without blocking.
+    - wait(timeout=None) -> bool   Block until the leader releases (or dies).
+    - release()
+    - is_held() -> bool            A live leader currently holds the lock.
+"""
+
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+
+DEFAULT_STALE_AFTER = 120
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class SingleFlightLock:
+    def __init__(self, key: str, lock_dir: str, stale_after: float = DEFAULT_STALE_AFTER,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        safe_key = re.sub(r"[^\w.-]+", "_", key.lower())
+        self.path = os.path.join(lock_dir, f"{safe_key}.lock")
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self._token = None
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat = None
+
+    def _age(self) -> float | None:
+        try:
+            return time.time() - os.path.getmtime(self.path)
+        except FileNotFoundError:
+            return None
+
+    def is_held(self) -> bool:
+        age = self._age()
+        return age is not None and age < self.stale_after
+
+    def _break_if_stale(self):
+        age = self._age()
+        if age is None or age < self.stale_after:
+            return
+        # Followers that all saw the stale lock break it one at a time and re-check under the breaker,
+        # so none of them removes the fresh lock a faster follower already created in its place.
+        breaker = f"{self.path}.break"
+        try:
+            fd = os.open(breaker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                # A breaker that crashed would otherwise block every later takeover.
+                if time.time() - os.path.getmtime(breaker) >= self.stale_after:
+                    os.remove(breaker)
+            except FileNotFoundError:
+                pass
+            return
+        os.close(fd)
+        try:
+            age = self._age()
+            if age is not None and age >= self.stale_after:
+                print(f"[!] Lock {self.path} not refreshed for {int(age)}s, taking over from a dead worker.")
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+        finally:
+            os.remove(breaker)
+
+    def try_acquire(self) -> bool:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._break_if_stale()
+        token = uuid.uuid4().hex
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"token": token, "host": socket.gethostname(), "pid": os.getpid(),
+                       "acquired_at": time.time()}, f)
+
+        self._token = token
+        self._stop_heartbeat.clear()
+        self._heartbeat = threading.Thread(target=self._refresh, daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _refresh(self):
+        while not self._stop_heartbeat.wait(self.stale_after / 4):
+            try:
+                os.utime(self.path)
+            except FileNotFoundError:
+                return
+
+    def _owns_lock_file(self) -> bool:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f).get("token") == self._token
+        except (OSError, json.JSONDecodeError):
+            return False
+
+    def release(self):
+        if self._token is None:
+            return
+        self._stop_heartbeat.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        # Never delete a lock a follower took over after we stalled past stale_after.
+        if self._owns_lock_file():
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+        self._token = None
+        self._heartbeat = None
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Returns True once no live leader holds the lock, False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_held():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def __enter__(self):
+        return self.try_acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
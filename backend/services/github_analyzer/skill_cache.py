@@ -0,0 +1,105 @@
+"""
+skill_cache.py
+──────────────
+Global cache of per-file, per-skill LLM judgments.
+
+An analysis used to be cached per GitHub user only: whatever skills the
+first applicant claimed were all later jobs ever got, and adding a skill
+meant redoing every file. This cache stores each judgment under
+(blob key, skill, prompt version, model), so
+
+- a file is only asked about the skills that were never evaluated for its
+  exact content with the current prompt and model, and
+- identical blobs in other users' portfolios (forks, copied files,
+  templates) reuse the judgment as well.
+
+The blob key is the git blob SHA when known, otherwise a content hash
+(see MetricsCache.key_for).
+
+Class
+─────
+• SkillResultCache(db_path, model_name, prompt_version)
+    - lookup(blob_key, skills) -> {skill: {"depth", "coverage"}}
+    - store(blob_key, results, explanation="")
+    - explanations(blob_key, skills) -> list[str]
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+from backend.services.github_analyzer.skill_results import normalize_skill
+
+
+class SkillResultCache:
+    def __init__(self, db_path: str, model_name: str, prompt_version: int):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS skill_results (
+                    blob_key TEXT NOT NULL,
+                    skill TEXT NOT NULL,
+                    prompt_version INTEGER NOT NULL,
+                    model TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    explanation TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (blob_key, skill, prompt_version, model)
+                )
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _rows(self, blob_key: str, skills: list[str]):
+        keys = [normalize_skill(s) for s in skills]
+        if not blob_key or not keys:
+            return []
+        placeholders = ", ".join("?" for _ in keys)
+        with closing(self._connect()) as conn:
+            return conn.execute(f'''
+                SELECT skill, result, explanation FROM skill_results
+                WHERE blob_key = ? AND prompt_version = ? AND model = ? AND skill IN ({placeholders})
+            ''', (blob_key, self.prompt_version, self.model_name, *keys)).fetchall()
+
+    def lookup(self, blob_key: str | None, skills: list[str]) -> dict:
+        found = {skill: json.loads(result) for skill, result, _ in self._rows(blob_key, skills)}
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(skills) - len(found)
+        return found
+
+    def explanations(self, blob_key: str | None, skills: list[str]) -> list[str]:
+        seen = []
+        for _, _, explanation in self._rows(blob_key, skills):
+            if explanation and explanation not in seen:
+                seen.append(explanation)
+        return seen
+
+    def store(self, blob_key: str | None, results: dict, explanation: str = ""):
+        """`results` maps each evaluated skill to {"depth", "coverage"}."""
+        if not blob_key or not results:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany('''
+                INSERT OR REPLACE INTO skill_results (blob_key, skill, prompt_version, model, result, explanation)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (blob_key, normalize_skill(skill), self.prompt_version, self.model_name,
+                 json.dumps(details), explanation or None)
+                for skill, details in results.items()
+            ])
+            conn.commit()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,266 @@
+"""
+skill_prefilter.py
+──────────────────
+Cheap static pre-pass that runs before the coding LLM sees a file.
+
+Every claimed skill used to be sent to SingleScriptAnalyzer for every file,
+so a stylesheet was scored for "Operating Systems" and a shell script for
+"React". This module reads a file's imports (AST for Python, regexes for the
+other languages in LANGUAGE_EXTS) plus a few keyword signatures and keeps
+only the skills the file could plausibly evidence.
+
+Class
+─────
+• SkillPrefilter
+    - relevant_skills(path, code) -> list[str]
+          Subset of the claimed skills worth asking the LLM about; an empty
+          list means the file can be skipped entirely.
+
+Rules
+─────
+• Language skills ("python", "c++", "typescript", ...) match by extension.
+• Known concept skills match on imported modules or keyword signatures.
+• Unknown skills fall back to their words appearing in the path or code, so
+  nothing claimed is silently dropped just because it has no signature.
+"""
+
+import ast
+import os
+import re
+
+from backend.services.github_analyzer.languages import LANGUAGE_EXTS
+from backend.services.github_analyzer.skill_results import normalize_skill
+
+EXT_TO_LANGUAGE = {ext: lang for lang, exts in LANGUAGE_EXTS.items() for ext in exts}
+
+LANGUAGE_ALIASES = {
+    "py": "python", "js": "javascript", "node": "javascript", "nodejs": "javascript",
+    "node js": "javascript", "ts": "typescript", "cpp": "c++", "c": "c++",
+    "c#": "csharp", "c sharp": "csharp", "golang": "go", "html5": "html", "css3": "css",
+    "bash": "shell", "shell scripting": "shell",
+}
+
+SKILL_ALIASES = {
+    "ml": "machine learning", "artificial intelligence": "ai", "dl": "deep learning",
+    "os": "operating systems", "dsa": "data structures", "data structures and algorithms": "data structures",
+    "object oriented design": "object oriented programming", "exception handling": "error handling",
+    "sql databases": "sql", "reactjs": "react", "react js": "react", "amazon web services": "aws",
+}
+
+# Languages whose files also evidence another language skill.
+LANGUAGE_IMPLIES = {"typescript": {"javascript"}}
+
+IMPORT_PATTERNS = {
+    "javascript": [r"""import\s+(?:[\w*{}\s,]+\s+from\s+)?['"]([^'"]+)['"]""", r"""require\(\s*['"]([^'"]+)['"]\s*\)"""],
+    "typescript": [r"""import\s+(?:[\w*{}\s,]+\s+from\s+)?['"]([^'"]+)['"]""", r"""require\(\s*['"]([^'"]+)['"]\s*\)"""],
+    "java": [r"^\s*import\s+(?:static\s+)?([\w.]+)"],
+    "kotlin": [r"^\s*import\s+([\w.]+)"],
+    "c++": [r"""^\s*#\s*include\s*[<"]([^>"]+)[>"]"""],
+    "csharp": [r"^\s*using\s+([\w.]+)\s*;"],
+    "go": [r"""^\s*import\s+"([^"]+)\"""", r"""^\s*(?:\w+\s+)?"([\w./-]+)"\s*$"""],
+    "rust": [r"^\s*(?:use|extern\s+crate)\s+([\w:]+)"],
+    "ruby": [r"""^\s*require(?:_relative)?\s+['"]([^'"]+)['"]"""],
+    "php": [r"^\s*use\s+([\w\\\\]+)", r"""(?:require|include)(?:_once)?\s*\(?\s*['"]([^'"]+)['"]"""],
+    "swift": [r"^\s*import\s+(\w+)"],
+}
+
+# normalized skill -> imported module prefixes / keyword regexes that can evidence it
+SKILL_SIGNATURES = {
+    "machine learning": {
+        "imports": {"sklearn", "tensorflow", "torch", "keras", "xgboost", "lightgbm", "catboost", "@tensorflow"},
+        "keywords": [r"\.fit\(", r"\.predict\(", r"train_test_split", r"\bmodel\.train\b"],
+    },
+    "deep learning": {
+        "imports": {"tensorflow", "torch", "keras", "jax", "flax", "@tensorflow"},
+        "keywords": [r"\bnn\.Module\b", r"\bConv2d\b", r"\bDense\(", r"backward\(\)"],
+    },
+    "ai": {
+        "imports": {"sklearn", "tensorflow", "torch", "keras", "transformers", "openai", "langchain",
+                    "llama_cpp", "spacy", "nltk", "@tensorflow"},
+        "keywords": [r"\bneural\b", r"\bagent\b", r"\bheuristic\b", r"\bminimax\b", r"\bprompt\b"],
+    },
+    "data science": {
+        "imports": {"pandas", "numpy", "scipy", "matplotlib", "seaborn", "sklearn", "statsmodels"},
+        "keywords": [r"\bDataFrame\b", r"\.groupby\("],
+    },
+    "pandas": {"imports": {"pandas"}, "keywords": [r"\bpd\.", r"\bDataFrame\b"]},
+    "numpy": {"imports": {"numpy"}, "keywords": [r"\bnp\."]},
+    "sql": {
+        "imports": {"sqlite3", "sqlalchemy", "psycopg2", "pymysql", "mysql", "pg", "sequelize", "knex",
+                    "java.sql", "database/sql", "diesel", "System.Data"},
+        "keywords": [r"\bSELECT\b.+\bFROM\b", r"\bINSERT\s+INTO\b", r"\bCREATE\s+TABLE\b", r"\bUPDATE\b.+\bSET\b"],
+    },
+    "databases": {
+        "imports": {"sqlite3", "sqlalchemy", "psycopg2", "pymysql", "pymongo", "redis", "mongoose",
+                    "sequelize", "java.sql", "database/sql"},
+        "keywords": [r"\bSELECT\b.+\bFROM\b", r"\bCREATE\s+TABLE\b", r"\bcursor\(\)"],
+    },
+    "operating systems": {
+        "imports": {"os", "sys", "subprocess", "threading", "multiprocessing", "signal", "ctypes", "mmap",
+                    "unistd.h", "pthread.h", "sys/types.h", "sys/wait.h", "fcntl.h", "signal.h",
+                    "syscall", "std::thread", "std::sync", "std::process", "child_process"},
+        "keywords": [r"\bfork\(", r"\bexecv?p?\(", r"\bpthread_", r"\bmutex\b", r"\bsemaphore\b",
+                     r"\bsyscall\b", r"\bscheduler\b", r"\bpage table\b", r"\bwaitpid\("],
+    },
+    "concurrency": {
+        "imports": {"threading", "multiprocessing", "asyncio", "concurrent", "pthread.h", "thread",
+                    "java.util.concurrent", "sync", "tokio", "std::sync", "std::thread", "worker_threads"},
+        "keywords": [r"\basync\s+def\b", r"\bawait\b", r"\bgo\s+func\b", r"\bsynchronized\b", r"\bLock\(\)",
+                     r"\bmutex\b", r"\bPromise\.all\b"],
+    },
+    "data structures": {
+        "imports": {"collections", "heapq", "bisect", "queue", "java.util", "vector", "map", "set",
+                    "unordered_map", "list", "deque", "container/heap", "container/list"},
+        "keywords": [r"\bclass\s+\w*(Node|Tree|List|Stack|Queue|Heap|Graph|Trie|Map)\b", r"\.next\b",
+                     r"\bleft\b.*\bright\b", r"\bpush\(|\bpop\(", r"\bhash\s*table\b", r"\blinked\s*list\b"],
+    },
+    "algorithms": {
+        "imports": {"heapq", "bisect", "itertools", "functools", "algorithm"},
+        "keywords": [r"\bdef\s+\w*(sort|search|dfs|bfs|dijkstra|dp|memo)\w*\b", r"\brecurs", r"\bbinary\s*search\b",
+                     r"\bdynamic\s*programming\b", r"\bfunction\s+\w*(sort|search|dfs|bfs)\w*"],
+    },
+    "object oriented programming": {
+        "imports": set(),
+        "keywords": [r"^\s*(?:public\s+|abstract\s+|export\s+)?class\s+\w+", r"\binterface\s+\w+", r"\bextends\b",
+                     r"\bimplements\b", r"\bself\.\w+\s*=", r"\bimpl\s+\w+\s+for\b"],
+    },
+    "oop": {
+        "imports": set(),
+        "keywords": [r"^\s*(?:public\s+|abstract\s+|export\s+)?class\s+\w+", r"\binterface\s+\w+", r"\bextends\b"],
+    },
+    "error handling": {
+        "imports": set(),
+        "keywords": [r"\btry\s*[:{]", r"\bexcept\b", r"\bcatch\s*\(", r"\bthrow\b", r"\braise\b", r"\bResult<",
+                     r"\bif\s+err\s*!=\s*nil\b", r"\bfinally\b"],
+    },
+    "unit testing": {
+        "imports": {"unittest", "pytest", "jest", "mocha", "chai", "vitest", "junit", "org.junit", "testing",
+                    "gtest/gtest.h", "@testing-library/react"},
+        "keywords": [r"\bdef\s+test_", r"\bdescribe\(", r"\bit\(", r"\bexpect\(", r"@Test\b", r"\bassert\w*\("],
+    },
+    "testing": {
+        "imports": {"unittest", "pytest", "jest", "mocha", "chai", "vitest", "junit", "org.junit", "testing",
+                    "gtest/gtest.h", "@testing-library/react"},
+        "keywords": [r"\bdef\s+test_", r"\bdescribe\(", r"\bexpect\(", r"@Test\b"],
+    },
+    "regex": {
+        "imports": {"re", "regex", "java.util.regex", "regexp", "<regex>"},
+        "keywords": [r"\bRegExp\b", r"/[^/\n]+/[gimsuy]*\.test\(", r"\bRegex\b", r"\bre\.(search|match|sub|compile)"],
+    },
+    "networking": {
+        "imports": {"socket", "requests", "http", "urllib", "aiohttp", "httpx", "net", "net/http", "axios",
+                    "sys/socket.h", "java.net", "reqwest"},
+        "keywords": [r"\bsocket\(", r"\bfetch\(", r"\bHttpClient\b", r"\bTCP\b|\bUDP\b"],
+    },
+    "web development": {
+        "imports": {"flask", "django", "fastapi", "express", "react", "vue", "next", "angular", "@angular/core",
+                    "net/http", "rails", "laravel"},
+        "keywords": [r"<\w+[^>]*>", r"\bdocument\.", r"@app\.route", r"\bapp\.(get|post)\("],
+    },
+    "backend": {
+        "imports": {"flask", "django", "fastapi", "express", "koa", "net/http", "gin", "spring", "org.springframework",
+                    "actix_web", "rails"},
+        "keywords": [r"@app\.(route|get|post)", r"\brouter\.(get|post)\(", r"@(Get|Post)Mapping\b"],
+    },
+    "api": {
+        "imports": {"flask", "fastapi", "django", "express", "requests", "axios", "httpx", "net/http"},
+        "keywords": [r"@app\.(route|get|post)", r"\bfetch\(", r"\bendpoint\b", r"\bREST\b"],
+    },
+    "react": {
+        "imports": {"react", "react-dom", "next", "react-native"},
+        "keywords": [r"\buseState\b", r"\buseEffect\b", r"\bReact\.", r"return\s*\(\s*<"],
+    },
+    "aws": {
+        "imports": {"boto3", "botocore", "aws-sdk", "@aws-sdk", "com.amazonaws", "aws_cdk"},
+        "keywords": [r"\bs3://", r"\blambda_handler\b", r"\bAWS_\w+"],
+    },
+    "docker": {"imports": {"docker"}, "keywords": [r"\bdocker(file)?\b"]},
+}
+
+README_NAMES = ("readme",)
+
+
+def _language_of(path: str) -> str | None:
+    return EXT_TO_LANGUAGE.get(os.path.splitext(path)[1].lower())
+
+
+def _canonical_language(skill: str) -> str | None:
+    skill = LANGUAGE_ALIASES.get(skill, skill)
+    return skill if skill in LANGUAGE_EXTS else None
+
+
+def _mentions(term: str, text: str) -> bool:
+    return re.search(rf"(?<![\w+#]){re.escape(term)}(?![\w+#])", text) is not None
+
+
+def extract_imports(path: str, code: str) -> set[str]:
+    """Module names a file imports (full dotted name plus each prefix)."""
+    language = _language_of(path)
+    names = set()
+
+    if language == "python":
+        try:
+            tree = ast.parse(code)
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    names.update(alias.name for alias in node.names)
+                elif isinstance(node, ast.ImportFrom) and node.module:
+                    names.add(node.module)
+        except (SyntaxError, ValueError):
+            names.update(re.findall(r"^\s*(?:from|import)\s+([\w.]+)", code, re.MULTILINE))
+    else:
+        for pattern in IMPORT_PATTERNS.get(language, []):
+            names.update(re.findall(pattern, code, re.MULTILINE))
+
+    expanded = set()
+    for name in names:
+        expanded.add(name)
+        for sep in (".", "/", "::", "\\"):
+            if sep in name:
+                parts = name.split(sep)
+                expanded.update(sep.join(parts[:i]) for i in range(1, len(parts)))
+        if name.startswith("@") and "/" in name:
+            expanded.add(name.split("/")[0])
+    return expanded
+
+
+class SkillPrefilter:
+    def __init__(self, skills: list[str]):
+        self.skills = list(skills)
+        self._compiled = {
+            key: [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in signature["keywords"]]
+            for key, signature in SKILL_SIGNATURES.items()
+        }
+
+    def relevant_skills(self, path: str, code: str) -> list[str]:
+        language = _language_of(path)
+        is_readme = os.path.basename(path).lower().startswith(README_NAMES)
+        imports = set() if is_readme else extract_imports(path, code)
+        lowered_text = f"{path}\n{code}".lower()
+
+        relevant = []
+        for skill in self.skills:
+            key = normalize_skill(skill)
+            key = SKILL_ALIASES.get(key, key)
+            target_language = _canonical_language(key)
+
+            if target_language is not None:
+                if is_readme:
+                    plausible = _mentions(key, lowered_text)
+                else:
+                    plausible = (language == target_language
+                                 or target_language in LANGUAGE_IMPLIES.get(language, set()))
+            elif key in SKILL_SIGNATURES:
+                signature = SKILL_SIGNATURES[key]
+                plausible = (
+                    bool(imports & signature["imports"])
+                    or any(p.search(code) for p in self._compiled[key])
+                    or _mentions(key, lowered_text)
+                )
+            else:
+                words = [w for w in re.split(r"\s+", key) if len(w) >= 2]
+                plausible = not words or any(_mentions(w, lowered_text) for w in words)
+
+            if plausible:
+                relevant.append(skill)
+        return relevant
@@ -0,0 +1,62 @@
+"""
+skill_results.py
+────────────────
+Reading depth/coverage judgments out of stored file analyses.
+
+Kept apart from analizes_a_repo so the analysis store, which that module
+reads from, can score records without importing it back.
+
+Functions
+─────────
+• normalize_skill(skill) -> str
+• extract_json_object(text) -> dict | None     First JSON object embedded in a model answer.
+• skill_contributions(result_text, static_scores) -> {normalized skill: (depth, covered)}
+"""
+
+import json
+import re
+
+
+def normalize_skill(skill: str) -> str:
+    return re.sub(r"[-_\s]+", " ", skill.lower().strip())
+
+
+def extract_json_object(text: str):
+    brace_count = 0
+    json_start = -1
+    for i, c in enumerate(text):
+        if c == '{':
+            if brace_count == 0:
+                json_start = i
+            brace_count += 1
+        elif c == '}':
+            brace_count -= 1
+            if brace_count == 0 and json_start != -1:
+                json_str = text[json_start:i + 1]
+                try:
+                    return json.loads(json_str)
+                except json.JSONDecodeError:
+                    continue
+    return None
+
+
+def skill_contributions(result_text: str, static_scores: dict) -> dict:
+    """
+    What one analysed file adds to the skill scores:
+    {normalized skill: (depth, covered)}.
+    """
+    skill_dict = extract_json_object(result_text or "") or {}
+    # Deterministic scores from code_metrics sit next to the LLM's judgments.
+    skill_dict.update(static_scores)
+
+    contributions = {}
+    for raw_skill, details in skill_dict.items():
+        if not isinstance(details, dict):
+            print(f"(!) Skipping malformed skill entry: {raw_skill} -> {details}")
+            continue
+        try:
+            depth = float(details.get("depth", 0))
+        except (TypeError, ValueError):
+            depth = 0.0
+        contributions[normalize_skill(raw_skill)] = (depth, bool(details.get("coverage", False)))
+    return contributions
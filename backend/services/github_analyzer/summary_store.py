@@ -0,0 +1,72 @@
+"""
+summary_store.py
+────────────────
+Persisted portfolio summaries, one per GitHub user.
+
+The skill scores and the map/reduce LLM summary of a user's analysis do
+not depend on the job the applicant is matched against, yet they used to
+be rebuilt for every (applicant, job) message. This module stores them
+once per user, tagged with a digest of the analysis they were computed
+from, so every later job only pays for the job-specific comparison.
+
+Functions
+─────────
+• analysis_digest(user_dir: str) -> str | None
+      SHA-1 over the user's analysis records (see analysis_store) plus
+      SUMMARY_VERSION. None when the user has no analysis yet.
+
+Class
+─────
+• PortfolioSummaryStore
+    - load(username, digest) -> dict | None
+          The stored summary if it was computed from the same analysis.
+    - save(username, digest, summary)
+"""
+
+import hashlib
+import json
+import os
+
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+
+# Bump when the summary prompts or score aggregation change.
+SUMMARY_VERSION = 2
+
+
+def analysis_digest(user_dir: str) -> str | None:
+    if not os.path.isdir(user_dir):
+        return None
+    records_digest = UserAnalysisStore(user_dir).digest()
+    if records_digest is None:
+        return None
+    return hashlib.sha1(f"v{SUMMARY_VERSION}:{records_digest}".encode()).hexdigest()
+
+
+class PortfolioSummaryStore:
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+
+    def _path(self, username: str) -> str:
+        return os.path.join(self.store_dir, f"{username.lower()}.json")
+
+    def load(self, username: str, digest: str | None) -> dict | None:
+        if not digest:
+            return None
+        try:
+            with open(self._path(username), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if entry.get("digest") != digest:
+            return None
+        return entry.get("summary")
+
+    def save(self, username: str, digest: str | None, summary: dict):
+        if not digest:
+            return
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = self._path(username)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"digest": digest, "summary": summary}, f, indent=2)
+        os.replace(tmp_path, path)
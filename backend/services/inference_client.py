@@ -0,0 +1,136 @@
+"""
+inference_client.py
+───────────────────
+Client for a shared llama.cpp server (see inference_server.py) that stands
+in for an in-process `llama_cpp.Llama`.
+
+Every agent process used to load its own copy of Mistral-7B and decode one
+request at a time. With a server, each model is held once and requests
+from all agents share its slots, which llama.cpp batches together
+(continuous batching). The client exposes the subset of the Llama API the
+code base uses, with the same return shapes, so model_registry.get_model
+can hand it out transparently.
+
+Class
+─────
+• InferenceClient(base_url, timeout=600)
+    - create_completion(prompt, max_tokens=16, temperature=0.8, stop=None,
+                        json_schema=None, stopping_criteria=None, ...) -> dict
+          `prompt` is text or token ids. The server reuses the KV cache of
+          the longest matching prefix in the slot (`cache_prompt`), which
+          replaces PrefixStateCache's save/load_state. A stopping criterion
+          with `matches_text` (GenerationPolicy's verdict stop) streams the
+          completion and disconnects once it matches, which makes the
+          server stop decoding.
+    - __call__(prompt, **kwargs)             alias of create_completion
+    - tokenize(text: bytes, add_bos=True) / detokenize(tokens) -> bytes
+    - n_ctx() -> int                         context size of one slot
+    - reset()                                no-op; slots are managed by the server
+"""
+
+import json
+import threading
+import urllib.request
+
+
+class InferenceServerError(RuntimeError):
+    pass
+
+
+class InferenceClient:
+    # Preprocessor sends its JSON schema instead of a compiled llama_cpp grammar.
+    accepts_json_schema = True
+
+    def __init__(self, base_url: str, timeout: float = 600.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._n_ctx = None
+        self._lock = threading.Lock()
+
+    def _open(self, path: str, payload: dict | None = None):
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        request = urllib.request.Request(f"{self.base_url}{path}", data=data,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except OSError as e:
+            raise InferenceServerError(f"Inference server {self.base_url} failed on {path}: {e}") from e
+
+    def _request(self, path: str, payload: dict | None = None) -> dict:
+        with self._open(path, payload) as response:
+            return json.loads(response.read())
+
+    def n_ctx(self) -> int:
+        with self._lock:
+            if self._n_ctx is None:
+                props = self._request("/props")
+                self._n_ctx = props.get("default_generation_settings", {}).get("n_ctx", 4096)
+            return self._n_ctx
+
+    def tokenize(self, text: bytes, add_bos: bool = True, special: bool = False) -> list[int]:
+        payload = {"content": text.decode("utf-8", errors="ignore"), "add_special": add_bos}
+        return self._request("/tokenize", payload)["tokens"]
+
+    def detokenize(self, tokens) -> bytes:
+        return self._request("/detokenize", {"tokens": list(tokens)})["content"].encode("utf-8")
+
+    def reset(self):
+        pass
+
+    def create_completion(self, prompt, max_tokens: int | None = 16, temperature: float = 0.8,
+                          stop=None, json_schema: dict | None = None, stopping_criteria=None, **kwargs) -> dict:
+        payload = {
+            "prompt": prompt,
+            "n_predict": -1 if max_tokens is None else max_tokens,
+            "temperature": temperature,
+            "cache_prompt": True,
+        }
+        if stop:
+            payload["stop"] = [stop] if isinstance(stop, str) else list(stop)
+        if json_schema is not None:
+            payload["json_schema"] = json_schema
+        for name in ("top_p", "top_k", "repeat_penalty", "seed"):
+            if name in kwargs:
+                payload[name] = kwargs[name]
+
+        if stopping_criteria is not None and hasattr(stopping_criteria, "matches_text"):
+            return self._stream_until(payload, stopping_criteria)
+
+        result = self._request("/completion", payload)
+        return self._completion(result["content"], result, self._finish_reason(result))
+
+    __call__ = create_completion
+
+    @staticmethod
+    def _finish_reason(result: dict) -> str:
+        limited = result.get("stop_type") == "limit" or result.get("stopped_limit")
+        return "length" if limited else "stop"
+
+    @staticmethod
+    def _completion(text: str, result: dict, finish_reason: str, completion_tokens: int | None = None) -> dict:
+        return {
+            "object": "text_completion",
+            "choices": [{"text": text, "index": 0, "logprobs": None, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": result.get("tokens_evaluated", 0),
+                "completion_tokens": result.get("tokens_predicted", completion_tokens or 0),
+            },
+        }
+
+    def _stream_until(self, payload: dict, criterion) -> dict:
+        """Streams the completion and closes the connection as soon as `criterion` matches the text."""
+        text, chunks, last = "", 0, {}
+        with self._open("/completion", {**payload, "stream": True}) as response:
+            for line in response:
+                line = line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                last = json.loads(line[len(b"data:"):])
+                text += last.get("content", "")
+                chunks += 1
+                if last.get("stop"):
+                    return self._completion(text, last, self._finish_reason(last), chunks)
+                if criterion.matches_text(text):
+                    # Closing the stream makes the server cancel the slot's task.
+                    return self._completion(text, {}, "stop", chunks)
+        return self._completion(text, last, "stop", chunks)
@@ -0,0 +1,75 @@
+"""
+inference_server.py
+───────────────────
+Launches one llama.cpp server (`llama-server`) per model so every agent
+process can share it through InferenceClient.
+
+Each server holds its model once and runs INFERENCE_SERVER_PARALLEL slots
+with continuous batching: concurrent completions from the recruiter,
+hiring manager, technical lead and Preprocessor are decoded in the same
+batch instead of each process owning a locked copy of Mistral-7B. The KV
+cache is sized for `parallel` full contexts.
+
+Functions
+─────────
+• server_command(model_name, port, n_ctx=4096, parallel=INFERENCE_SERVER_PARALLEL,
+                 n_gpu_layers=35) -> list[str]
+• start_servers(models=DEFAULT_PORTS) -> dict[str, (Popen, url)]
+
+Usage
+─────
+python -m backend.services.inference_server
+    Starts the servers and prints the environment to export for the agents.
+    The binary is taken from LLAMA_SERVER_BIN (default "llama-server").
+"""
+
+import os
+import subprocess
+import time
+
+from backend.config import MODEL_DIR, FOUNDATION_MODEL, CODING_MODEL, LIGHT_MODEL, INFERENCE_SERVER_PARALLEL
+
+DEFAULT_PORTS = {FOUNDATION_MODEL: 8081, CODING_MODEL: 8082, LIGHT_MODEL: 8083}
+ENV_VARS = {FOUNDATION_MODEL: "FOUNDATION_MODEL_SERVER", CODING_MODEL: "CODING_MODEL_SERVER",
+            LIGHT_MODEL: "LIGHT_MODEL_SERVER"}
+
+
+def server_command(model_name: str, port: int, n_ctx: int = 4096,
+                   parallel: int = INFERENCE_SERVER_PARALLEL, n_gpu_layers: int = 35) -> list[str]:
+    return [
+        os.environ.get("LLAMA_SERVER_BIN", "llama-server"),
+        "-m", os.path.join(MODEL_DIR, model_name),
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        # -c is the total KV cache; each of the `parallel` slots gets n_ctx of it.
+        "-c", str(n_ctx * parallel),
+        "-np", str(parallel),
+        "-cb",
+        "-ngl", str(n_gpu_layers),
+        "--mlock",
+    ]
+
+
+def start_servers(models: dict = DEFAULT_PORTS) -> dict:
+    servers = {}
+    for model_name, port in models.items():
+        if not os.path.exists(os.path.join(MODEL_DIR, model_name)):
+            print(f"(inference_server.py)[W] {model_name} not found in {MODEL_DIR}, skipping.")
+            continue
+        process = subprocess.Popen(server_command(model_name, port))
+        servers[model_name] = (process, f"http://127.0.0.1:{port}")
+    return servers
+
+
+if __name__ == "__main__":
+    running = start_servers()
+    for name, (_, url) in running.items():
+        print(f"export {ENV_VARS[name]}={url}")
+    try:
+        while all(process.poll() is None for process, _ in running.values()):
+            time.sleep(5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process, _ in running.values():
+            process.terminate()
@@ -0,0 +1,123 @@
+"""
+model_registry.py
+─────────────────
+Lazy, process-wide loading of GGUF models through llama_cpp.
+
+Loading a model costs seconds and gigabytes, so nothing in Portfol.io
+should do it at import time. `get_model` loads a model the first time it
+is actually needed and hands the same instance to every later caller in
+the process that asks for the same file and settings.
+
+Functions
+─────────
+• get_model(model_name: str, quiet: bool = False, replica: int = 0, draft_tokens: int = 0, **llama_kwargs) -> Llama
+      Returns the shared instance, loading it on first use. `model_name` is
+      a file in MODEL_DIR or an absolute path (both name the same instance).
+      `llama_cpp` itself is only imported here, on first use. `draft_tokens`
+      > 0 loads the model with prompt-lookup speculative decoding (see
+      draft_model_kwargs).
+      If INFERENCE_SERVERS has a URL for the model, an InferenceClient for
+      that server is returned instead, shared by every caller regardless of
+      settings, replica and draft_tokens (the server has its own).
+
+• draft_model_kwargs(draft_tokens: int) -> dict
+      Llama(...) keyword arguments for prompt-lookup speculative decoding:
+      n-grams of the prompt are proposed as draft tokens and verified in one
+      batch, which pays off when the output copies spans of the input
+      (extraction, rebuttals quoting the opponent). Empty when 0.
+
+• get_model_pool(model_name: str, size: int, quiet: bool = False, **llama_kwargs) -> list[Llama]
+      `size` independent instances of the same model (replica 0 is the one
+      get_model returns). A Llama instance serves one request at a time, so
+      concurrent work needs one replica per worker.
+
+• loaded_models() -> list[str]
+      Names of the models currently held by the registry (server clients
+      included).
+
+• inference_server_url(model_name: str) -> str | None
+      URL of the shared server configured for the model, if any.
+
+• suppress_output()
+      Context manager that silences llama.cpp's load-time chatter.
+"""
+
+import contextlib
+import os
+import sys
+import threading
+
+from backend.config import MODEL_DIR, INFERENCE_SERVERS
+
+_models = {}
+_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def suppress_output():
+    with open(os.devnull, 'w') as devnull:
+        old_stdout = sys.stdout
+        old_stderr = sys.stderr
+        sys.stdout = devnull
+        sys.stderr = devnull
+        try:
+            yield
+        finally:
+            sys.stdout = old_stdout
+            sys.stderr = old_stderr
+
+
+def draft_model_kwargs(draft_tokens: int) -> dict:
+    if draft_tokens <= 0:
+        return {}
+    from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+
+    return {"draft_model": LlamaPromptLookupDecoding(num_pred_tokens=draft_tokens)}
+
+
+def inference_server_url(model_name: str) -> str | None:
+    name = os.path.basename(model_name).lower()
+    for configured, url in INFERENCE_SERVERS.items():
+        if url and configured.lower() == name:
+            return url
+    return None
+
+
+def get_model(model_name: str, quiet: bool = False, replica: int = 0, draft_tokens: int = 0, **llama_kwargs):
+    # A file name in MODEL_DIR and its absolute path are the same model.
+    model_path = os.path.join(MODEL_DIR, model_name)
+    server_url = inference_server_url(model_name)
+    if server_url:
+        key = (model_path, (), 0, 0)
+        with _lock:
+            if key not in _models:
+                from backend.services.inference_client import InferenceClient
+
+                print(f"[LLM] Using {os.path.basename(model_name)} from {server_url}")
+                _models[key] = InferenceClient(server_url)
+            return _models[key]
+
+    key = (model_path, tuple(sorted(llama_kwargs.items())), replica, draft_tokens)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            from llama_cpp import Llama
+
+            llama_kwargs.update(draft_model_kwargs(draft_tokens))
+            print(f"[LLM] Loading {os.path.basename(model_name)}...")
+            if quiet:
+                with suppress_output():
+                    model = Llama(model_path=model_path, **llama_kwargs)
+            else:
+                model = Llama(model_path=model_path, **llama_kwargs)
+            _models[key] = model
+        return model
+
+
+def get_model_pool(model_name: str, size: int, quiet: bool = False, **llama_kwargs) -> list:
+    return [get_model(model_name, quiet=quiet, replica=i, **llama_kwargs) for i in range(max(1, size))]
+
+
+def loaded_models() -> list[str]:
+    with _lock:
+        return [name for name, _, _, _ in _models]
@@ -0,0 +1,242 @@
+"""
+model_router.py
+───────────────
+Picks the model for each kind of LLM task and measures how every route
+performs.
+
+Every task used to run on the 7B foundation model, including 80-token
+debate rebuttals and the one-name winner pick in DebateManager.settle_debate.
+Routes (parse, evaluate, rebut, judge, summarise) are configured in
+MODEL_ROUTES, so short, simple outputs can go to a small quantised model
+while extraction, evaluations and summaries stay on Mistral.
+
+Each completion made through a route is recorded in ROUTE_METRICS_PATH:
+latency, token counts and whether the output passed the route's quality
+check (a JSON object for parse, a verdict for evaluate, a rebuttal under
+the word limit, a judge answer naming one of the debaters). An output that
+fails its check on a route with a `fallback` model is re-run on the
+fallback and counted as an escalation. Comparing quality and escalation
+rates between models is what justifies (or reverts) a split.
+
+Classes
+───────
+• RoutedModel(router, route, model)
+      Wraps a loaded model (Llama or InferenceClient). create_completion /
+      __call__ are timed and recorded under the route; anything else
+      (tokenize, save_state, n_ctx, ...) is forwarded to the model, so it
+      can be handed to PrefixStateCache, GenerationPolicy and the
+      portfolio summariser unchanged.
+• RouteMetrics(path=ROUTE_METRICS_PATH)
+    - record(route, model, seconds, prompt_tokens, completion_tokens, passed, escalated=False)
+    - summary() -> list[dict]    per (route, model): calls, latency, tokens/s, quality, escalations
+• ModelRouter(routes=MODEL_ROUTES, metrics=None)
+    - model(route, model_name=None) -> RoutedModel     `model_name` overrides the configured model
+    - model_pool(route, size) -> list[RoutedModel]
+    - complete(route, prompt, check=None, **kwargs) -> dict
+          create_completion on the route's model, escalating to the
+          fallback when `check` (or the route's default check) fails.
+
+Functions
+─────────
+• get_router() -> ModelRouter    process-wide router
+
+Usage
+─────
+python -m backend.services.model_router     prints the per-route metrics
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from backend.config import (
+    MODEL_DIR, FOUNDATION_MODEL, MODEL_ROUTES, ROUTE_METRICS_PATH, SPECULATIVE_DRAFT_TOKENS, LLM_SETTINGS
+)
+from backend.services.generation_policy import VERDICT_PATTERN
+from backend.services.model_registry import get_model, get_model_pool, inference_server_url
+
+REBUTTAL_MAX_WORDS = 50
+JUDGE_MAX_WORDS = 3
+
+
+def _is_json_object(text: str) -> bool:
+    try:
+        return isinstance(json.loads(text), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+ROUTE_CHECKS = {
+    "parse": _is_json_object,
+    "evaluate": lambda text: VERDICT_PATTERN.search(text) is not None,
+    "summarise": lambda text: bool(text.strip()),
+    "rebut": lambda text: 0 < len(text.split()) <= REBUTTAL_MAX_WORDS,
+    "judge": lambda text: 0 < len(text.split()) <= JUDGE_MAX_WORDS,
+}
+
+
+class RouteMetrics:
+    def __init__(self, path: str = ROUTE_METRICS_PATH):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Several agent processes record into the same file.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS completions (
+                    route TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    prompt_tokens INTEGER,
+                    completion_tokens INTEGER,
+                    passed INTEGER NOT NULL,
+                    escalated INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            self._initialized = True
+        return conn
+
+    def record(self, route: str, model: str, seconds: float, prompt_tokens: int | None,
+               completion_tokens: int | None, passed: bool, escalated: bool = False):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO completions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (route, model, seconds, prompt_tokens, completion_tokens, int(passed), int(escalated), time.time()),
+            )
+
+    def summary(self) -> list[dict]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT route, model, seconds, completion_tokens, passed, escalated FROM completions "
+                "ORDER BY route, model"
+            ).fetchall()
+        grouped = {}
+        for route, model, seconds, tokens, passed, escalated in rows:
+            grouped.setdefault((route, model), []).append((seconds, tokens or 0, passed, escalated))
+
+        summary = []
+        for (route, model), calls in grouped.items():
+            latencies = sorted(seconds for seconds, _, _, _ in calls)
+            total_seconds = sum(latencies)
+            summary.append({
+                "route": route,
+                "model": model,
+                "calls": len(calls),
+                "avg_seconds": round(total_seconds / len(calls), 3),
+                "p95_seconds": round(latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)], 3),
+                "tokens_per_second": round(sum(t for _, t, _, _ in calls) / max(total_seconds, 1e-9), 1),
+                "quality": round(sum(p for _, _, p, _ in calls) / len(calls), 3),
+                "escalations": sum(e for _, _, _, e in calls),
+            })
+        return summary
+
+
+class RoutedModel:
+    def __init__(self, router: "ModelRouter", route: str, model, model_name: str):
+        self.router = router
+        self.route = route
+        self.model = model
+        self.model_name = model_name
+
+    def _complete(self, check=None, escalated: bool = False, **kwargs) -> tuple[dict, bool]:
+        start = time.perf_counter()
+        response = self.model.create_completion(**kwargs)
+        seconds = time.perf_counter() - start
+
+        check = check or ROUTE_CHECKS.get(self.route)
+        passed = check is None or bool(check(response["choices"][0]["text"].strip()))
+        usage = response.get("usage", {})
+        try:
+            self.router.metrics.record(self.route, self.model_name, seconds, usage.get("prompt_tokens"),
+                                       usage.get("completion_tokens"), passed, escalated)
+        except sqlite3.Error as e:
+            print(f"(model_router)[W] Could not record {self.route} metrics: {e}")
+        return response, passed
+
+    def create_completion(self, prompt=None, check=None, **kwargs) -> dict:
+        return self._complete(check=check, prompt=prompt, **kwargs)[0]
+
+    __call__ = create_completion
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class ModelRouter:
+    def __init__(self, routes: dict = MODEL_ROUTES, metrics: RouteMetrics | None = None):
+        self.routes = routes
+        self.metrics = metrics or RouteMetrics()
+        self._warned = set()
+
+    def _installed(self, model_name: str) -> bool:
+        return inference_server_url(model_name) is not None or os.path.exists(os.path.join(MODEL_DIR, model_name))
+
+    def _model_name(self, route: str) -> str:
+        config = self.routes[route]
+        model_name = config["model"]
+        if self._installed(model_name):
+            return model_name
+        fallback = config.get("fallback", FOUNDATION_MODEL)
+        if route not in self._warned:
+            self._warned.add(route)
+            print(f"(model_router)[W] {model_name} is not installed, routing '{route}' to {fallback}.")
+        return fallback
+
+    def _load(self, model_name: str, replica: int = 0):
+        return get_model(model_name, replica=replica, draft_tokens=SPECULATIVE_DRAFT_TOKENS, **LLM_SETTINGS)
+
+    def model(self, route: str, model_name: str | None = None) -> RoutedModel:
+        model_name = model_name or self._model_name(route)
+        return RoutedModel(self, route, self._load(model_name), os.path.basename(model_name))
+
+    def model_pool(self, route: str, size: int) -> list[RoutedModel]:
+        model_name = self._model_name(route)
+        models = get_model_pool(model_name, size, draft_tokens=SPECULATIVE_DRAFT_TOKENS, **LLM_SETTINGS)
+        return [RoutedModel(self, route, model, os.path.basename(model_name)) for model in models]
+
+    def complete(self, route: str, prompt, check=None, **kwargs) -> dict:
+        routed = self.model(route)
+        response, passed = routed._complete(check=check, prompt=prompt, **kwargs)
+        fallback = self.routes[route].get("fallback")
+        if passed or not fallback or os.path.basename(fallback) == routed.model_name:
+            return response
+
+        print(f"(model_router)[W] '{route}' output from {routed.model_name} failed its check, "
+              f"re-running on {os.path.basename(fallback)}.")
+        response, _ = self.model(route, fallback)._complete(check=check, escalated=True, prompt=prompt, **kwargs)
+        return response
+
+    def stats(self) -> list[dict]:
+        return self.metrics.summary()
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
+
+
+if __name__ == "__main__":
+    rows = RouteMetrics().summary()
+    if not rows:
+        print("No routed completions recorded yet.")
+    for row in rows:
+        print(f"{row['route']:10} {row['model']:42} calls={row['calls']:5}  avg={row['avg_seconds']:6.2f}s  "
+              f"p95={row['p95_seconds']:6.2f}s  {row['tokens_per_second']:6.1f} tok/s  "
+              f"quality={row['quality']:.1%}  escalations={row['escalations']}")
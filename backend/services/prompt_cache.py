@@ -0,0 +1,73 @@
+"""
+prompt_cache.py
+───────────────
+Reuse of llama.cpp KV state for prompts that share a long, stable prefix.
+
+Most prompts in Portfol.io are a fixed block of instructions and few-shot
+examples followed by a short variable part (a source file, a resume). This
+module evaluates such a prefix once, snapshots the model state with
+`Llama.save_state()`, and restores it before each completion so llama.cpp
+only has to process the suffix tokens.
+
+Class
+─────
+• PrefixStateCache
+    - complete(prefix_key, prefix, suffix, **kwargs) -> dict
+          Same return shape as `Llama.create_completion`. The prompt is sent
+          as token ids (prefix tokens + suffix tokens) so the cached prefix
+          always matches exactly, regardless of how the tokenizer would have
+          merged the two strings.
+    - Keeps at most `capacity` prefix states (LRU).
+    - Falls back to a plain completion for models without save/load_state.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class PrefixStateCache:
+    def __init__(self, model, capacity: int = 1):
+        self.model = model
+        self.capacity = max(1, capacity)
+        self._states = OrderedDict()  # prefix_key -> (prefix_tokens, LlamaState)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def supports_state(self) -> bool:
+        return all(hasattr(self.model, attr) for attr in ("save_state", "load_state", "eval", "tokenize"))
+
+    def _prime(self, prefix_key, prefix: str):
+        """Restores (or builds and stores) the state right after `prefix`."""
+        entry = self._states.get(prefix_key)
+        if entry is not None:
+            self._states.move_to_end(prefix_key)
+            self.model.load_state(entry[1])
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        tokens = self.model.tokenize(prefix.encode("utf-8"), add_bos=True)
+        self.model.reset()
+        self.model.eval(tokens)
+        self._states[prefix_key] = (tokens, self.model.save_state())
+        if len(self._states) > self.capacity:
+            self._states.popitem(last=False)
+        return tokens
+
+    def complete(self, prefix_key, prefix: str, suffix: str, **kwargs) -> dict:
+        if not self.supports_state():
+            return self.model.create_completion(prompt=prefix + suffix, **kwargs)
+
+        with self._lock:
+            prefix_tokens = self._prime(prefix_key, prefix)
+            suffix_tokens = self.model.tokenize(suffix.encode("utf-8"), add_bos=False)
+            # create_completion re-uses the longest common prefix with the restored state.
+            return self.model.create_completion(prompt=prefix_tokens + suffix_tokens, **kwargs)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._states), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,94 @@
+import json
+import sqlite3
+
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+
+
+def test_records_round_trip(tmp_path):
+    store = UserAnalysisStore(str(tmp_path / "octocat"))
+    store.save("api", "src/app.py", '{"Python": {"depth": 6, "coverage": true}}',
+               {"testing": {"depth": 4, "coverage": True}}, blob_sha="abc")
+    store.save("api", "src/app.py", "re-analysed", blob_sha="def")
+    store.save("cli", "run.py", "")
+
+    records = list(UserAnalysisStore(str(tmp_path / "octocat")).records())
+    assert [(r["repo"], r["file"], r["result"], r["blob_sha"]) for r in records] == [
+        ("api", "src/app.py", "re-analysed", "def"),
+        ("cli", "run.py", "", None),
+    ]
+    assert records[0]["static_scores"] == {}
+
+    store.remove("cli", "run.py")
+    assert store.count() == 1
+
+
+def test_legacy_json_tree_is_packed(tmp_path):
+    user_dir = tmp_path / "octocat"
+    legacy = user_dir / "api" / "src" / "app.py.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(json.dumps({
+        "file": "src/app.py",
+        "result": "ok",
+        "static_scores": {"testing": {"depth": 4, "coverage": True}},
+    }), encoding="utf-8")
+
+    store = UserAnalysisStore(str(user_dir))
+    assert store.count() == 0 and store.has_legacy_records()
+    assert legacy.exists()  # reading never imports or deletes
+
+    assert store.import_legacy() == 1
+    records = list(UserAnalysisStore(str(user_dir)).records())
+    assert records == [{"repo": "api", "file": "src/app.py", "result": "ok",
+                        "static_scores": {"testing": {"depth": 4, "coverage": True}}, "blob_sha": None}]
+    assert not (user_dir / "api").exists()
+    assert not store.has_legacy_records()
+
+
+def test_skill_aggregates_follow_reanalysis_and_removal(tmp_path):
+    store = UserAnalysisStore(str(tmp_path / "octocat"))
+    store.save("api", "a.py", '{"Python": {"depth": 6, "coverage": true}, "SQL": {"depth": 2, "coverage": false}}')
+    store.save("api", "b.py", '{"python": {"depth": 8, "coverage": true}}',
+               {"testing": {"depth": 5, "coverage": True}})
+    assert store.skill_scores() == {
+        "python": {"avg_depth": 7, "coverage": "2/2"},
+        "sql": {"avg_depth": 0, "coverage": "0/1"},
+        "testing": {"avg_depth": 5, "coverage": "1/1"},
+    }
+
+    store.save("api", "a.py", '{"Python": {"depth": 4, "coverage": true}}')
+    assert store.skill_scores()["python"] == {"avg_depth": 6, "coverage": "2/2"}
+    assert "sql" not in store.skill_scores()
+
+    store.remove("api", "b.py")
+    assert store.skill_scores() == {"python": {"avg_depth": 4, "coverage": "1/1"}}
+
+
+def test_aggregates_are_backfilled_for_older_stores(tmp_path):
+    user_dir = tmp_path / "octocat"
+    user_dir.mkdir()
+    with sqlite3.connect(user_dir / "analysis.db") as conn:
+        conn.execute("CREATE TABLE files (repo TEXT NOT NULL, path TEXT NOT NULL, result TEXT NOT NULL, "
+                     "static_scores TEXT, blob_sha TEXT, updated_at TIMESTAMP, PRIMARY KEY (repo, path))")
+        conn.execute("INSERT INTO files (repo, path, result) VALUES ('api', 'a.py', "
+                     "'{\"Go\": {\"depth\": 3, \"coverage\": true}}')")
+    conn.close()
+
+    assert UserAnalysisStore(str(user_dir)).skill_scores() == {"go": {"avg_depth": 3, "coverage": "1/1"}}
+
+
+def test_repo_listing_and_removal(tmp_path):
+    store = UserAnalysisStore(str(tmp_path / "octocat"))
+    assert store.last_checked() is None
+    store.save("api", "a.py", '{"Python": {"depth": 6, "coverage": true}}', blob_sha="s1")
+    store.save("api", "b.py", '{"Python": {"depth": 2, "coverage": true}}', blob_sha="s2")
+    store.set_repo("api", "main", "tree-1", {"a.py": "s1", "b.py": "s2", "c.py": "s3"})
+
+    assert store.repos()["api"]["tree_sha"] == "tree-1"
+    assert store.repos()["api"]["files"]["c.py"] == "s3"
+    assert store.blob_shas("api") == {"a.py": "s1", "b.py": "s2"}
+    assert store.last_checked() is not None
+
+    store.remove_repo("api")
+    assert store.repos() == {}
+    assert store.count() == 0
+    assert store.skill_scores() == {}
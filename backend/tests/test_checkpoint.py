@@ -0,0 +1,67 @@
+import json
+
+from backend.services.github_analyzer.checkpoint import AnalysisCheckpoint, is_analysis_complete
+
+
+def test_resume_skips_finished_files(tmp_path):
+    user_dir = str(tmp_path / "octocat")
+    checkpoint = AnalysisCheckpoint(user_dir)
+    checkpoint.plan("api", "main", {"app.py": "sha-app", "db.py": "sha-db"})
+    checkpoint.plan("cli", "dev", {"run.py": None})
+    checkpoint.finish_planning()
+    checkpoint.mark_done("api", "app.py")
+    checkpoint.complete(partial=True)  # time budget ran out
+    assert not is_analysis_complete(user_dir)
+
+    resumed = AnalysisCheckpoint(user_dir)
+    assert resumed.planning_complete
+    assert resumed.pending() == [("api", "main", ["db.py"]), ("cli", "dev", ["run.py"])]
+    assert resumed.sha_of("api", "db.py") == "sha-db"
+    assert resumed.progress() == (1, 3)
+
+    resumed.mark_done("api", "db.py")
+    resumed.mark_done("cli", "run.py")
+    resumed.complete()
+    assert is_analysis_complete(user_dir)
+
+
+def test_unfinished_listing_is_never_complete(tmp_path):
+    user_dir = str(tmp_path / "octocat")
+    checkpoint = AnalysisCheckpoint(user_dir)
+    checkpoint.plan("api", "main", {"app.py": None})
+    checkpoint.mark_done("api", "app.py")
+    checkpoint.complete()
+    assert not is_analysis_complete(user_dir)
+
+
+def test_failed_files_keep_the_run_partial(tmp_path):
+    user_dir = str(tmp_path / "octocat")
+    checkpoint = AnalysisCheckpoint(user_dir)
+    checkpoint.plan("api", "main", {"app.py": None, "db.py": None})
+    checkpoint.finish_planning()
+    checkpoint.mark_done("api", "app.py")  # db.py failed
+    checkpoint.complete()
+    assert not is_analysis_complete(user_dir)
+    assert AnalysisCheckpoint(user_dir).pending() == [("api", "main", ["db.py"])]
+
+
+def test_finished_files_survive_a_crash_before_the_next_save(tmp_path):
+    user_dir = str(tmp_path / "octocat")
+    checkpoint = AnalysisCheckpoint(user_dir)
+    checkpoint.plan("api", "main", {"app.py": None, "db.py": None})
+    checkpoint.mark_done("api", "app.py")
+
+    resumed = AnalysisCheckpoint(user_dir)
+    assert resumed.is_done("api", "app.py") and not resumed.is_done("api", "db.py")
+    resumed.finish_planning()
+    assert not (tmp_path / "octocat" / ".checkpoint.done").exists()
+    assert AnalysisCheckpoint(user_dir).progress() == (1, 2)
+
+
+def test_legacy_directory_without_checkpoint(tmp_path):
+    user_dir = tmp_path / "octocat"
+    assert not is_analysis_complete(str(user_dir))
+    (user_dir / "api").mkdir(parents=True)
+    assert not is_analysis_complete(str(user_dir))
+    (user_dir / "api" / "app.py.json").write_text(json.dumps({"file": "app.py", "result": ""}))
+    assert is_analysis_complete(str(user_dir))
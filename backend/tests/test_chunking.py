@@ -0,0 +1,27 @@
+from backend.services.github_analyzer.chunking import chunk_code, count_tokens, merge_skill_results
+
+
+def _python_file(n_functions: int) -> str:
+    body = "\n".join(f"    value_{i} = {i} * 2" for i in range(20))
+    return "import os\n\n" + "\n\n".join(f"def f{n}():\n{body}\n    return {n}\n" for n in range(n_functions))
+
+
+def test_chunks_respect_budget_and_function_boundaries():
+    code = _python_file(12)
+    chunks = chunk_code("big.py", code, max_tokens=300)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(c) <= 300 for c in chunks)
+    assert "".join(chunks).count("def f") == 12
+    assert all(c.lstrip().startswith(("def ", "import")) for c in chunks)
+
+
+def test_merge_keeps_best_covered_depth():
+    merged = merge_skill_results([
+        {"Python": {"depth": 5, "coverage": True}, "SQL": {"depth": 2, "coverage": False}},
+        {"Python": {"depth": 8, "coverage": True}, "SQL": {"depth": 6, "coverage": True}},
+        {"Python": {"depth": 9, "coverage": False}},
+    ])
+
+    assert merged["Python"] == {"depth": 8, "coverage": True}
+    assert merged["SQL"] == {"depth": 6, "coverage": True}
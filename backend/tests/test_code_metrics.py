@@ -0,0 +1,77 @@
+import json
+
+from backend.services.github_analyzer.code_metrics import (
+    MetricsCache, compute_metrics, has_static_scorer, score_static_skills
+)
+
+PYTHON_SAMPLE = '''
+import json
+
+
+class Store:
+    """Keeps records in memory."""
+
+    def load(self, path: str) -> dict:
+        """Reads a JSON file."""
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def pick(self, items, key):
+        if key and items:
+            return [i for i in items if i == key]
+        return []
+
+
+def test_pick():
+    assert Store().pick([1, 2], 2) == [2]
+'''
+
+
+def test_python_metrics_are_computed_from_the_ast():
+    metrics = compute_metrics("pkg/store.py", PYTHON_SAMPLE)
+
+    assert metrics["classes"] == 1
+    assert metrics["functions"] == 3
+    assert metrics["specific_handlers"] == 1
+    assert metrics["test_functions"] == 1
+    assert metrics["complexity_max"] >= 3
+    assert 0 < metrics["type_hint_density"] < 1
+
+
+def test_static_skills_are_scored_without_an_llm():
+    metrics = compute_metrics("pkg/store.py", PYTHON_SAMPLE)
+    scores = score_static_skills(["Unit Testing", "Error Handling", "Operating Systems"], metrics)
+
+    assert set(scores) == {"Unit Testing", "Error Handling"}
+    assert scores["Error Handling"]["coverage"] is True
+    assert 0 <= scores["Unit Testing"]["depth"] <= 10
+    assert not has_static_scorer("Operating Systems")
+
+
+def test_cache_reuses_metrics_for_identical_blobs(tmp_path):
+    cache = MetricsCache(str(tmp_path / "metrics.json"))
+    first = cache.get("a/store.py", PYTHON_SAMPLE, blob_sha="abc")
+    cache.flush()
+
+    reloaded = MetricsCache(str(tmp_path / "metrics.json"))
+    second = reloaded.get("tests/store.py", "", blob_sha="abc")
+
+    assert second["classes"] == first["classes"]
+    assert second["is_test_file"] is True
+
+
+def test_workers_flushing_the_same_cache_keep_each_others_entries(tmp_path):
+    path = str(tmp_path / "metrics.json")
+    first, second = MetricsCache(path), MetricsCache(path)
+    first.get("a.py", PYTHON_SAMPLE, blob_sha="aaa")
+    second.get("b.py", PYTHON_SAMPLE, blob_sha="bbb")
+
+    first.flush()
+    second.flush()
+
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)) == {"aaa", "bbb"}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["metrics.json"]
@@ -0,0 +1,29 @@
+from backend.services.github_analyzer.deduplication import BlobDeduplicator, is_vendored_path
+
+
+def test_vendored_and_generated_paths_are_excluded():
+    assert is_vendored_path("web/node_modules/lodash/index.js")
+    assert is_vendored_path("dist/app.js")
+    assert is_vendored_path("static/js/jquery.min.js")
+    assert not is_vendored_path("src/dist_utils.py")
+    assert not is_vendored_path("app/main.py")
+
+
+def test_ambiguous_folder_names_only_count_at_the_top_level():
+    assert is_vendored_path("build/classes/Main.java")
+    assert is_vendored_path("target/generated/Foo.java")
+    assert not is_vendored_path("src/main/java/com/acme/build/Pipeline.java")
+    assert not is_vendored_path("app/env/settings.py")
+    assert not is_vendored_path("build.gradle")
+
+
+def test_identical_blobs_share_one_analysis():
+    dedup = BlobDeduplicator()
+    assert dedup.lookup("abc123") is None
+
+    dedup.record("abc123", {"result": "analysis text"}, "repo-a/utils.py")
+
+    assert dedup.lookup("abc123") == {"result": "analysis text"}
+    assert dedup.lookup("abc123") == {"result": "analysis text"}
+    assert dedup.source_of("abc123") == "repo-a/utils.py"
+    assert dedup.saved_calls == 2
@@ -0,0 +1,47 @@
+import threading
+
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+from backend.services.github_analyzer.analizes_a_repo import AnalyzeRepoForGivenUser, SUMMARY_MAX_TOKENS
+
+
+class WordModel:
+    """One token per whitespace-separated word; records every prompt it receives."""
+
+    def __init__(self, n_ctx, prompts, lock):
+        self._n_ctx = n_ctx
+        self.prompts = prompts
+        self.lock = lock
+
+    def n_ctx(self):
+        return self._n_ctx
+
+    def tokenize(self, data, add_bos=False):
+        return data.decode("utf-8").split()
+
+    def detokenize(self, tokens):
+        return " ".join(tokens).encode("utf-8")
+
+    def create_completion(self, prompt, **kwargs):
+        with self.lock:
+            self.prompts.append((self, prompt))
+        return {"choices": [{"text": "summary " * 150}]}
+
+
+def test_every_prompt_fits_and_work_is_spread_over_the_pool(tmp_path):
+    store = UserAnalysisStore(str(tmp_path / "octocat"))
+    for i in range(40):
+        store.save("repo", f"f{i}.py", "assessment " * 200)
+
+    prompts, lock = [], threading.Lock()
+    n_ctx = 1200
+    pool = [WordModel(n_ctx, prompts, lock), WordModel(n_ctx, prompts, lock)]
+    assessment = AnalyzeRepoForGivenUser.FinalLLMAssessment(str(tmp_path / "octocat"), pool)
+
+    batches = assessment.gather_batches()
+    assert len(batches) > 1
+    summary = assessment.generate_summary()
+
+    assert summary.startswith("summary")
+    assert all(len(prompt.split()) + SUMMARY_MAX_TOKENS <= n_ctx for _, prompt in prompts)
+    assert any("Merged Summary:" in prompt for _, prompt in prompts)
+    assert {model for model, _ in prompts} == set(pool)
@@ -0,0 +1,80 @@
+from backend.services import generation_policy
+from backend.services.generation_policy import GenerationPolicy, VERDICT_PATTERN
+
+EVALUATION = "1. **Skills Match**: Strong.\n5. **Fit Score**: 8/10\n\nFinal recommendation: **Yes**"
+
+
+class WordModel:
+    """One token per word. Runs the stopping criterion the way llama.cpp's sampling loop does."""
+
+    def __init__(self, text, trailing=" And more text the model would have kept writing." * 20):
+        self.words = (text + trailing).split(" ")
+        self.calls = []
+
+    def detokenize(self, tokens):
+        return " ".join(tokens).encode("utf-8")
+
+    def create_completion(self, prompt, max_tokens, stop=None, stopping_criteria=None, **kwargs):
+        self.calls.append(max_tokens)
+        prompt_ids = prompt.split(" ")
+        generated = []
+        finish_reason = "length"
+        for word in self.words[:max_tokens]:
+            if stopping_criteria and stopping_criteria(prompt_ids + generated, None):
+                finish_reason = "stop"
+                break
+            generated.append(word)
+        else:
+            if len(generated) < max_tokens:
+                finish_reason = "stop"
+        if finish_reason == "length" and stopping_criteria and stopping_criteria(prompt_ids + generated, None):
+            finish_reason = "stop"
+        return {"choices": [{"text": " ".join(generated), "finish_reason": finish_reason}],
+                "usage": {"completion_tokens": len(generated)}}
+
+
+def _complete(policy, model):
+    return policy.complete(lambda **budget: model.create_completion("Evaluate this candidate", **budget), model=model)
+
+
+def test_decoding_stops_at_the_verdict(tmp_path):
+    policy = GenerationPolicy("recruiter", 400, stop_pattern=VERDICT_PATTERN, stats_dir=str(tmp_path))
+    model = WordModel(EVALUATION)
+
+    response = _complete(policy, model)
+    text = response["choices"][0]["text"]
+    assert text == EVALUATION
+    assert response["choices"][0]["finish_reason"] == "stop"
+    assert policy.stats()["verdict_stops"] == 1
+
+
+def test_budget_adapts_to_observed_lengths_and_persists(tmp_path, monkeypatch):
+    monkeypatch.setattr(generation_policy, "MIN_SAMPLES", 5)
+    policy = GenerationPolicy("recruiter", 400, stop_pattern=VERDICT_PATTERN, stats_dir=str(tmp_path))
+    assert policy.max_tokens() == 400
+    for _ in range(5):
+        _complete(policy, WordModel(EVALUATION))
+
+    words = len(EVALUATION.split(" "))
+    assert policy.max_tokens() == max(generation_policy.MIN_BUDGET, round(words * generation_policy.HEADROOM))
+    restarted = GenerationPolicy("recruiter", 400, stop_pattern=VERDICT_PATTERN, stats_dir=str(tmp_path))
+    assert restarted.max_tokens() == policy.max_tokens()
+
+
+def test_output_cut_by_the_adaptive_budget_is_retried_with_the_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(generation_policy, "MIN_SAMPLES", 1)
+    monkeypatch.setattr(generation_policy, "MIN_BUDGET", 1)
+    policy = GenerationPolicy("recruiter", 400, stop_pattern=VERDICT_PATTERN, stats_dir=None)
+    _complete(policy, WordModel(EVALUATION))
+
+    long_evaluation = ("Detailed reasoning. " * 30) + EVALUATION
+    model = WordModel(long_evaluation)
+    response = _complete(policy, model)
+    assert len(model.calls) == 2 and model.calls[0] < 400 and model.calls[1] == 400
+    assert response["choices"][0]["text"].endswith("Final recommendation: **Yes**")
+    assert policy.stats()["retries"] == 1
+
+
+def test_trim_drops_text_after_the_verdict():
+    policy = GenerationPolicy("recruiter", 400, stop_pattern=VERDICT_PATTERN, stats_dir=None)
+    assert policy.trim(EVALUATION + "\n\n---\nExample 3:") == EVALUATION
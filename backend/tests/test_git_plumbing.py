@@ -0,0 +1,68 @@
+import subprocess
+
+import pytest
+
+from backend.services.github_analyzer.git_plumbing import LocalGitRepository, clone_repository, is_git_repository
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "octocat" / "api"
+    (path / "src").mkdir(parents=True)
+    (path / "src" / "app.py").write_text("\n".join(f"x{i} = {i}" for i in range(12)) + "\n")
+    (path / "README.md").write_text("# api\n")
+    _git(path, "init", "-q", "-b", "main")
+    _git(path, "add", ".")
+    _git(path, "-c", "user.name=t", "-c", "user.email=t@e", "commit", "-q", "-m", "init")
+    return path
+
+
+def test_lists_tree_and_reads_blobs(repo):
+    repository = LocalGitRepository(str(repo))
+    try:
+        assert repository.default_branch() == "main"
+        assert repository.tree_sha("main")
+        assert repository.last_commit_date("main")
+
+        items = {item["path"]: item for item in repository.ls_tree("main")}
+        assert set(items) == {"README.md", "src/app.py"}
+        assert items["README.md"] == {"path": "README.md", "type": "blob",
+                                      "sha": items["README.md"]["sha"], "size": 6}
+
+        assert repository.read_blob(items["README.md"]["sha"]) == b"# api\n"
+        assert repository.read_file("main", "src/app.py").startswith(b"x0 = 0\n")
+        assert repository.read_file("main", "missing.py") is None
+        assert repository.read_blob(items["README.md"]["sha"]) == b"# api\n"  # process survives a miss
+    finally:
+        repository.close()
+
+
+def test_file_remote_is_cloned_and_refetched(repo, tmp_path):
+    dest = str(tmp_path / "clones" / "api.git")
+    clone = clone_repository(f"file://{repo}", dest)
+    tree_sha = LocalGitRepository(str(repo)).tree_sha("main")
+    assert is_git_repository(dest)
+    assert clone.tree_sha("main") == tree_sha
+    assert clone.read_file("main", "README.md") == b"# api\n"
+    clone.close()
+
+    (repo / "README.md").write_text("# api v2\n")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@e", "commit", "-qam", "bump")
+    clone = clone_repository(f"file://{repo}", dest)
+    assert clone.read_file("main", "README.md") == b"# api v2\n"
+    assert clone.tree_sha("main") != tree_sha
+    clone.close()
+
+
+def test_only_repository_roots_are_repositories(repo, tmp_path):
+    assert is_git_repository(str(repo))
+    assert not is_git_repository(str(repo / "src"))
+
+    bare = clone_repository(f"file://{repo}", str(tmp_path / "clones" / "api.git"))
+    bare.close()
+    assert is_git_repository(str(tmp_path / "clones" / "api.git"))
+    assert not is_git_repository(str(tmp_path / "clones" / "api.git" / "refs"))
@@ -0,0 +1,61 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from backend.services.github_analyzer.github_fixtures import Cassette, FixtureServer
+
+
+class FakeResponse:
+    def __init__(self, url, status_code, headers, content):
+        self.url, self.status_code, self.headers, self.content = url, status_code, headers, content
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    cassette = Cassette(str(tmp_path / "octocat.json"))
+    hook = cassette.recorder()
+    hook(FakeResponse(
+        "https://api.github.com/users/octocat/repos?per_page=100", 200,
+        {"Content-Type": "application/json", "X-RateLimit-Remaining": "4999",
+         "Link": '<https://api.github.com/users/octocat/repos?per_page=100&page=2>; rel="next"'},
+        b'[{"name": "api"}]'))
+    hook(FakeResponse("https://raw.githubusercontent.com/octocat/api/main/app.py", 200, {}, b"print('hi')\n"))
+    hook(FakeResponse("https://example.com/elsewhere", 200, {}, b""))
+    cassette.save()
+    return Cassette(cassette.path)
+
+
+def test_recorded_responses_are_replayed(cassette):
+    assert len(cassette.entries) == 2
+    with FixtureServer(cassette) as server:
+        status, headers, body = _get(f"{server.api_url}/users/octocat/repos?per_page=100")
+        assert status == 200 and json.loads(body) == [{"name": "api"}]
+        assert headers["Link"] == f'<{server.api_url}/users/octocat/repos?per_page=100&page=2>; rel="next"'
+        assert headers["X-RateLimit-Remaining"] == "4999"
+
+        assert _get(f"{server.raw_url}/octocat/api/main/app.py")[2] == b"print('hi')\n"
+        assert _get(f"{server.api_url}/repos/octocat/missing")[0] == 404
+        assert server.stats() == {"served": 2, "missing": 1, "rate_limited": 0, "remaining": 4998}
+
+
+def test_quota_is_enforced_and_resets(cassette):
+    with FixtureServer(cassette, rate_limit=1, reset_after=0.3, latency=0.01) as server:
+        url = f"{server.api_url}/users/octocat/repos?per_page=100"
+        assert _get(url)[0] == 200
+        status, headers, _ = _get(url)
+        assert status == 403 and headers["X-RateLimit-Remaining"] == "0"
+        # raw.githubusercontent.com is not metered
+        assert _get(f"{server.raw_url}/octocat/api/main/app.py")[0] == 200
+        time.sleep(0.35)
+        assert _get(url)[0] == 200
@@ -0,0 +1,89 @@
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("backend.sensible_info")
+
+from backend.services.github_analyzer import github_structure_scraper
+from backend.services.github_analyzer.github_structure_scraper import GitHubStructureScraper
+from backend.services.github_analyzer.rate_limiter import GitHubRateLimiter
+
+
+class FakeResponse:
+    def __init__(self, payload=None, text="", status_code=200, next_url=None):
+        self.payload = payload
+        self.text = text
+        self.status_code = status_code
+        self.headers = {}
+        self.links = {"next": {"url": next_url}} if next_url else {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    """Serves canned responses by URL and records every request in order."""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(url)
+        return self.responses.get(url, FakeResponse(status_code=404))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        pass
+
+
+def _scraper(responses):
+    scraper = GitHubStructureScraper("https://github.com/octocat", rate_limiter=GitHubRateLimiter())
+    scraper.session = FakeSession(responses)
+    return scraper
+
+
+def test_fetch_code_reads_the_branch_in_the_url_without_an_api_call():
+    raw_url = f"{github_structure_scraper.GITHUB_RAW_URL}/octocat/api/dev/src/app.py"
+    scraper = _scraper({raw_url: FakeResponse(text="print('hi')\n")})
+
+    assert scraper.fetch_code("https://github.com/octocat/api/blob/dev/src/app.py") == "print('hi')\n"
+    assert scraper.session.calls == [raw_url]
+
+
+def _listing(names):
+    return [{"name": name, "default_branch": "main", "fork": False} for name in names]
+
+
+def test_repositories_are_listed_across_pages_in_order():
+    first_page = f"{github_structure_scraper.GITHUB_API_URL}/users/octocat/repos?per_page=100"
+    second_page = f"{github_structure_scraper.GITHUB_API_URL}/user/583231/repos?per_page=100&page=2"
+    names = [f"repo-{i:03}" for i in range(150)]
+    scraper = _scraper({
+        first_page: FakeResponse(_listing(names[:100]), next_url=second_page),
+        second_page: FakeResponse(_listing(names[100:])),
+    })
+
+    assert [repo["name"] for repo in scraper.iter_repos()] == names
+    assert scraper.session.calls == [first_page, second_page]
+
+
+def test_repositories_stream_before_the_next_page_is_requested():
+    first_page = f"{github_structure_scraper.GITHUB_API_URL}/users/octocat/repos?per_page=100"
+    second_page = f"{github_structure_scraper.GITHUB_API_URL}/user/583231/repos?per_page=100&page=2"
+    scraper = _scraper({
+        first_page: FakeResponse(_listing(["api", "cli"]), next_url=second_page),
+        second_page: FakeResponse(_listing(["web"])),
+    })
+
+    structures = scraper.iter_repo_structures()
+    assert next(structures)[0] == "api"
+    assert second_page not in scraper.session.calls
+
+    assert [name for name, _, _ in structures] == ["cli", "web"]
+    assert scraper.session.calls.count(second_page) == 1
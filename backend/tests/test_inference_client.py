@@ -0,0 +1,143 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.services import model_registry
+from backend.services.generation_policy import GenerationPolicy, VERDICT_PATTERN
+from backend.services.inference_client import InferenceClient, InferenceServerError
+from backend.services.prompt_cache import PrefixStateCache
+
+EVALUATION = "1. **Skills Match**: Strong. Final recommendation: **Yes**"
+TRAILING = " And more text the model would have kept writing." * 20
+
+
+class FakeLlamaServer:
+    """Answers /completion, /tokenize, /detokenize and /props like llama-server, one word per token."""
+
+    def __init__(self, text=EVALUATION + TRAILING):
+        self.words = text.split(" ")
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _json(self, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/props":
+                    return self._json({"default_generation_settings": {"n_ctx": 4096}})
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests.append((self.path, payload))
+                if self.path == "/tokenize":
+                    return self._json({"tokens": [len(word) for word in payload["content"].split(" ")]})
+                if self.path == "/detokenize":
+                    return self._json({"content": " ".join("x" * t for t in payload["tokens"])})
+                words = server.words[:payload["n_predict"]]
+                limited = len(words) == payload["n_predict"]
+                if not payload.get("stream"):
+                    return self._json({"content": " ".join(words), "tokens_evaluated": 3,
+                                       "tokens_predicted": len(words), "stop_type": "limit" if limited else "eos"})
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                try:
+                    for i, word in enumerate(words):
+                        chunk = {"content": word if i == 0 else f" {word}", "stop": False}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    final = {"content": "", "stop": True, "tokens_predicted": len(words),
+                             "stop_type": "limit" if limited else "eos"}
+                    self.wfile.write(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+                except OSError:
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    fake = FakeLlamaServer()
+    yield fake
+    fake.close()
+
+
+def test_completion_has_the_llama_cpp_shape(server):
+    client = InferenceClient(server.url)
+    response = client.create_completion(prompt="Evaluate", max_tokens=5, temperature=0.0, stop="\nExample ",
+                                        grammar=object())
+
+    assert response["choices"][0]["text"] == "1. **Skills Match**: Strong. Final"
+    assert response["choices"][0]["finish_reason"] == "length"
+    assert response["usage"] == {"prompt_tokens": 3, "completion_tokens": 5}
+    path, payload = server.requests[-1]
+    assert path == "/completion"
+    assert payload["n_predict"] == 5 and payload["stop"] == ["\nExample "] and payload["cache_prompt"]
+    assert "grammar" not in payload
+
+
+def test_verdict_stop_disconnects_the_stream(server, tmp_path):
+    client = InferenceClient(server.url)
+    policy = GenerationPolicy("evaluation", max_tokens=400, stop_pattern=VERDICT_PATTERN, stats_dir=str(tmp_path))
+
+    response = policy.complete(lambda **budget: client.create_completion(prompt="Evaluate", **budget), model=client)
+
+    assert policy.trim(response["choices"][0]["text"]) == EVALUATION
+    assert response["choices"][0]["finish_reason"] == "stop"
+    assert response["usage"]["completion_tokens"] == len(EVALUATION.split(" "))
+    assert policy.stats()["verdict_stops"] == 1
+
+
+def test_tokenizer_and_context_size(server):
+    client = InferenceClient(server.url)
+
+    assert client.tokenize(b"ab cde") == [2, 3]
+    assert client.detokenize([2, 3]) == b"xx xxx"
+    assert client.n_ctx() == 4096
+
+
+def test_prefix_cache_falls_back_to_plain_completion(server):
+    client = InferenceClient(server.url)
+    cache = PrefixStateCache(client)
+
+    response = cache.complete("job-1", "Evaluate ", "this applicant", max_tokens=2)
+
+    assert response["choices"][0]["text"] == "1. **Skills"
+    assert server.requests[-1][1]["prompt"] == "Evaluate this applicant"
+
+
+def test_get_model_returns_one_shared_client(server, monkeypatch):
+    monkeypatch.setattr(model_registry, "INFERENCE_SERVERS", {"Shared-Model.gguf": server.url})
+    monkeypatch.setattr(model_registry, "_models", {})
+
+    first = model_registry.get_model("/models/shared-model.gguf", n_ctx=4096, draft_tokens=10)
+    pool = model_registry.get_model_pool("/models/shared-model.gguf", 3, n_ctx=2048)
+
+    assert isinstance(first, InferenceClient)
+    assert all(model is first for model in pool)
+    assert model_registry.loaded_models() == ["/models/shared-model.gguf"]
+
+
+def test_unreachable_server_raises():
+    client = InferenceClient("http://127.0.0.1:9", timeout=2)
+
+    with pytest.raises(InferenceServerError):
+        client.create_completion(prompt="Evaluate", max_tokens=4)
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+pytest.importorskip("json5")
+pytest.importorskip("fitz")  # backend.pre_processing imports the PDF cleaner
+
+from backend.pre_processing import LLM_parser
+from backend.pre_processing.LLM_parser import Preprocessor, SCHEMAS, parse_stats
+
+
+class ScriptedModel:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+
+    def create_completion(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        return {"choices": [{"text": self.text, "finish_reason": "stop"}]}
+
+
+JOB = {"title": "Backend Engineer", "description": "Build APIs.", "requirements": "python, sql"}
+
+
+def test_schemas_require_every_prompt_field():
+    assert SCHEMAS["jobPostings"]["required"] == ["title", "description", "requirements"]
+    assert "summary" in SCHEMAS["applicants"]["properties"]
+
+
+def test_constrained_output_is_parsed_without_repair(monkeypatch):
+    grammar = object()
+    monkeypatch.setitem(LLM_parser._grammars, "jobPostings", grammar)
+    before = parse_stats()
+    model = ScriptedModel(json.dumps(JOB))
+
+    assert Preprocessor("jobPostings", llm=model).process_text("posting") == JOB
+    assert model.calls[0]["grammar"] is grammar
+    assert parse_stats()["clean"] == before["clean"] + 1
+
+
+def test_unconstrained_output_falls_back_to_repair(monkeypatch):
+    monkeypatch.setitem(LLM_parser._grammars, "jobPostings", None)
+    before = parse_stats()
+    model = ScriptedModel('Sure! {"title": "Backend Engineer", "description": "Build APIs.", "requirements": "python')
+
+    parsed = Preprocessor("jobPostings", llm=model).process_text("posting")
+    assert parsed["title"] == "Backend Engineer"
+    assert "grammar" not in model.calls[0]
+    assert parse_stats()["repaired"] == before["repaired"] + 1
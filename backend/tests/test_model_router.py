@@ -0,0 +1,82 @@
+import pytest
+
+from backend.services import model_router
+from backend.services.model_router import ModelRouter, RouteMetrics
+
+ROUTES = {
+    "evaluate": dict(model="big.gguf"),
+    "judge": dict(model="small.gguf", fallback="big.gguf"),
+}
+
+
+class CannedModel:
+    def __init__(self, name, text):
+        self.name = name
+        self.text = text
+        self.prompts = []
+
+    def create_completion(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return {"choices": [{"text": self.text, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": len(self.text.split())}}
+
+    def tokenize(self, text, add_bos=True):
+        return list(text)
+
+
+@pytest.fixture
+def models(monkeypatch):
+    loaded = {"big.gguf": CannedModel("big", "RecruiterAgent"), "small.gguf": CannedModel("small", "HiringManagerAgent")}
+    monkeypatch.setattr(model_router, "get_model", lambda name, **kwargs: loaded[name])
+    return loaded
+
+
+def _router(tmp_path, installed=("big.gguf", "small.gguf")):
+    router = ModelRouter(ROUTES, metrics=RouteMetrics(str(tmp_path / "routes.db")))
+    router._installed = lambda name: name in installed
+    return router
+
+
+def test_routes_use_their_configured_model(models, tmp_path):
+    router = _router(tmp_path)
+
+    response = router.complete("judge", prompt="Who won?", max_tokens=10)
+
+    assert response["choices"][0]["text"] == "HiringManagerAgent"
+    assert models["small.gguf"].prompts == ["Who won?"] and models["big.gguf"].prompts == []
+    assert router.model("evaluate").tokenize("ab") == ["a", "b"]
+
+
+def test_failed_check_escalates_to_the_fallback(models, tmp_path):
+    router = _router(tmp_path)
+    models["small.gguf"].text = "I think the first agent argued better overall."
+
+    response = router.complete("judge", prompt="Who won?", check=lambda answer: answer in {"RecruiterAgent"})
+
+    assert response["choices"][0]["text"] == "RecruiterAgent"
+    stats = {row["model"]: row for row in router.stats()}
+    assert stats["small.gguf"]["quality"] == 0.0 and stats["small.gguf"]["escalations"] == 0
+    assert stats["big.gguf"]["quality"] == 1.0 and stats["big.gguf"]["escalations"] == 1
+
+
+def test_missing_model_routes_to_the_fallback(models, tmp_path):
+    router = _router(tmp_path, installed=("big.gguf",))
+
+    routed = router.model("judge")
+
+    assert routed.model is models["big.gguf"]
+    assert routed.model_name == "big.gguf"
+
+
+def test_metrics_per_route_and_model(models, tmp_path):
+    router = _router(tmp_path)
+    evaluator = router.model("evaluate")
+    models["big.gguf"].text = "Strong match. Final recommendation: **Yes**"
+    evaluator.create_completion(prompt="Evaluate")
+    models["big.gguf"].text = "Strong match, but I ran out of"
+    evaluator("Evaluate")
+
+    [row] = RouteMetrics(str(tmp_path / "routes.db")).summary()
+
+    assert (row["route"], row["model"], row["calls"], row["quality"]) == ("evaluate", "big.gguf", 2, 0.5)
+    assert row["tokens_per_second"] > 0
@@ -0,0 +1,225 @@
+import json
+import subprocess
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("backend.sensible_info")
+
+from backend.services.github_analyzer import main
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+from backend.services.github_analyzer.checkpoint import is_analysis_complete
+
+USER = "octocat"
+GITHUB_URL = f"https://github.com/{USER}"
+BODY = "\n".join(f"value_{i} = {i}" for i in range(12)) + "\n"
+GUARDED = "try:\n    run()\nexcept ValueError as error:\n    raise RuntimeError('failed') from error\n" + BODY
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def make_repo(mirror, name, files: dict):
+    path = mirror / USER / name
+    path.mkdir(parents=True, exist_ok=True)
+    if not (path / ".git").exists():
+        _git(path, "init", "-q", "-b", "main")
+    for file, content in files.items():
+        target = path / file
+        if content is None:
+            target.unlink()
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+    _git(path, "add", "-A")
+    _git(path, "-c", "user.name=t", "-c", "user.email=t@e", "commit", "-q", "--allow-empty", "-m", "change")
+    return path
+
+
+class FakeCodingModel:
+    """Stands in for SingleScriptAnalyzer.run: a skill is covered when its first word is in the code."""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+
+    def __call__(self, analyzer, code=None):
+        path = analyzer.file_url.split("/blob/", 1)[1].split("/", 1)[1]
+        self.calls.append((path, list(analyzer.skills)))
+        if path in self.failing:
+            return {"error": "model crashed"}
+        results = {s: {"depth": 3, "coverage": s.split()[0] in code.lower()} for s in analyzer.skills}
+        return {"result": f"### JSON EVAL:\n{json.dumps(results)}\n\n### EXPLANATION:\nchecked {path}"}
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "SKILL_CACHE_PATH", str(tmp_path / "skills.db"))
+    monkeypatch.setattr(main, "CODE_METRICS_CACHE_PATH", str(tmp_path / "metrics.json"))
+    monkeypatch.setattr(main, "ANALYSIS_LOCK_DIR", str(tmp_path / "locks"))
+    monkeypatch.setattr(main, "get_coding_model", lambda: None)
+    monkeypatch.setattr(main, "get_few_shot_cache", lambda: None)
+    model = FakeCodingModel()
+    monkeypatch.setattr(main.SingleScriptAnalyzer, "run", lambda self, code=None: model(self, code))
+    return tmp_path, model
+
+
+def analyzer(tmp_path, skills):
+    return main.PortfolioAnalyzer(GITHUB_URL, skills, source=str(tmp_path / "mirror"))
+
+
+def user_dir(tmp_path):
+    return str(tmp_path / "backend" / "services" / "github_analyzer" / "analized_files" / USER)
+
+
+def test_static_coverage_counts_every_evaluated_file(env):
+    tmp_path, _ = env
+    make_repo(tmp_path / "mirror", "api", {"src/guarded.py": GUARDED, "src/plain.py": BODY})
+
+    assert analyzer(tmp_path, ["error handling"]).analyze() is None
+
+    scores = UserAnalysisStore(user_dir(tmp_path)).skill_scores()
+    assert scores["error handling"]["coverage"] == "1/2"
+
+
+def test_failed_files_are_retried_by_the_next_run(env):
+    tmp_path, model = env
+    make_repo(tmp_path / "mirror", "api", {"app.py": "import json\n" + BODY, "db.py": "import json\nimport sqlite3\n" + BODY})
+    model.failing.add("db.py")
+
+    analyzer(tmp_path, ["json parsing"]).analyze()
+    assert not is_analysis_complete(user_dir(tmp_path))
+
+    model.failing.clear()
+    model.calls.clear()
+    analyzer(tmp_path, ["json parsing"]).analyze()
+    assert [path for path, _ in model.calls] == ["db.py"]
+    assert is_analysis_complete(user_dir(tmp_path))
+
+
+def test_legacy_analysis_is_packed_by_the_leader(env):
+    tmp_path, model = env
+    legacy = tmp_path / user_dir(tmp_path) / "api" / "app.py.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(json.dumps({"file": "app.py", "result": '{"json parsing": {"depth": 3, "coverage": true}}'}))
+    assert is_analysis_complete(user_dir(tmp_path)) and legacy.exists()
+
+    analyzer(tmp_path, ["json parsing"]).analyze()
+
+    assert model.calls == [] and not legacy.exists()
+    assert [r["file"] for r in UserAnalysisStore(user_dir(tmp_path)).records()] == ["app.py"]
+
+
+def _tree_sha(repo_path):
+    return subprocess.run(["git", "rev-parse", "HEAD^{tree}"], cwd=repo_path, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def test_resumed_run_records_the_repository_listing(env):
+    tmp_path, model = env
+    repo = make_repo(tmp_path / "mirror", "api", {"app.py": "import json\n" + BODY,
+                                                  "db.py": "import json\nimport sqlite3\n" + BODY})
+    model.failing.add("db.py")
+    analyzer(tmp_path, ["json parsing"]).analyze()
+    store = UserAnalysisStore(user_dir(tmp_path))
+    store.remove_repo("api")
+    store.save("api", "app.py", "", blob_sha=None)  # keep the finished file, drop what the listing recorded
+
+    model.failing.clear()
+    analyzer(tmp_path, ["json parsing"]).analyze()
+
+    recorded = store.repos()["api"]
+    assert recorded["tree_sha"] == _tree_sha(repo)
+    assert set(recorded["files"]) == {"app.py", "db.py"}
+    assert store.last_checked() is not None
+
+
+def test_refresh_reanalyses_only_added_and_modified_files(env):
+    tmp_path, model = env
+    files = {"app.py": "import json\n" + BODY, "db.py": "import json\nimport sqlite3\n" + BODY,
+             "old.py": "import json\nimport os\n" + BODY}
+    make_repo(tmp_path / "mirror", "api", files)
+    analyzer(tmp_path, ["json parsing"]).analyze()
+    store = UserAnalysisStore(user_dir(tmp_path))
+    assert store.skill_scores()["json parsing"]["coverage"] == "3/3"
+
+    repo = make_repo(tmp_path / "mirror", "api", {"db.py": "import json\nimport csv\n" + BODY, "old.py": None,
+                                                  "new.py": "import json\nimport re\n" + BODY})
+    model.calls.clear()
+    assert analyzer(tmp_path, ["json parsing"]).refresh() is None
+
+    assert sorted(path for path, _ in model.calls) == ["db.py", "new.py"]
+    assert [r["file"] for r in store.records()] == ["app.py", "db.py", "new.py"]
+    assert store.skill_scores()["json parsing"]["coverage"] == "3/3"
+    assert store.blob_shas("api")["db.py"] == store.repos()["api"]["files"]["db.py"]
+    assert store.repos()["api"]["tree_sha"] == _tree_sha(repo)
+
+    model.calls.clear()
+    analyzer(tmp_path, ["json parsing"]).refresh()
+    assert model.calls == []
+
+
+def test_new_skills_reach_files_the_prefilter_skipped(env):
+    tmp_path, model = env
+    make_repo(tmp_path / "mirror", "api", {"app.py": "import json\n" + BODY, "db.py": "import sqlite3\ndatabase = sqlite3.connect('app.db')\n" + BODY})
+    analyzer(tmp_path, ["json parsing"]).analyze()
+    assert [path for path, _ in model.calls] == ["app.py"]
+
+    model.calls.clear()
+    model.failing.add("db.py")
+    analyzer(tmp_path, ["json parsing", "database storage"]).analyze()
+    store = UserAnalysisStore(user_dir(tmp_path))
+    assert model.calls == [("db.py", ["database storage"])]
+    assert "database storage" not in store.evaluated_skills()
+
+    model.calls.clear()
+    model.failing.clear()
+    analyzer(tmp_path, ["json parsing", "database storage"]).analyze()
+    assert model.calls == [("db.py", ["database storage"])]
+    assert "database storage" in store.evaluated_skills()
+    assert store.skill_scores()["database storage"]["coverage"] == "1/1"
+
+
+def test_refresh_drops_judgments_of_files_that_no_longer_show_the_skill(env):
+    tmp_path, model = env
+    make_repo(tmp_path / "mirror", "api", {"app.py": "import json\n" + BODY, "db.py": "import json\nimport csv\n" + BODY})
+    analyzer(tmp_path, ["json parsing"]).analyze()
+
+    make_repo(tmp_path / "mirror", "api", {"db.py": "import csv\n" + BODY})
+    analyzer(tmp_path, ["json parsing"]).refresh()
+
+    store = UserAnalysisStore(user_dir(tmp_path))
+    assert store.skill_scores()["json parsing"]["coverage"] == "1/1"
+    assert [r["file"] for r in store.records()] == ["app.py", "db.py"]
+
+
+def test_local_repositories_are_closed_after_the_run(env, monkeypatch):
+    tmp_path, _ = env
+    make_repo(tmp_path / "mirror", "api", {"app.py": "import json\n" + BODY})
+    opened = []
+    original = main.LocalGitStructureScraper.repository
+
+    def repository(scraper, name):
+        opened.append(original(scraper, name))
+        return opened[-1]
+
+    monkeypatch.setattr(main.LocalGitStructureScraper, "repository", repository)
+    analyzer(tmp_path, ["json parsing"]).analyze()
+
+    assert opened and all(r._cat_file is None for r in opened)
+
+
+def test_failing_metrics_flush_does_not_fail_the_run(env, monkeypatch):
+    tmp_path, _ = env
+    make_repo(tmp_path / "mirror", "api", {"app.py": "import json\n" + BODY})
+
+    def flush():
+        raise OSError("disk full")
+
+    portfolio = analyzer(tmp_path, ["json parsing"])
+    monkeypatch.setattr(portfolio.metrics_cache, "flush", flush)
+
+    assert portfolio.analyze() is None
+    assert is_analysis_complete(user_dir(tmp_path))
@@ -0,0 +1,100 @@
+from backend.config import JOB_PREFIX_CACHE_SIZE
+from backend.services.prompt_cache import PrefixStateCache
+
+PREFIX = "You are a Tech Recruiter Lead evaluating code samples."
+
+
+class StubModel:
+    """One token per word; create_completion reuses the common prefix with the loaded state like llama.cpp."""
+
+    BOS = "<s>"
+
+    def __init__(self):
+        self.input_ids = []
+        self.calls = []
+        self.evaluated = []
+
+    def tokenize(self, text, add_bos=True):
+        return ([self.BOS] if add_bos else []) + text.decode("utf-8").split()
+
+    def reset(self):
+        self.input_ids = []
+
+    def eval(self, tokens):
+        self.calls.append(("eval", list(tokens)))
+        self.input_ids += tokens
+
+    def save_state(self):
+        self.calls.append(("save_state",))
+        return tuple(self.input_ids)
+
+    def load_state(self, state):
+        self.calls.append(("load_state",))
+        self.input_ids = list(state)
+
+    def create_completion(self, prompt, **kwargs):
+        common = 0
+        while common < min(len(prompt), len(self.input_ids)) and prompt[common] == self.input_ids[common]:
+            common += 1
+        self.evaluated.append(prompt[common:])
+        self.input_ids = list(prompt)
+        return {"choices": [{"text": "ok", "finish_reason": "stop"}]}
+
+
+def test_prompt_is_sent_as_prefix_tokens_followed_by_suffix_tokens():
+    model = StubModel()
+    cache = PrefixStateCache(model)
+
+    cache.complete("few-shot", PREFIX, " Now evaluate app.py", max_tokens=8)
+
+    assert model.evaluated == [["Now", "evaluate", "app.py"]]
+    assert model.calls == [("eval", [StubModel.BOS] + PREFIX.split()), ("save_state",)]
+    assert cache.stats() == {"entries": 1, "hits": 0, "misses": 1}
+
+
+def test_second_call_with_the_same_prefix_evaluates_only_the_suffix():
+    model = StubModel()
+    cache = PrefixStateCache(model)
+    cache.complete("few-shot", PREFIX, " Now evaluate app.py")
+    model.calls.clear()
+
+    cache.complete("few-shot", PREFIX, " Now evaluate db.py")
+
+    assert model.calls == [("load_state",)]
+    assert model.evaluated[-1] == ["Now", "evaluate", "db.py"]
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+
+def test_models_without_state_get_a_plain_completion():
+    class Client:
+        def create_completion(self, prompt, **kwargs):
+            self.prompt = prompt
+            return {"choices": [{"text": "ok"}]}
+
+    client = Client()
+    PrefixStateCache(client).complete("few-shot", PREFIX, " Now evaluate app.py")
+
+    assert client.prompt == PREFIX + " Now evaluate app.py"
+
+
+def _job_prefix(job):
+    return f"Job posting {job}: evaluate the applicant against these requirements."
+
+
+def test_least_recently_used_job_prefix_is_evicted_first():
+    model = StubModel()
+    cache = PrefixStateCache(model, capacity=JOB_PREFIX_CACHE_SIZE)
+    for job in range(JOB_PREFIX_CACHE_SIZE):
+        cache.complete(f"job-{job}", _job_prefix(job), " Applicant: Ada")
+    cache.complete("job-0", _job_prefix(0), " Applicant: Grace")  # job-1 is now the oldest
+
+    cache.complete("job-new", _job_prefix("new"), " Applicant: Ada")
+    assert cache.stats()["entries"] == JOB_PREFIX_CACHE_SIZE
+
+    model.calls.clear()
+    cache.complete("job-0", _job_prefix(0), " Applicant: Linus")
+    assert model.calls == [("load_state",)]
+
+    cache.complete("job-1", _job_prefix(1), " Applicant: Linus")
+    assert model.calls[1][0] == "eval"
+    assert cache.stats()["misses"] == JOB_PREFIX_CACHE_SIZE + 2
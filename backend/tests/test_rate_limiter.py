@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from backend.services.github_analyzer.rate_limiter import (
+    GitHubRateLimiter, GitHubRateLimitError, PRIORITY_IN_FLIGHT
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        return self.responses.pop(0)
+
+
+def test_headers_cap_available_tokens():
+    limiter = GitHubRateLimiter(burst=10)
+    limiter.update_from_headers({
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": "2",
+        "X-RateLimit-Reset": str(time.time() + 3600),
+    })
+    stats = limiter.stats()
+    assert stats["remaining"] == 2
+    assert stats["tokens"] <= 2
+
+
+def test_exhausted_quota_raises_when_reset_is_too_far():
+    limiter = GitHubRateLimiter(max_wait=0.2)
+    limiter.update_from_headers({
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": str(time.time() + 600),
+    })
+    with pytest.raises(GitHubRateLimitError):
+        limiter.acquire(PRIORITY_IN_FLIGHT)
+
+
+def test_rate_limited_response_is_retried_after_reset():
+    reset = str(time.time() + 0.2)
+    session = FakeSession([
+        FakeResponse(403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}),
+        FakeResponse(200, {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": str(time.time() + 3600)}),
+    ])
+    limiter = GitHubRateLimiter(max_wait=5)
+
+    response = limiter.request(session, "GET", "https://api.github.com/users/octocat/repos")
+
+    assert response.status_code == 200
+    assert len(session.calls) == 2
+
+
+def test_headers_of_error_responses_are_ignored():
+    limiter = GitHubRateLimiter(burst=10)
+    limiter.update_from_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 600)},
+                                status_code=502)
+
+    assert limiter.stats()["remaining"] == 5000
+
+
+def test_calls_are_not_paced_while_quota_is_plentiful():
+    limiter = GitHubRateLimiter(burst=2, max_wait=0.5)
+    limiter.update_from_headers({"X-RateLimit-Remaining": "4974", "X-RateLimit-Reset": str(time.time() + 3600)})
+
+    start = time.monotonic()
+    for _ in range(26):
+        limiter.acquire()
+
+    assert time.monotonic() - start < 0.5
+    assert limiter.stats()["remaining"] == 4948
+
+
+def test_calls_are_paced_below_the_low_water_mark():
+    limiter = GitHubRateLimiter(burst=2, max_wait=0.2, low_water=500)
+    limiter.update_from_headers({"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": str(time.time() + 3600)})
+
+    limiter.acquire()
+    limiter.acquire()
+    with pytest.raises(GitHubRateLimitError):
+        limiter.acquire()  # 100 calls over an hour: the next token is ~36s away
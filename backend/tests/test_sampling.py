@@ -0,0 +1,75 @@
+import time
+
+from backend.services.github_analyzer.sampling import AnalysisBudget, RepresentativeSampler, estimate_tokens
+
+REPO_META = {
+    "recent": {"pushed_at": "2026-09-01T00:00:00Z"},
+    "old": {"pushed_at": "2019-01-01T00:00:00Z"},
+}
+
+
+def _files(*paths, size=4000):
+    return {path: {"size": size} for path in paths}
+
+
+def test_every_skill_gets_its_best_file_first():
+    file_meta = {
+        "recent": _files("src/core.py", "src/engine.py", "src/service.py"),
+        "old": _files("web/app.js", "web/util.js"),
+    }
+
+    plan = RepresentativeSampler(["python", "javascript"]).select(file_meta, REPO_META, AnalysisBudget(max_files=2))
+
+    assert len(plan) == 2
+    assert {repo for repo, _ in plan} == {"recent", "old"}
+    assert ("old", "web/app.js") in plan
+
+
+def test_files_are_spread_round_robin_across_repositories():
+    file_meta = {
+        "recent": _files(*(f"src/module_{i}.py" for i in range(10))),
+        "old": _files(*(f"lib/module_{i}.py" for i in range(10))),
+    }
+
+    plan = RepresentativeSampler([]).select(file_meta, REPO_META, AnalysisBudget(max_files=6))
+
+    assert sum(repo == "recent" for repo, _ in plan) == 3
+    assert sum(repo == "old" for repo, _ in plan) == 3
+    # Grouped by repository in listing order.
+    assert [repo for repo, _ in plan] == ["recent"] * 3 + ["old"] * 3
+
+
+def test_core_files_rank_above_tests_and_boilerplate():
+    file_meta = {"recent": _files("tests/test_core.py", "setup.py", "src/core.py")}
+
+    plan = RepresentativeSampler([]).select(file_meta, REPO_META, AnalysisBudget(max_files=1))
+
+    assert plan == [("recent", "src/core.py")]
+
+
+def test_token_limit_skips_files_that_do_not_fit():
+    file_meta = {"recent": {"src/huge.py": {"size": 400_000}, "src/small.py": {"size": 2000},
+                            "src/other.py": {"size": 2000}}}
+    budget = AnalysisBudget(max_tokens=2 * estimate_tokens(2000))
+
+    plan = RepresentativeSampler([]).select(file_meta, REPO_META, budget)
+
+    assert sorted(path for _, path in plan) == ["src/other.py", "src/small.py"]
+
+
+def test_unbounded_budget_keeps_everything():
+    file_meta = {"recent": _files("a.py", "b.py"), "old": _files("c.py")}
+    budget = AnalysisBudget()
+
+    assert budget.is_unbounded()
+    assert len(RepresentativeSampler([]).select(file_meta, REPO_META, budget)) == 3
+
+
+def test_wall_time_limit():
+    budget = AnalysisBudget(max_seconds=0.05)
+    assert not budget.time_exhausted()  # not started yet
+
+    budget.start()
+    assert not budget.time_exhausted()
+    time.sleep(0.06)
+    assert budget.time_exhausted()
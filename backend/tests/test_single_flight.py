@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+from backend.services.github_analyzer.single_flight import SingleFlightLock
+
+
+def test_only_one_leader_and_followers_wait(tmp_path):
+    leader = SingleFlightLock("OctoCat", str(tmp_path), poll_interval=0.01)
+    follower = SingleFlightLock("octocat", str(tmp_path), poll_interval=0.01)
+
+    assert leader.try_acquire()
+    assert not follower.try_acquire()
+    assert follower.is_held()
+    assert not follower.wait(timeout=0.05)
+
+    threading.Timer(0.05, leader.release).start()
+    assert follower.wait(timeout=2)
+    assert follower.try_acquire()
+    follower.release()
+    assert not os.path.exists(follower.path)
+
+
+def test_stale_lock_is_taken_over(tmp_path):
+    crashed = SingleFlightLock("octocat", str(tmp_path), stale_after=60)
+    assert crashed.try_acquire()
+    crashed._stop_heartbeat.set()  # simulate a worker that died without releasing
+    old = time.time() - 120
+    os.utime(crashed.path, (old, old))
+
+    survivor = SingleFlightLock("octocat", str(tmp_path), stale_after=60)
+    assert not survivor.is_held()
+    assert survivor.try_acquire()
+
+    crashed.release()  # must not delete the survivor's lock
+    assert survivor.is_held()
+    survivor.release()
+
+
+def test_late_follower_does_not_break_the_new_leaders_lock(tmp_path):
+    crashed = SingleFlightLock("octocat", str(tmp_path), stale_after=60)
+    assert crashed.try_acquire()
+    crashed._stop_heartbeat.set()
+    old = time.time() - 120
+    os.utime(crashed.path, (old, old))
+
+    fast = SingleFlightLock("octocat", str(tmp_path), stale_after=60)
+    slow = SingleFlightLock("octocat", str(tmp_path), stale_after=60)
+    # The slow follower saw the stale lock before the fast one replaced it.
+    ages = iter([120.0])
+    real_age = slow._age
+    slow._age = lambda: next(ages, None) or real_age()
+
+    assert fast.try_acquire()
+    assert not slow.try_acquire()
+    assert fast._owns_lock_file()
+    assert not os.path.exists(f"{fast.path}.break")
+    fast.release()
+    crashed.release()
@@ -0,0 +1,30 @@
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+from backend.services.github_analyzer.skill_cache import SkillResultCache
+
+
+def test_lookup_returns_only_cached_skills(tmp_path):
+    cache = SkillResultCache(str(tmp_path / "skills.db"), "coder.gguf", 1)
+    cache.store("sha1", {"Python": {"depth": 7, "coverage": True}}, "Idiomatic Python.")
+
+    assert cache.lookup("sha1", ["python", "Docker"]) == {"python": {"depth": 7, "coverage": True}}
+    assert cache.explanations("sha1", ["Python"]) == ["Idiomatic Python."]
+    assert cache.lookup("other", ["python"]) == {}
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_results_are_scoped_to_model_and_prompt_version(tmp_path):
+    path = str(tmp_path / "skills.db")
+    SkillResultCache(path, "coder.gguf", 1).store("sha1", {"python": {"depth": 7, "coverage": True}})
+
+    assert SkillResultCache(path, "coder.gguf", 2).lookup("sha1", ["python"]) == {}
+    assert SkillResultCache(path, "other.gguf", 1).lookup("sha1", ["python"]) == {}
+    assert SkillResultCache(path, "coder.gguf", 1).lookup("sha1", ["python"]) != {}
+
+
+def test_store_tracks_evaluated_skills(tmp_path):
+    store = UserAnalysisStore(str(tmp_path / "octocat"))
+    assert store.evaluated_skills() == set()
+
+    store.add_evaluated_skills(["python", "docker"])
+    store.add_evaluated_skills(["python"])
+    assert UserAnalysisStore(str(tmp_path / "octocat")).evaluated_skills() == {"python", "docker"}
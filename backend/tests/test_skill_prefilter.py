@@ -0,0 +1,62 @@
+import pytest
+
+from backend.services.github_analyzer.skill_prefilter import SkillPrefilter, extract_imports
+
+PYTHON_ML = "import numpy as np\nfrom sklearn.model_selection import train_test_split\n\nmodel.fit(X, y)\n"
+PYTHON_BROKEN = "from os.path import join\nimport torch\ndef broken(:\n"
+SHELL = "#!/bin/sh\necho hello\n"
+CSS = "body { color: red; }\n"
+
+
+@pytest.mark.parametrize("path, code, expected", [
+    ("train.py", PYTHON_ML, {"numpy", "sklearn", "sklearn.model_selection"}),
+    ("broken.py", PYTHON_BROKEN, {"os", "os.path", "torch"}),
+    ("app.ts", "import React, { useState } from 'react';\nconst fs = require('fs');\n", {"react", "fs"}),
+    ("ui.jsx", "import { render } from '@testing-library/react';\n", {"@testing-library/react", "@testing-library"}),
+    ("Main.java", "import static org.junit.Assert.assertEquals;\nimport java.util.List;\n",
+     {"org.junit.Assert.assertEquals", "org.junit.Assert", "org.junit", "org", "java.util.List", "java.util", "java"}),
+    ("main.cpp", "#include <vector>\n#include \"sys/wait.h\"\n", {"vector", "sys/wait.h", "sys/wait", "sys"}),
+    ("lib.rs", "use std::sync::Mutex;\n", {"std::sync::Mutex", "std::sync", "std"}),
+    ("main.go", 'import (\n    "fmt"\n    "net/http"\n)\n', {"fmt", "net/http", "net"}),
+    ("style.css", CSS, set()),
+])
+def test_extract_imports(path, code, expected):
+    assert extract_imports(path, code) == expected
+
+
+@pytest.mark.parametrize("skill, path, code, relevant", [
+    # Language skills match by extension, through aliases and implied languages.
+    ("python", "train.py", PYTHON_ML, True),
+    ("py", "train.py", PYTHON_ML, True),
+    ("python", "deploy.sh", SHELL, False),
+    ("javascript", "app.ts", "const x: number = 1;\n", True),
+    ("typescript", "app.js", "const x = 1;\n", False),
+    ("c++", "main.cpp", "int main() {}\n", True),
+    ("c#", "Program.cs", "class Program {}\n", True),
+    # In a README a language counts only when it is mentioned.
+    ("python", "README.md", "A small Python CLI.\n", True),
+    ("rust", "README.md", "A small Python CLI.\n", False),
+    # Concept skills match on imports, keyword signatures or an explicit mention.
+    ("ML", "train.py", PYTHON_ML, True),
+    ("Machine Learning", "style.css", CSS, False),
+    ("Operating Systems", "proc.c", "pid = fork();\n", True),
+    ("Operating Systems", "style.css", CSS, False),
+    ("SQL", "repo.py", "cur.execute('SELECT name FROM users')\n", True),
+    ("React", "Counter.jsx", "const [n, setN] = useState(0);\n", True),
+    ("React", "deploy.sh", SHELL, False),
+    ("Unit Testing", "test_api.py", "def test_get():\n    assert True\n", True),
+    # Skills without a signature fall back to their words appearing in the path or code.
+    ("Kubernetes", "deploy/kubernetes/setup.sh", SHELL, True),
+    ("Kubernetes", "deploy.sh", "kubectl apply -f kubernetes.yaml\n", True),
+    ("Kubernetes", "style.css", CSS, False),
+    ("Game Development", "src/game.py", "print('hi')\n", True),
+    ("x", "style.css", CSS, True),  # no usable word: never dropped
+])
+def test_relevant_skills(skill, path, code, relevant):
+    assert SkillPrefilter([skill]).relevant_skills(path, code) == ([skill] if relevant else [])
+
+
+def test_relevant_skills_keeps_claimed_names_and_order():
+    prefilter = SkillPrefilter(["ML", "Python", "React", "NumPy"])
+
+    assert prefilter.relevant_skills("train.py", PYTHON_ML) == ["ML", "Python", "NumPy"]
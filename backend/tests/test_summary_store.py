@@ -0,0 +1,50 @@
+from backend.services.github_analyzer.analysis_store import UserAnalysisStore
+from backend.services.github_analyzer.analizes_a_repo import AnalyzeRepoForGivenUser
+from backend.services.github_analyzer.summary_store import PortfolioSummaryStore, analysis_digest
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def create_completion(self, prompt, **kwargs):
+        self.calls += 1
+        return {"choices": [{"text": "Solid Python work."}]}
+
+
+def write_record(user_dir, name, result):
+    UserAnalysisStore(str(user_dir)).save("repo", name, result)
+
+
+def test_digest_tracks_analysis_contents(tmp_path):
+    user_dir = tmp_path / "octocat"
+    assert analysis_digest(str(user_dir)) is None
+
+    write_record(user_dir, "a.py", '{"Python": {"depth": 6, "coverage": true}}')
+    first = analysis_digest(str(user_dir))
+    assert first == analysis_digest(str(user_dir))
+
+    write_record(user_dir, "a.py", '{"Python": {"depth": 7, "coverage": true}}')
+    assert analysis_digest(str(user_dir)) != first
+
+
+def test_summary_is_computed_once_per_analysis(tmp_path):
+    user_dir = tmp_path / "octocat"
+    write_record(user_dir, "a.py", '{"Python": {"depth": 6, "coverage": true}}')
+    store = PortfolioSummaryStore(str(tmp_path / "summaries"))
+    model = CountingModel()
+
+    def summarize():
+        analyzer = AnalyzeRepoForGivenUser("https://github.com/octocat", model, summary_store=store)
+        analyzer.user_dir = str(user_dir)
+        return analyzer.get_summary_text()
+
+    first = summarize()
+    calls = model.calls
+    assert first["success"] and calls > 0
+    assert summarize() == first
+    assert model.calls == calls
+
+    write_record(user_dir, "b.py", '{"Python": {"depth": 8, "coverage": true}}')
+    assert summarize()["skill_scores"]["python"]["avg_depth"] == 7
+    assert model.calls > calls